@@ -1,14 +1,25 @@
 from PIL import Image
 import os
 import sys
-import glob
 import time 
 import textwrap
 import tempfile
+import shutil
+import struct
+import zlib
+import io
+import contextlib
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
 import tkinter as tk
 from tkinter import messagebox 
 
+# Sibling modules (this file is also imported as scripts.SkyboxConverter by the GUI)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from vtf_reader import read_vtf_info, is_supported_format, to_rgba8
+from texture_cache import decode_vtf_cached
+from sky_reprojection import equirect_to_faces, faces_to_equirect
+
 # --- VTF Tools Path Detection ---
 # VTF tools should be bundled with the application
 # Location: vtf/VTFCmd.exe and vtf/VTFLib.dll
@@ -125,15 +136,27 @@ def find_vtfcmd():
         print(f"And place VTFCmd.exe and VTFLib.dll in: {tools_dir}")
         return None
 
-VTFCMD_PATH = None  # Will be checked when conversion starts
-try:
-    VTFCMD_PATH = find_vtfcmd()
-    if VTFCMD_PATH:
-        print(f"[OK] VTFCmd.exe found at: {VTFCMD_PATH}")
-except Exception as e:
-    print(f"Note: VTFCmd.exe will be downloaded when needed: {e}")
+# VTF files are decoded in-process by vtf_reader. VTFCmd.exe is only a fallback for
+# image formats the built-in decoder does not handle, so it is located on first use.
+VTFCMD_PATH = None
+
+def get_vtfcmd_path():
+    """Returns the VTFCmd.exe path, locating (or downloading) it on first use."""
+    global VTFCMD_PATH
+    if VTFCMD_PATH is None:
+        VTFCMD_PATH = find_vtfcmd()
+        if not VTFCMD_PATH:
+            raise Exception("VTFCmd.exe is not available")
+    return VTFCMD_PATH
+
 
-print(f"[OK] Using VTFCmd.exe from: {VTFCMD_PATH}")
+def vtf_needs_vtfcmd(vtf_path):
+    """True if the VTF uses an image format the built-in decoder cannot read."""
+    header = read_vtf_info(vtf_path)
+    if is_supported_format(header['image_format']):
+        return False
+    print(f"'{os.path.basename(vtf_path)}' uses {header['format_name']}, falling back to VTFCmd.exe")
+    return True
 # -----------------------------------
 
 # --- Image Stitching Library ---
@@ -147,7 +170,7 @@ except NameError:
 # --- EXR Support Library (Using openexr-numpy) ---
 EXR_SUPPORT_ENABLED = False
 try:
-    from openexr_numpy import imread
+    from openexr_numpy import imread, imwrite
     EXR_SUPPORT_ENABLED = True
     print("EXR Support: openexr-numpy is installed and ready for .exr files.")
 except ImportError:
@@ -177,6 +200,12 @@ FINAL_MOONDOME_VMAT_PATH = os.path.join(OUTPUT_DIR, FINAL_MOONDOME_VMAT_FILENAME
 TARGET_SLOTS = ['up', 'left', 'front', 'right', 'back', 'down']
 # --- END TARGET SLOT DEFINITION ---
 
+# Faces narrower than this are placeholders (e.g. 4x4 VTFs) and become black squares
+MIN_FACE_SIZE = 64
+
+# Rows assembled per write when streaming the stitched PNG (see stitch_cubemap_rotated)
+STREAMING_STRIP_ROWS = 256
+
 
 # --- CUSTOMIZABLE TRANSFORMATION CONFIGS ---
 
@@ -312,33 +341,54 @@ Layer0
 }}"""
 # --------------------
 
-def convert_exr_to_png(input_file, output_file):
+def read_exr_rgba(input_file):
     """
-    Converts a single EXR file to a temporary LDR PNG file using openexr-numpy and PIL.
+    Reads a single EXR file into an RGBA array (h, w, 4) of its stored float type using openexr-numpy.
+    Values are kept as stored (no clipping), so HDR range survives. Raises on failure.
     """
-    try:
-        # Read the EXR file using openexr-numpy
-        image_float = imread(input_file)
-
-        # Handle channels (convert to RGBA)
-        if image_float.shape[2] == 4:
-            pass
-        elif image_float.shape[2] == 3:
-            # Add an alpha channel of 1s if only RGB is present
-            alpha = np.ones((image_float.shape[0], image_float.shape[1], 1), dtype=image_float.dtype)
-            image_float = np.concatenate((image_float, alpha), axis=2)
-        else:
-            raise ValueError(f"EXR file has unexpected channel count: {image_float.shape[2]}")
+    # Read the EXR file using openexr-numpy
+    image_float = imread(input_file)
+    if image_float.ndim == 2:
+        image_float = np.repeat(image_float[:, :, None], 3, axis=2)
+
+    # Handle channels (convert to RGBA)
+    if image_float.shape[2] == 4:
+        pass
+    elif image_float.shape[2] == 3:
+        # Add an alpha channel of 1s if only RGB is present
+        alpha = np.ones((image_float.shape[0], image_float.shape[1], 1), dtype=image_float.dtype)
+        image_float = np.concatenate((image_float, alpha), axis=2)
+    else:
+        raise ValueError(f"EXR file has unexpected channel count: {image_float.shape[2]}")
 
+    return image_float
 
-        # Perform simple tone-mapping/normalization for LDR PNG (0-255).
-        clipped_image = np.clip(image_float, 0.0, 1.0) # Clips to 0-1 range
+def load_exr_float(input_file):
+    """Reads a single EXR file into a float32 RGBA array (h, w, 4)."""
+    return read_exr_rgba(input_file).astype(np.float32, copy=False)
 
-        # Convert to 8-bit unsigned integer (0-255)
-        image_8bit = (clipped_image * 255).astype(np.uint8)
+def float_to_ldr(image_float):
+    """Clips a float RGBA array to 0-1 and quantizes it to 8 bits (the LDR PNG representation)."""
+    # Perform simple tone-mapping/normalization for LDR PNG (0-255).
+    clipped_image = np.clip(image_float, 0.0, 1.0) # Clips to 0-1 range
 
-        # Use Pillow to save the 8-bit NumPy array as a PNG
-        pil_image = Image.fromarray(image_8bit, 'RGBA')
+    # Convert to 8-bit unsigned integer (0-255)
+    return (clipped_image * 255).astype(np.uint8)
+
+def load_exr_image(input_file):
+    """
+    Reads a single EXR file into an in-memory LDR RGBA image using openexr-numpy and PIL.
+    Raises on failure.
+    """
+    return Image.fromarray(float_to_ldr(read_exr_rgba(input_file)), 'RGBA')
+
+def convert_exr_to_png(input_file, output_file):
+    """
+    Converts a single EXR file to a temporary LDR PNG file using openexr-numpy and PIL.
+    """
+    try:
+        # Use Pillow to save the 8-bit image as a PNG
+        pil_image = load_exr_image(input_file)
         pil_image.save(output_file, format='PNG')
         
         return True
@@ -418,68 +468,98 @@ def determine_skybox_prefix(filenames_map):
             
     return final_prefix
 
+# --- Cubemap face discovery ---
+FACE_KEYWORDS = {
+    'right':['right', 'rt', 'px'],
+    'left': ['left', 'lf', 'nx'],
+    'back': ['back', 'bk', 'py'],
+    'front':['front', 'ft', 'ny'],
+    'up':   ['up', 'top', 'pz'],     
+    'down': ['down', 'dn', 'nz'],    
+}
+IMAGE_EXTENSIONS = ('.vtf', '.png', '.jpg', '.jpeg', '.tga', '.exr')  # In order of preference
+VMT_EXTENSION = '.vmt'
+
+# A file map holding only this key is an equirectangular panorama instead of six faces
+EQUIRECT_KEY = 'equirect'
+
+# Keyword -> face, longest first so 'skyleft' is 'left' and not 'ft'
+_KEYWORD_FACES = sorted(((keyword, face) for face, keywords in FACE_KEYWORDS.items() for keyword in keywords),
+                        key=lambda item: len(item[0]), reverse=True)
+
+def tokenize_face_filename(filename):
+    """
+    Splits a filename into (prefix, face, extension), e.g. 'sky_day01_01up.VTF' -> ('sky_day01_01', 'up', '.vtf').
+    Returns None if the name does not end in a face keyword or has an unsupported extension.
+    """
+    name_no_ext, ext = os.path.splitext(filename.lower())
+    if ext not in IMAGE_EXTENSIONS and ext != VMT_EXTENSION:
+        return None
+    for keyword, face in _KEYWORD_FACES:
+        if name_no_ext.endswith(keyword):
+            return name_no_ext[:-len(keyword)].rstrip('_-'), face, ext
+    return None
+
+def index_cubemap_files(directory="."):
+    """
+    Tokenizes every file in directory once and groups the face images by skybox prefix.
+    Returns (images, vmts): images is {prefix: {face: path}} keeping the preferred extension
+    per face, vmts is {face: [paths]} for error reporting.
+    """
+    images = {}
+    vmts = {}
+    with os.scandir(directory) as entries:
+        names = sorted(entry.name for entry in entries if entry.is_file())
+
+    for name in names:
+        token = tokenize_face_filename(name)
+        if token is None:
+            continue
+        prefix, face, ext = token
+        path = os.path.join(directory, name)
+        if ext == VMT_EXTENSION:
+            vmts.setdefault(face, []).append(path)
+            continue
+        faces = images.setdefault(prefix, {})
+        current = faces.get(face)
+        if current is None or IMAGE_EXTENSIONS.index(ext) < IMAGE_EXTENSIONS.index(os.path.splitext(current)[1].lower()):
+            faces[face] = path
+    return images, vmts
+
+def find_cubemap_sets(directory="."):
+    """Returns every complete skybox in directory as a list of (prefix, {face: path}), sorted by prefix."""
+    images, _ = index_cubemap_files(directory)
+    return [(prefix, faces) for prefix, faces in sorted(images.items()) if len(faces) == len(FACE_KEYWORDS)]
+
 def find_cubemap_files(directory="."):
     """
     Scans the specified directory for files matching the cubemap face keywords.
     Prints the names of any missing required face images.
     """
-    FACE_KEYWORDS = {
-        'right':['right', 'rt', 'px'],
-        'left': ['left', 'lf', 'nx'],
-        'back': ['back', 'bk', 'py'],
-        'front':['front', 'ft', 'ny'],
-        'up':   ['up', 'top', 'pz'],     
-        'down': ['down', 'dn', 'nz'],    
-    }
     REQUIRED_FACES = set(FACE_KEYWORDS.keys())
-    IMAGE_EXTENSIONS = ('.vtf', '.png', '.jpg', '.jpeg', '.tga', '.exr') 
-    VMT_EXTENSION = ('.vmt',)
-    ALL_EXTENSIONS = IMAGE_EXTENSIONS + VMT_EXTENSION
-
-    found_files = {}
-    
-    all_files = glob.glob(os.path.join(directory, '*'))
-    target_files = [f for f in all_files if os.path.isfile(f) and f.lower().endswith(ALL_EXTENSIONS)]
+    images, vmts = index_cubemap_files(directory)
     
-    print(f"Found {len(target_files)} potential image/vtf files in the directory.")
-    print(f"Files: {[os.path.basename(f) for f in target_files]}")
-    
-    for face_name, keywords in FACE_KEYWORDS.items():
-        found = False
-        print(f"\nSearching for face '{face_name}' with keywords: {keywords}")
-        
-        # Check for IMAGE files first
-        for ext in IMAGE_EXTENSIONS:
-            if found: break
-            for fpath in target_files:
-                if fpath.lower().endswith(ext):
-                    # Check for "skybox" or a similar prefix followed by a keyword
-                    fname_lower = os.path.basename(fpath).lower()
-                    name_no_ext = os.path.splitext(fname_lower)[0]
-                    
-                    print(f"  Checking file: {os.path.basename(fpath)} (name without ext: '{name_no_ext}')")
-                    
-                    # Check if any keyword matches
-                    for keyword in keywords:
-                        # Match if keyword is at the end of filename OR is the entire filename
-                        if name_no_ext.endswith(keyword) or name_no_ext == keyword:
-                            found_files[face_name] = fpath
-                            found = True
-                            print(f"    [OK] MATCHED! Found file for '{face_name}': {os.path.basename(fpath)} (matched keyword: '{keyword}')")
-                            break
-                        else:
-                            print(f"    - No match for keyword '{keyword}' (endswith: {name_no_ext.endswith(keyword)}, equals: {name_no_ext == keyword})")
-                    
-                    if found: break
-        
-        # VMT check is kept for error reporting, but not used in stitching
-        if not found:
-             for fpath in target_files:
-                 if fpath.lower().endswith(VMT_EXTENSION):
-                     fname_lower = os.path.basename(fpath).lower()
-                     if any(keyword in fname_lower for keyword in keywords):
-                         print(f"ERROR: Found file for '{face_name}' but it is a VMT file: {os.path.basename(fpath)}. An image file (.vtf/.png/etc.) is required.")
-                         break
+    print(f"Found {sum(len(faces) for faces in images.values())} cubemap face images in the directory.")
+
+    complete_sets = [prefix for prefix, faces in sorted(images.items()) if len(faces) == len(REQUIRED_FACES)]
+    if complete_sets:
+        prefix = complete_sets[0]
+        if len(complete_sets) > 1:
+            print(f"Found {len(complete_sets)} complete skyboxes ({', '.join(repr(p) for p in complete_sets)}), using '{prefix}'.")
+        found_files = dict(images[prefix])
+    else:
+        # No complete set under one prefix: fill from the most complete prefixes first
+        found_files = {}
+        for prefix in sorted(images, key=lambda p: (-len(images[p]), p)):
+            for face_name, fpath in images[prefix].items():
+                found_files.setdefault(face_name, fpath)
+
+    for face_name in TARGET_SLOTS:
+        if face_name in found_files:
+            print(f"  [OK] '{face_name}': {os.path.basename(found_files[face_name])}")
+        elif face_name in vmts:
+            # VMT check is kept for error reporting, but not used in stitching
+            print(f"ERROR: Found file for '{face_name}' but it is a VMT file: {os.path.basename(vmts[face_name][0])}. An image file (.vtf/.png/etc.) is required.")
 
     valid_faces = set(found_files.keys())
     missing_faces = REQUIRED_FACES - valid_faces
@@ -495,7 +575,8 @@ def find_cubemap_files(directory="."):
 
 def convert_vtf_to_png(vtf_path, output_dir):
     """
-    Converts a single VTF file to a PNG file using VTFCmd.exe, saving it in the specified output_dir.
+    Converts a single VTF file to a PNG file, saving it in the specified output_dir.
+    Uses the built-in decoder, or VTFCmd.exe for formats it does not support.
     """
     base_name = os.path.basename(vtf_path)
     png_filename = os.path.splitext(base_name)[0] + ".temp_converted.png" 
@@ -504,7 +585,13 @@ def convert_vtf_to_png(vtf_path, output_dir):
     print(f"Converting '{base_name}' to PNG...")
 
     try:
+        if not vtf_needs_vtfcmd(vtf_path):
+            Image.fromarray(to_rgba8(decode_vtf_cached(vtf_path)), 'RGBA').save(png_path, format='PNG')
+            print(f"     -> Saved temporary file: {os.path.basename(png_path)}")
+            return png_path
+
         import subprocess
+        vtfcmd_path = get_vtfcmd_path()
         
         # VTFCmd.exe command: VTFCmd.exe -file "input.vtf" -output "output_folder" -exportformat "png"
         # Use absolute paths to avoid issues
@@ -512,7 +599,7 @@ def convert_vtf_to_png(vtf_path, output_dir):
         abs_output_dir = os.path.abspath(output_dir)
         
         # Get VTFCmd.exe directory to ensure VTFLib.dll is accessible
-        vtfcmd_dir = os.path.dirname(VTFCMD_PATH)
+        vtfcmd_dir = os.path.dirname(vtfcmd_path)
         vtflib_path = os.path.join(vtfcmd_dir, 'VTFLib.dll')
         
         # Check if VTFLib.dll exists alongside VTFCmd.exe
@@ -522,7 +609,7 @@ def convert_vtf_to_png(vtf_path, output_dir):
         # VTFCmd.exe command for VTF to PNG conversion
         # Based on VTFCmd documentation: vtfcmd.exe -file "input.vtf" -output "output_dir" -exportformat "png"
         cmd = [
-            VTFCMD_PATH,
+            vtfcmd_path,
             '-file', abs_vtf_path,
             '-output', abs_output_dir,
             '-exportformat', 'png'
@@ -578,11 +665,185 @@ def convert_vtf_to_png(vtf_path, output_dir):
         
     except Exception as e:
         print(f"Error converting VTF file '{vtf_path}': {e}")
-        print(f"Make sure VTFCmd.exe is accessible at: {VTFCMD_PATH}")
+        print("The built-in VTF decoder or VTFCmd.exe is required for this file.")
         # Re-raise the exception to stop the stitching process
         raise
 
 
+def decode_face_image(path, temp_dir):
+    """
+    Decodes a single skybox face into an in-memory RGBA image.
+    VTF files are decoded in-process; formats that need VTFCmd.exe are converted inside a
+    private temporary folder (safe to run concurrently) that is removed as soon as the image is loaded.
+    Returns (image, source_format_type).
+    """
+    path_lower = path.lower()
+    
+    if path_lower.endswith('.vtf'):
+        if not vtf_needs_vtfcmd(path):
+            print(f"Decoding '{os.path.basename(path)}' (VTF) in memory...")
+            return Image.fromarray(to_rgba8(decode_vtf_cached(path)), 'RGBA'), 'default'
+        
+        face_temp_dir = tempfile.mkdtemp(prefix="vtf_", dir=temp_dir)
+        try:
+            png_path = convert_vtf_to_png(path, face_temp_dir)
+            with Image.open(png_path) as img:
+                return img.convert("RGBA"), 'default'
+        finally:
+            shutil.rmtree(face_temp_dir, ignore_errors=True)
+    
+    if path_lower.endswith('.exr'):
+        print(f"Converting '{os.path.basename(path)}' (EXR) in memory...")
+        return load_exr_image(path), 'exr'
+    
+    # All other formats (PNG, JPG, TGA, HDR, etc.) are loaded directly
+    with Image.open(path) as img:
+        return img.convert("RGBA"), 'default'
+
+
+def decode_face_float(path, temp_dir):
+    """
+    HDR counterpart of decode_face_image: returns (float32 RGBA array, source_format_type).
+    EXR faces keep their full float range; 8-bit formats are scaled to 0-1.
+    """
+    if path.lower().endswith('.exr'):
+        print(f"Reading '{os.path.basename(path)}' (EXR) as float...")
+        return load_exr_float(path), 'exr'
+    
+    if path.lower().endswith('.vtf') and not vtf_needs_vtfcmd(path):
+        # Float VTFs (RGBA16161616F) keep their HDR range
+        pixels = decode_vtf_cached(path)
+        if pixels.dtype == np.float32:
+            return pixels, 'default'
+        return pixels.astype(np.float32) * np.float32(1 / 255), 'default'
+    
+    image, source_format = decode_face_image(path, temp_dir)
+    return np.asarray(image, dtype=np.float32) * np.float32(1 / 255), source_format
+
+
+def load_panorama_faces(path, temp_dir, hdr=False):
+    """
+    Decodes an equirectangular panorama (any supported face format) and reprojects it into the six
+    faces in Source orientation. Returns {face: array}: float32 when hdr, otherwise uint8 RGBA.
+    """
+    if hdr:
+        panorama = decode_face_float(path, temp_dir)[0]
+    else:
+        panorama = np.asarray(decode_face_image(path, temp_dir)[0])
+    
+    height, width = panorama.shape[:2]
+    print(f"Reprojecting {width}x{height} panorama '{os.path.basename(path)}' to six {width // 4}x{width // 4} faces...")
+    return equirect_to_faces(panorama)
+
+
+# --- Face placement on array canvases ---
+# Array equivalents of the PIL transpose constants used in the transform maps
+ARRAY_TRANSPOSES = {
+    Image.Transpose.FLIP_LEFT_RIGHT: lambda a: a[:, ::-1],
+    Image.Transpose.FLIP_TOP_BOTTOM: lambda a: a[::-1],
+    Image.Transpose.ROTATE_90: lambda a: np.rot90(a, 1),
+    Image.Transpose.ROTATE_180: lambda a: a[::-1, ::-1],
+    Image.Transpose.ROTATE_270: lambda a: np.rot90(a, 3),
+    Image.Transpose.TRANSPOSE: lambda a: a.transpose(1, 0, 2),
+    Image.Transpose.TRANSVERSE: lambda a: a[::-1, ::-1].transpose(1, 0, 2),
+}
+
+# Every transpose is its own inverse except the quarter turns
+INVERSE_TRANSPOSES = {
+    Image.Transpose.ROTATE_90: Image.Transpose.ROTATE_270,
+    Image.Transpose.ROTATE_270: Image.Transpose.ROTATE_90,
+}
+
+def source_oriented_view(slot, rotation_degrees, flip):
+    """
+    Returns a view of a canvas slot in which writing an untransformed face is equivalent to
+    rotating it (transform map degrees CCW, multiple of 90), applying the PIL flip constant
+    and pasting it. Only NumPy views are involved, so the transform is free and lossless.
+    """
+    view = slot
+    if flip is not None:
+        view = ARRAY_TRANSPOSES[INVERSE_TRANSPOSES.get(flip, flip)](view)
+    if rotation_degrees % 360:
+        view = np.rot90(view, -(rotation_degrees // 90) % 4)
+    return view
+
+def cross_slot_coords(base_unit_size):
+    """Top-left (x, y) of each target slot in the 4x3 cross."""
+    return {
+        'up':      (base_unit_size * 1, base_unit_size * 0),
+        'left':    (base_unit_size * 0, base_unit_size * 1),
+        'front':   (base_unit_size * 1, base_unit_size * 1),
+        'right':   (base_unit_size * 2, base_unit_size * 1),
+        'back':    (base_unit_size * 3, base_unit_size * 1),
+        'down':    (base_unit_size * 1, base_unit_size * 2),
+    }
+
+def cross_to_faces(cross, base_unit_size):
+    """Views of the six faces of a stitched 4x3 cross, in Source orientation (inverse of DEFAULT_TRANSFORMS)."""
+    faces = {}
+    for target_slot, (x, y) in cross_slot_coords(base_unit_size).items():
+        source_face, rotation_degrees, flip = DEFAULT_TRANSFORMS[target_slot]
+        faces[source_face] = source_oriented_view(cross[y:y + base_unit_size, x:x + base_unit_size], rotation_degrees, flip)
+    return faces
+
+def save_equirect(cross, base_unit_size, output_file):
+    """Reprojects a stitched cross (uint8 or float32 RGBA) to an equirectangular panorama: .png, .exr or .pfm."""
+    panorama = faces_to_equirect(cross_to_faces(cross, base_unit_size))
+    if os.path.splitext(output_file)[1].lower() == '.png':
+        if panorama.dtype != np.uint8:
+            panorama = float_to_ldr(panorama)
+        Image.fromarray(panorama, 'RGBA').save(output_file, "PNG")
+    else:
+        if panorama.dtype == np.uint8:
+            panorama = panorama.astype(np.float32) * np.float32(1 / 255)
+        save_hdr_image(output_file, panorama)
+    print(f"Equirectangular panorama saved to: {os.path.abspath(output_file)}")
+
+def resize_face_array(face, size):
+    """
+    LANCZOS-resizes a float32 RGBA array to size (w, h) channel by channel, without clipping.
+    Like PIL's RGBA resize, color is resampled premultiplied by alpha.
+    """
+    def resize_channel(channel):
+        return np.asarray(Image.fromarray(np.ascontiguousarray(channel), 'F').resize(size, Image.Resampling.LANCZOS))
+
+    alpha = face[:, :, 3]
+    if alpha.min() >= 1.0:
+        return np.stack([resize_channel(face[:, :, c]) for c in range(4)], axis=2)
+
+    # Alpha is coverage, not HDR: clip the filter's ringing and treat < 1/255 as fully transparent
+    alpha_resized = np.clip(resize_channel(alpha), 0.0, 1.0)
+    visible = alpha_resized >= 1 / 255
+    safe_alpha = np.where(visible, alpha_resized, 1.0)
+    channels = [
+        # Unpremultiplying faint pixels amplifies ringing, so keep color within the source channel's range
+        np.clip(np.where(visible, resize_channel(face[:, :, c] * alpha) / safe_alpha, 0.0), 0.0, face[:, :, c].max())
+        for c in range(3)
+    ]
+    return np.stack(channels + [alpha_resized], axis=2).astype(np.float32, copy=False)
+
+def save_pfm(output_file, image_float):
+    """Writes a float array as a little-endian RGB PFM file (PFM has no alpha channel)."""
+    height, width = image_float.shape[:2]
+    # PFM scanlines are stored bottom to top; a negative scale marks little-endian data
+    pixels = np.ascontiguousarray(image_float[::-1, :, :3], dtype='<f4')
+    with open(output_file, 'wb') as f:
+        f.write(f"PF\n{width} {height}\n-1.0\n".encode('ascii'))
+        f.write(pixels.tobytes())
+
+def save_hdr_image(output_file, image_float):
+    """Saves a float RGBA array as EXR or PFM, chosen by the file extension."""
+    extension = os.path.splitext(output_file)[1].lower()
+    if extension == '.exr':
+        if not EXR_SUPPORT_ENABLED:
+            raise RuntimeError("Writing EXR requires the 'openexr-numpy' library.")
+        imwrite(output_file, np.ascontiguousarray(image_float, dtype=np.float32))
+    elif extension == '.pfm':
+        save_pfm(output_file, image_float)
+    else:
+        raise ValueError(f"Unsupported HDR output format '{extension}' (use .exr or .pfm)")
+
+
 def generate_vmat_content_and_save(vmat_path, content, material_type):
     """
     Generates and writes the specified .vmat file content.
@@ -815,22 +1076,111 @@ def clean_up_original_source_files(original_file_list):
         print("Cleanup completed: No files were removed due to errors")
 
 
-def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
+class StreamingPNGWriter:
+    """
+    Writes an 8-bit RGBA PNG a few rows at a time, so the full image never has to exist in memory.
+    Rows use the PNG 'Up' filter, which is cheap to compute and compresses photographic skies well.
+    """
+    def __init__(self, path, width, height, compress_level=6):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file = open(path, 'wb')
+        self._compressor = zlib.compressobj(compress_level)
+        self._prev_row = np.zeros((width * 4,), dtype=np.uint8)
+        self._file.write(b'\x89PNG\r\n\x1a\n')
+        # IHDR: width, height, bit depth 8, color type 6 (RGBA), deflate, adaptive filtering, no interlace
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+
+    def _write_chunk(self, chunk_type, data):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xFFFFFFFF))
+
+    def write_rows(self, rows):
+        """Appends rows given as a uint8 array of shape (n, width, 4)."""
+        flat = rows.reshape(rows.shape[0], self.width * 4)
+        filtered = np.empty((flat.shape[0], flat.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 2  # 'Up' filter: difference to the row above (mod 256)
+        np.subtract(flat[0], self._prev_row, out=filtered[0, 1:])
+        np.subtract(flat[1:], flat[:-1], out=filtered[1:, 1:])
+        self._prev_row = flat[-1].copy()
+        self.rows_written += flat.shape[0]
+        
+        compressed = self._compressor.compress(filtered.tobytes())
+        if compressed:
+            self._write_chunk(b'IDAT', compressed)
+
+    def close(self):
+        if self._file.closed:
+            return
+        try:
+            if self.rows_written == self.height:
+                self._write_chunk(b'IDAT', self._compressor.flush())
+                self._write_chunk(b'IEND', b'')
+        finally:
+            self._file.close()
+
+
+def convert_face_to_file(path, temp_dir):
+    """
+    Streaming counterpart of decode_face_image: converts a VTF/EXR face to a PNG on disk
+    instead of keeping it in memory, so faces can be decoded one row of the cubemap at a time.
+    Returns (image_path, source_format_type, private_temp_dir or None).
+    """
+    path_lower = path.lower()
+    
+    if path_lower.endswith('.vtf'):
+        face_temp_dir = tempfile.mkdtemp(prefix="vtf_", dir=temp_dir)
+        try:
+            return convert_vtf_to_png(path, face_temp_dir), 'default', face_temp_dir
+        except Exception:
+            shutil.rmtree(face_temp_dir, ignore_errors=True)
+            raise
+    
+    if path_lower.endswith('.exr'):
+        face_temp_dir = tempfile.mkdtemp(prefix="exr_", dir=temp_dir)
+        png_path = os.path.join(face_temp_dir, os.path.splitext(os.path.basename(path))[0] + ".temp_converted.png")
+        print(f"Converting '{os.path.basename(path)}' (EXR) to PNG...")
+        if not convert_exr_to_png(path, png_path):
+            shutil.rmtree(face_temp_dir, ignore_errors=True)
+            raise Exception(f"Error converting EXR file '{path}'")
+        return png_path, 'exr', face_temp_dir
+    
+    # All other formats (PNG, JPG, TGA, HDR, etc.) are read directly
+    return path, 'default', None
+
+
+def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir, streaming=False, hdr_output_path=None,
+                           equirect_output_path=None):
     """
     Performs file conversion, stitching, and applies source format-specific 
     rotations/placements.
     Supports standard 1:1 faces (CS:GO/CS2) and 2:1 horizontal faces (TF2/HL2).
+    
+    With streaming=True the output PNG is written one cubemap row (band) at a time and only
+    the faces of that row are decoded, which bounds peak memory for very large skyboxes.
+    
+    With hdr_output_path (.exr or .pfm) faces stay float32 arrays end to end and the stitched
+    HDR image is written there; output_file_path (may be None) receives the clipped LDR PNG.
+    
+    filenames_map may also be {EQUIRECT_KEY: path} for an equirectangular panorama, which is
+    reprojected into the six faces first. equirect_output_path (.png, .exr or .pfm) additionally
+    receives the stitched cubemap reprojected to an equirectangular panorama.
     """
     print("-" * 50)
     print("Starting Skybox Converter")
     print("-" * 50)
 
-    if len(filenames_map) != 6:
+    panorama_path = filenames_map.get(EQUIRECT_KEY) if len(filenames_map) == 1 else None
+    if panorama_path is None and len(filenames_map) != 6:
         print("Error: Not all 6 required image files were found. Stitching cancelled.")
         return False
 
-    png_paths_map = {}
-    temp_files = []
+    images = {}
+    face_files = {}
+    face_temp_dirs = []
     face_source_info = {}
     
     # --- 0. Ensure Output Directory Exists ---
@@ -838,66 +1188,120 @@ def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
         os.makedirs(temp_dir)
         print(f"Created output directory: {temp_dir}")
 
-    # --- 1. Conversion Stage (VTF and EXR to temporary PNG) ---
-    for face, path in filenames_map.items():
-        path_lower = path.lower()
-        source_format_type = 'default'
-        
-        if path_lower.endswith('.vtf'):
-            try:
-                # Use a specific temp name for converted VTF files
-                png_path = os.path.join(temp_dir, os.path.splitext(os.path.basename(path))[0] + ".temp_converted.png")
-                
-                # Use the convert function to get the path
-                converted_path = convert_vtf_to_png(path, temp_dir) 
-                
-                png_paths_map[face] = converted_path
-                temp_files.append(converted_path)
-            except Exception:
-                for f in temp_files:
-                    try: os.remove(f)
-                    except: pass
-                return False
-        
-        elif path_lower.endswith('.exr'):
-            source_format_type = 'exr'
-            if not EXR_SUPPORT_ENABLED:
+    if not EXR_SUPPORT_ENABLED:
+        for path in filenames_map.values():
+            if path.lower().endswith('.exr'):
                 print(f"\nFATAL ERROR: Cannot convert EXR file '{os.path.basename(path)}'.")
                 print("The 'openexr-numpy' library is missing.")
                 return False
-            
-            base_name = os.path.splitext(os.path.basename(path))[0]
-            png_filename = base_name + ".temp_converted.png" 
-            png_path = os.path.join(temp_dir, png_filename)
-
-            print(f"Converting '{os.path.basename(path)}' (EXR) to PNG...")
-            if convert_exr_to_png(path, png_path):
-                png_paths_map[face] = png_path
-                temp_files.append(png_path)
-                print(f"     -> Saved temporary file: {os.path.basename(png_path)}")
-            else:
-                print(f"Error converting EXR file '{path}'. Stopping.")
-                return False
 
-        else:
-            # All other formats (PNG, JPG, TGA, HDR, etc.) are loaded directly
-            png_paths_map[face] = path
+    if hdr_output_path and streaming:
+        print("Note: Streaming is not available for HDR output. Stitching in memory.")
+        streaming = False
+    
+    if (panorama_path or equirect_output_path) and streaming:
+        print("Note: Streaming is not available for equirectangular input/output. Stitching in memory.")
+        streaming = False
+
+    try:
+        return _stitch_faces(filenames_map, output_file_path, temp_dir, streaming, hdr_output_path,
+                             images, face_files, face_temp_dirs, face_source_info,
+                             panorama_path, equirect_output_path)
+    finally:
+        for face_temp_dir in face_temp_dirs:
+            shutil.rmtree(face_temp_dir, ignore_errors=True)
+
+
+def _stitch_faces(filenames_map, output_file_path, temp_dir, streaming, hdr_output_path,
+                  images, face_files, face_temp_dirs, face_source_info,
+                  panorama_path=None, equirect_output_path=None):
+    """Body of stitch_cubemap_rotated; temporary face folders are registered in face_temp_dirs for cleanup."""
+    hdr = hdr_output_path is not None
+
+    # --- 0a. Panorama input: reprojected faces replace the decode stage ---
+    if panorama_path:
+        try:
+            panorama_faces = load_panorama_faces(panorama_path, temp_dir, hdr)
+        except Exception as e:
+            print(f"Error reprojecting panorama: {e}. Stopping.")
+            return False
+        for face, pixels in panorama_faces.items():
+            # The faces are generated in Source orientation, so the default transforms apply
+            images[face] = pixels if hdr else Image.fromarray(pixels, 'RGBA')
+            face_source_info[face] = 'default'
+        filenames_map = {face: panorama_path for face in panorama_faces}
+
+    # --- 0b. Header-only probe: VTF placeholders are sized without being decoded ---
+    probed_sizes = {}
+    for face, path in filenames_map.items():
+        if face not in images and path.lower().endswith('.vtf'):
+            try:
+                header = read_vtf_info(path)
+            except Exception:
+                continue  # Unreadable header: the conversion stage reports the error
+            probed_sizes[face] = (header['width'], header['height'])
+            if header['width'] < MIN_FACE_SIZE:
+                print(f"'{os.path.basename(path)}' is a {header['width']}x{header['height']} placeholder, skipping decode.")
+    faces_to_decode = {face: path for face, path in filenames_map.items() if face not in images and
+                       (face not in probed_sizes or probed_sizes[face][0] >= MIN_FACE_SIZE)}
+
+    # --- 1. Conversion Stage (faces converted concurrently in memory mode) ---
+    # VTFCmd.exe runs as a subprocess and PIL/openexr decode outside the GIL, so threads suffice.
+    # In memory mode the decoded faces are kept; in streaming mode they go to disk and are read per band.
+    # Converting a face still decodes it in full, so streaming converts one face at a time to keep
+    # at most one decoded face in memory.
+    try:
+        conversion_workers = 1 if streaming else max(1, len(faces_to_decode))
+        with ThreadPoolExecutor(max_workers=conversion_workers) as executor:
+            if streaming:
+                futures = {executor.submit(convert_face_to_file, path, temp_dir): face for face, path in faces_to_decode.items()}
+            elif hdr:
+                futures = {executor.submit(decode_face_float, path, temp_dir): face for face, path in faces_to_decode.items()}
+            else:
+                futures = {executor.submit(decode_face_image, path, temp_dir): face for face, path in faces_to_decode.items()}
+            
+            errors = []
+            for future in as_completed(futures):
+                face = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                
+                # Store source format type for later use in transformations
+                if streaming:
+                    face_files[face], face_source_info[face], face_temp_dir = result
+                    if face_temp_dir:
+                        face_temp_dirs.append(face_temp_dir)
+                else:
+                    images[face], face_source_info[face] = result
             
-        # Store source format type for later use in transformations
-        face_source_info[face] = source_format_type
+            if errors:
+                raise errors[0]
+    except Exception as e:
+        print(f"Error converting skybox faces: {e}. Stopping.")
+        return False
 
 
-    # --- 2. Load Images and Determine Face Size and Ratio (CORRECTED LOGIC) ---
+    # --- 2. Determine Face Size and Ratio (CORRECTED LOGIC) ---
     try:
-        images = {}
+        face_sizes = {}
         valid_sizes = []
-        MIN_SIZE = 64 # Ignore extremely small images (like 4x4 placeholders)
-
-        # Load all images first
-        for face, path in png_paths_map.items():
-            img = Image.open(path).convert("RGBA")
-            images[face] = img
-            w, h = img.size
+        MIN_SIZE = MIN_FACE_SIZE # Ignore extremely small images (like 4x4 placeholders)
+
+        for face in filenames_map:
+            if face in probed_sizes and face not in faces_to_decode:
+                face_sizes[face] = probed_sizes[face]
+            elif streaming:
+                # Only the header is read here, pixels are decoded per band later
+                with Image.open(face_files[face]) as img:
+                    face_sizes[face] = img.size
+            elif hdr:
+                face_sizes[face] = (images[face].shape[1], images[face].shape[0])
+            else:
+                face_sizes[face] = images[face].size
+            w, h = face_sizes[face]
             if w >= MIN_SIZE and h >= MIN_SIZE:
                 valid_sizes.append((w, h))
 
@@ -906,7 +1310,7 @@ def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
             raise ValueError("No valid image size found.")
 
         # Find the most common/largest size, or just use the largest found size
-        face_width, face_height = images['front'].size
+        face_width, face_height = face_sizes['front']
         
         # Fallback in case 'front' is also a placeholder
         if face_width < MIN_SIZE or face_height < MIN_SIZE:
@@ -931,9 +1335,6 @@ def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
 
     except (FileNotFoundError, ValueError, Exception) as e:
         print(f"An error occurred during image loading/sizing: {e}")
-        for f in temp_files:
-            try: os.remove(f)
-            except: pass
         return False
         
     # --- Base Unit Size Definition ---
@@ -947,24 +1348,30 @@ def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
     final_height = base_unit_size * 3
 
     # Defines the coordinates of the 6 slots in the final 4x3 image
-    COORDS = {
-        'up':      (base_unit_size * 1, base_unit_size * 0),
-        'left':    (base_unit_size * 0, base_unit_size * 1),
-        'front':   (base_unit_size * 1, base_unit_size * 1),
-        'right':   (base_unit_size * 2, base_unit_size * 1),
-        'back':    (base_unit_size * 3, base_unit_size * 1),
-        'down':    (base_unit_size * 1, base_unit_size * 2),
-    }
-
-    # Create the empty image matrix (the final image) with black background.
-    final_image = Image.new('RGBA', (final_width, final_height), (0, 0, 0, 0))
-    print(f"Final stitched cubemap canvas size: {final_width}x{final_height}")
-
-    print("\nStitching images using format-specific rotations and placements...")
-    
-    # Loop over the TARGET SLOTS 
-    for target_slot in TARGET_SLOTS:
+    COORDS = cross_slot_coords(base_unit_size)
+
+    # Opaque black in the canvas's value range (placeholders and the bottom of dome faces)
+    opaque_black = (0.0, 0.0, 0.0, 1.0) if hdr else (0, 0, 0, 255)
+
+    def face_pixels(face, size):
+        """Source face as an (h, w, 4) array of the given (w, h) size; resamples only if needed."""
+        if hdr:
+            pixels = images[face]
+            if (pixels.shape[1], pixels.shape[0]) != size:
+                pixels = resize_face_array(pixels, size)
+            return pixels
         
+        if streaming:
+            with Image.open(face_files[face]) as img:
+                image = img.convert("RGBA")
+        else:
+            image = images[face]
+        if image.size != size:
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        return np.asarray(image)
+
+    def fill_slot(target_slot, canvas, x, y):
+        """Writes the resized and rotated face for one target slot into canvas at (x, y)."""
         # --- Select Transformation Map based on detected source type ---
         transform_map = DEFAULT_TRANSFORMS
         config_name = "DEFAULT_TRANSFORMS"
@@ -980,43 +1387,35 @@ def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
         # Get the transformation values from the selected map
         source_face, rotation_degrees, flip = transform_map.get(target_slot, (target_slot, 0, None))
         
-        image_to_paste = images[source_face] 
         transform_description = []
 
-        # --- 2a. Pre-process and Resize Image for Slot ---
+        # --- 2a. Rotation/Flip as a view: the face is written once, already transformed ---
+        slot = source_oriented_view(canvas[y:y + base_unit_size, x:x + base_unit_size], rotation_degrees, flip)
+
+        # --- 2b. Resize Image for Slot ---
         
         # If the image is a placeholder (4x4), skip rotation/resize but still put a black square in the slot.
-        if image_to_paste.size[0] < MIN_SIZE:
-             # Create a completely black square of the correct base size (base_unit_size x base_unit_size)
-             image_to_paste = Image.new('RGBA', (base_unit_size, base_unit_size), (0, 0, 0, 255))
+        if face_sizes[source_face][0] < MIN_SIZE:
+             slot[:] = opaque_black
              transform_description.append("REPLACED 4x4 with Black Square")
 
         elif is_dome_map and target_slot in ['left', 'front', 'right', 'back']:
             # Dome Map Horizontal Face (2:1 -> W x H) to 1:1 Slot (H x H), with black bottom
             target_height = base_unit_size // 2 
-            image_resized = image_to_paste.resize((base_unit_size, target_height), Image.Resampling.LANCZOS)
-            final_face = Image.new('RGBA', (base_unit_size, base_unit_size), (0, 0, 0, 255))
-            final_face.paste(image_resized, (0, 0))
-            image_to_paste = final_face
+            slot[:target_height] = face_pixels(source_face, (base_unit_size, target_height))
+            slot[target_height:] = opaque_black
             
             transform_description.append(f"Dome Map (2:1) to 1:1 Top")
             
         else:
             # Standard resize: Scale any other 1:1 image to the correct 1:1 slot size.
-            image_to_paste = image_to_paste.resize((base_unit_size, base_unit_size), Image.Resampling.LANCZOS)
-            transform_description.append("Resized to 1:1 Slot")
-
+            if face_sizes[source_face] != (base_unit_size, base_unit_size):
+                transform_description.append("Resized to 1:1 Slot")
+            slot[:] = face_pixels(source_face, (base_unit_size, base_unit_size))
 
-        # --- 2b. Apply Transformations (Rotation/Flip) ---
-
-        # Apply Rotation
         if rotation_degrees != 0:
-            image_to_paste = image_to_paste.rotate(rotation_degrees, expand=False)
             transform_description.append(f"Rotated {rotation_degrees}° CCW")
-        
-        # Apply Flip/Transpose
         if flip is not None:
-            image_to_paste = image_to_paste.transpose(flip)
             transform_description.append(f"Applied Transpose: {str(flip).split('.')[-1]}")
             
         # Log the operation
@@ -1026,29 +1425,202 @@ def stitch_cubemap_rotated(filenames_map, output_file_path, temp_dir):
         
         print(f"Pasting {desc} into target '{target_slot}' slot...")
 
-        # --- 2c. Final Paste ---
-        position = COORDS[target_slot]
-        final_image.paste(image_to_paste, position)
+    print(f"Final stitched cubemap canvas size: {final_width}x{final_height}")
+    print("\nStitching images using format-specific rotations and placements...")
+    
+    if streaming:
+        # --- 3. Streaming: one cubemap row (band) of faces in memory at a time ---
+        writer = StreamingPNGWriter(output_file_path, final_width, final_height)
+        try:
+            for band in range(3):
+                band_canvas = np.zeros((base_unit_size, final_width, 4), dtype=np.uint8)
+                for target_slot in TARGET_SLOTS:
+                    x, y = COORDS[target_slot]
+                    if y == band * base_unit_size:
+                        fill_slot(target_slot, band_canvas, x, 0)
+                
+                # Emit the band in strips to bound the size of the filtered/compressed buffers
+                for y0 in range(0, base_unit_size, STREAMING_STRIP_ROWS):
+                    writer.write_rows(band_canvas[y0:y0 + STREAMING_STRIP_ROWS])
+                del band_canvas
+        finally:
+            writer.close()
+    elif hdr:
+        # Float canvas: HDR values are preserved until the EXR/PFM is written
+        final_array = np.zeros((final_height, final_width, 4), dtype=np.float32)
+        for target_slot in TARGET_SLOTS:
+            fill_slot(target_slot, final_array, *COORDS[target_slot])
+
+        try:
+            save_hdr_image(hdr_output_path, final_array)
+        except Exception as e:
+            print(f"Error saving HDR output: {e}")
+            return False
+        print(f"HDR cubemap saved to: {os.path.abspath(hdr_output_path)}")
+
+        # Optional LDR PNG alongside the HDR output
+        if output_file_path:
+            Image.fromarray(float_to_ldr(final_array), 'RGBA').save(output_file_path, "PNG")
+    else:
+        # Preallocated final image (transparent black); every face is written into it exactly once
+        final_array = np.zeros((final_height, final_width, 4), dtype=np.uint8)
+        
+        # Loop over the TARGET SLOTS 
+        for target_slot in TARGET_SLOTS:
+            fill_slot(target_slot, final_array, *COORDS[target_slot])
 
-    # --- 5. Save the final image and Clean up ---
-    final_image.save(output_file_path, "PNG")
+        # --- 5. Save the final image ---
+        Image.fromarray(final_array, 'RGBA').save(output_file_path, "PNG")
+    
+    # --- 6. Optional equirectangular copy of the stitched cubemap ---
+    if equirect_output_path:
+        try:
+            save_equirect(final_array, base_unit_size, equirect_output_path)
+        except Exception as e:
+            print(f"Error saving equirectangular output: {e}")
+            return False
+    
     print("-" * 50)
-    print(f"SUCCESS: Stitched cubemap saved to: {os.path.abspath(output_file_path)}")
+    print(f"SUCCESS: Stitched cubemap saved to: {os.path.abspath(output_file_path or hdr_output_path)}")
     print(f"Final resolution: {final_width}x{final_height}")
+    print("-" * 50)
+
+    return True
+
 
-    # Clean up temporary files
-    for f in temp_files:
+# --- Batch conversion ---
+# Every worker holds a whole cubemap in memory, so the default pool stays small
+BATCH_DEFAULT_WORKERS = 4
+
+def find_skybox_sets_recursive(root_dir):
+    """
+    Finds every complete skybox in root_dir and its subfolders.
+    Returns a list of (name, file_map). Names are the face filename prefixes; when several
+    folders contain a skybox with the same prefix, the folder path is prepended to keep them apart.
+    """
+    found = []
+    for dirpath, dirnames, _ in os.walk(root_dir):
+        dirnames.sort()
+        for prefix, file_map in find_cubemap_sets(dirpath):
+            # Faces named just 'up.vtf', 'dn.vtf', ... take the folder name
+            found.append((dirpath, prefix or os.path.basename(os.path.abspath(dirpath)), file_map))
+
+    name_counts = {}
+    for _, name, _ in found:
+        name_counts[name] = name_counts.get(name, 0) + 1
+
+    sets = []
+    for dirpath, name, file_map in found:
+        relative_dir = os.path.relpath(dirpath, root_dir)
+        if name_counts[name] > 1 and relative_dir != '.':
+            name = f"{relative_dir.replace(os.sep, '_')}_{name}"
+        sets.append((name, file_map))
+    return sets
+
+def convert_skybox_set(name, file_map, output_dir, create_skybox_vmat=False, create_moondome_vmat=False,
+                       streaming=False, hdr_format='', write_png=True, equirect_format=''):
+    """
+    Stitches one skybox into output_dir as <name>.png (and/or <name>.<hdr_format>) and
+    writes the requested VMATs next to it. With equirect_format ('png', 'exr' or 'pfm') an
+    equirectangular <name>_equirect.<format> is written as well. Returns True on success.
+    """
+    output_path = os.path.join(output_dir, f"{name}.png") if (write_png or not hdr_format) else None
+    hdr_output_path = os.path.join(output_dir, f"{name}.{hdr_format}") if hdr_format else None
+    equirect_output_path = os.path.join(output_dir, f"{name}_equirect.{equirect_format}") if equirect_format else None
+    
+    # Engine texture path for VMAT (always relative: materials/skybox/filename); HDR-only output is referenced directly
+    sky_texture_path = f"materials/skybox/{os.path.basename(output_path or hdr_output_path)}"
+    
+    success = stitch_cubemap_rotated(file_map, output_path, output_dir, streaming=streaming,
+                                     hdr_output_path=hdr_output_path, equirect_output_path=equirect_output_path)
+    
+    if success and (create_skybox_vmat or create_moondome_vmat):
+        create_vmat_files_conditionally(os.path.join(output_dir, f"skybox_{name}.vmat"),
+                                        os.path.join(output_dir, f"moondome_{name}.vmat"),
+                                        sky_texture_path, create_skybox_vmat, create_moondome_vmat)
+    return success
+
+def _convert_set_job(name, file_map, output_dir, options):
+    """Process pool entry point: converts one skybox with its console output captured. Returns (success, log)."""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
         try:
-            os.remove(f)
-        except OSError as e:
-            print(f"Warning: Could not remove temporary file {f}: {e}")
+            success = convert_skybox_set(name, file_map, output_dir, **options)
+        except Exception as e:
+            print(f"Error converting skybox '{name}': {e}")
+            success = False
+    return success, log.getvalue()
 
-    if temp_files:
-        print(f"Cleaned up {len(temp_files)} temporary converted files inside '{temp_dir}'.")
+def convert_skybox_batch(skybox_sets, output_dir, max_workers=None, progress_callback=None, cancel_event=None, **options):
+    """
+    Converts many skyboxes in parallel on a bounded process pool.
     
-    print("-" * 50)
+    Args:
+        skybox_sets: List of (name, file_map), e.g. from find_skybox_sets_recursive
+        output_dir: Folder receiving every <name>.png and its VMATs
+        max_workers: Worker processes. If None, uses min(CPU count, BATCH_DEFAULT_WORKERS)
+        progress_callback: Called on the calling thread after every skybox as
+            progress_callback(done, total, name, success, log)
+        cancel_event: Optional threading.Event; once set, no further skyboxes are started
+        **options: Passed to convert_skybox_set (create_skybox_vmat, streaming, hdr_format, ...)
+    
+    Returns:
+        dict: converted, failed, cancelled (skyboxes never started), results [(name, success, log)], seconds
+    """
+    total = len(skybox_sets)
+    max_workers = max(1, min(max_workers or min(os.cpu_count() or 1, BATCH_DEFAULT_WORKERS), total))
+    stats = {'converted': 0, 'failed': 0, 'cancelled': 0, 'results': []}
+    start_time = time.perf_counter()
+    
+    def record(name, result):
+        success, log = result
+        stats['converted' if success else 'failed'] += 1
+        stats['results'].append((name, success, log))
+        if progress_callback:
+            progress_callback(len(stats['results']), total, name, success, log)
+    
+    if max_workers == 1:
+        # Not worth starting worker processes
+        for name, file_map in skybox_sets:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            record(name, _convert_set_job(name, file_map, output_dir, options))
+    else:
+        pending = iter(skybox_sets)
+        in_flight = {}
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            def submit_next():
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                skybox_set = next(pending, None)
+                if skybox_set is not None:
+                    name, file_map = skybox_set
+                    in_flight[executor.submit(_convert_set_job, name, file_map, output_dir, options)] = name
+            
+            # One skybox in flight per worker: each is large, and cancellation takes effect sooner
+            for _ in range(max_workers):
+                submit_next()
+            
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = (False, f"Worker error: {e}")
+                    record(name, result)
+                    submit_next()
+    
+    stats['seconds'] = time.perf_counter() - start_time
+    stats['cancelled'] = total - len(stats['results'])
+    return stats
 
-    return True
+def last_log_line(log):
+    """Last non-empty line of a captured conversion log (the error or the SUCCESS line)."""
+    lines = [line.strip() for line in log.splitlines() if line.strip(' =-')]
+    return lines[-1] if lines else ""
 
 
 # ==============================================================================
@@ -1066,35 +1638,67 @@ if __name__ == "__main__":
     CREATE_SKYBOX_VMAT = os.environ.get('CREATE_SKYBOX_VMAT', '0') == '1'
     CREATE_MOONDOME_VMAT = os.environ.get('CREATE_MOONDOME_VMAT', '0') == '1'
     CLEANUP_SOURCE_FILES = os.environ.get('CLEANUP_SOURCE_FILES', '0') == '1'
+    # Write the stitched PNG band by band to bound memory on very large skyboxes
+    STREAMING = os.environ.get('SKYBOX_STREAMING', '0') == '1'
+    # Optional float output ('exr' or 'pfm'); the LDR PNG is still written unless SKYBOX_WRITE_PNG=0
+    HDR_FORMAT = os.environ.get('SKYBOX_HDR_FORMAT', '').lower().lstrip('.')
+    WRITE_PNG = os.environ.get('SKYBOX_WRITE_PNG', '1') == '1'
+    # Equirectangular panorama to use instead of six faces, and optional panorama output ('png', 'exr' or 'pfm')
+    EQUIRECT_INPUT = os.environ.get('SKYBOX_EQUIRECT_INPUT', '')
+    EQUIRECT_FORMAT = os.environ.get('SKYBOX_EQUIRECT_OUTPUT', '').lower().lstrip('.')
     
-    # 1. Find the 6 required cubemap files by keyword
-    file_map = find_cubemap_files(INPUT_DIRECTORY)
+    # Convert every skybox found under SKYBOX_INPUT_DIR (recursively) instead of a single set
+    BATCH = os.environ.get('SKYBOX_BATCH', '0') == '1'
+    BATCH_WORKERS = int(os.environ.get('SKYBOX_WORKERS', '0')) or None
+    
+    if BATCH:
+        import multiprocessing
+        multiprocessing.freeze_support()
+        
+        skybox_sets = find_skybox_sets_recursive(INPUT_DIRECTORY)
+        print(f"\n--- Batch mode: found {len(skybox_sets)} complete skybox(es) under '{os.path.abspath(INPUT_DIRECTORY)}' ---")
+        
+        def report(done, total, name, success, log):
+            print(f"[{done}/{total}] {'OK  ' if success else 'FAIL'} {name}: {last_log_line(log)}")
+        
+        stats = convert_skybox_batch(skybox_sets, OUTPUT_DIR, max_workers=BATCH_WORKERS, progress_callback=report,
+                                     create_skybox_vmat=CREATE_SKYBOX_VMAT, create_moondome_vmat=CREATE_MOONDOME_VMAT,
+                                     streaming=STREAMING, hdr_format=HDR_FORMAT, write_png=WRITE_PNG,
+                                     equirect_format=EQUIRECT_FORMAT)
+        
+        # Full logs of failed skyboxes, printed once everything has finished
+        for name, success, log in stats['results']:
+            if not success:
+                print(f"\n===== {name} =====\n{log}")
+        
+        if CLEANUP_SOURCE_FILES:
+            converted = {name for name, success, _ in stats['results'] if success}
+            clean_up_original_source_files([path for name, file_map in skybox_sets if name in converted
+                                            for path in file_map.values()])
+        
+        print("-" * 50)
+        print(f"Batch complete: {stats['converted']} converted, {stats['failed']} failed, "
+              f"{stats['cancelled']} not started ({stats['seconds']:.1f}s)")
+        sys.exit(1 if stats['failed'] else 0)
+    
+    # 1. Find the 6 required cubemap files by keyword (or use the given panorama)
+    if EQUIRECT_INPUT:
+        print(f"Using equirectangular panorama: {EQUIRECT_INPUT}")
+        file_map = {EQUIRECT_KEY: EQUIRECT_INPUT}
+    else:
+        file_map = find_cubemap_files(INPUT_DIRECTORY)
     
     # 2. Use the user-provided prefix from environment variable
     DYNAMIC_PREFIX = os.environ.get('SKYBOX_PREFIX', 'skybox_custom')
     print(f"\n--- Using User-Provided Skybox Prefix: '{DYNAMIC_PREFIX}' ---")
     
-    # 3. Update all global paths and filenames based on the new prefix
-    # Output file paths
-    FINAL_OUTPUT_FILENAME = f"{DYNAMIC_PREFIX}.png"
-    FINAL_SKYBOX_VMAT_FILENAME = f"skybox_{DYNAMIC_PREFIX}.vmat"
-    FINAL_MOONDOME_VMAT_FILENAME = f"moondome_{DYNAMIC_PREFIX}.vmat"
-    
-    # Engine texture path for VMAT (always relative: materials/skybox/filename.png)
-    SKYTEXTURE_PATH = f"materials/skybox/{FINAL_OUTPUT_FILENAME}"
-
-    FINAL_OUTPUT_PATH = os.path.join(OUTPUT_DIR, FINAL_OUTPUT_FILENAME)
-    FINAL_SKYBOX_VMAT_PATH = os.path.join(OUTPUT_DIR, FINAL_SKYBOX_VMAT_FILENAME)
-    FINAL_MOONDOME_VMAT_PATH = os.path.join(OUTPUT_DIR, FINAL_MOONDOME_VMAT_FILENAME)
-    
-    # 4. Convert and stitch the found files
-    success = stitch_cubemap_rotated(file_map, FINAL_OUTPUT_PATH, OUTPUT_DIR)
-    
-    # 5. Optional VMAT creation after successful stitching
-    if success and (CREATE_SKYBOX_VMAT or CREATE_MOONDOME_VMAT):
-        create_vmat_files_conditionally(FINAL_SKYBOX_VMAT_PATH, FINAL_MOONDOME_VMAT_PATH, SKYTEXTURE_PATH, CREATE_SKYBOX_VMAT, CREATE_MOONDOME_VMAT)
+    # 3. Convert and stitch the found files, then create the optional VMATs
+    success = convert_skybox_set(DYNAMIC_PREFIX, file_map, OUTPUT_DIR,
+                                 create_skybox_vmat=CREATE_SKYBOX_VMAT, create_moondome_vmat=CREATE_MOONDOME_VMAT,
+                                 streaming=STREAMING, hdr_format=HDR_FORMAT, write_png=WRITE_PNG,
+                                 equirect_format=EQUIRECT_FORMAT)
         
-    # 6. Optional source file cleanup after VMAT creation
+    # 4. Optional source file cleanup after VMAT creation
     if success:
         # Check if we have original file paths to clean up
         original_paths = os.environ.get('ORIGINAL_FILE_PATHS', '')
@@ -1106,7 +1710,7 @@ if __name__ == "__main__":
             # Fallback to cleaning up temporary files only
             clean_up_source_files_conditionally(file_map, INPUT_DIRECTORY, CLEANUP_SOURCE_FILES)
         
-    # 7. Final Confirmation and Auto-Exit
+    # 5. Final Confirmation and Auto-Exit
     print("\n" + "=" * 50)
     if success:
         print(f"PROCESS COMPLETE: All output files were created in the '{OUTPUT_DIR}' folder.")
@@ -1,13 +1,25 @@
 import sys
 import os
+import csv
+import json
+import time
 import subprocess
 import tempfile
+import queue
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import numpy as np
 from PIL import Image, ImageTk
 import tkinter as tk
 from tkinter import filedialog
 from tkinter import messagebox
 from PIL import Image, ImageDraw, ImageFont # Ensure all PIL components are imported
 
+# Import the layout engine from the scripts directory
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+from worldtext_layout import build_glyph_metrics, layout_text
+
 # Helper function for PyInstaller resource paths
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -39,41 +51,50 @@ ACCENT_BLUE = "#2196F3"  # Blue accent
 TITLE_BAR_BG = "#1f1f1f"  # Custom title bar background
 TITLE_BAR_HEIGHT = 30
 
+# Canvas sizes accepted by point_worldtext (powers of two from 8 to 8192)
+VALID_RESOLUTIONS = [8 * (2**n) for n in range(11)]
+
+# Live preview timings and the size of the cached preview copy
+PREVIEW_DEBOUNCE_MS = 300  # Wait after the last edit before re-rendering
+RESIZE_DEBOUNCE_MS = 100  # Wait after the last frame resize before rescaling the preview
+RENDER_POLL_MS = 50  # How often the GUI checks for finished background renders
+PREVIEW_MAX_SIZE = 1024  # Longest side of the downsampled preview copy
+
+# Font menu entry for the per-character PNGs in the chars folder
+DEFAULT_FONT_LABEL = "Default"
+
 # --- Core Logic Functions ---
 
-def extract_characters(input_image_path, output_folder="chars"):
-    """Extracts individual characters from a character sheet image."""
+def _find_content_runs(has_content):
+    """Returns (start, end) pairs for each run of True values in a 1D boolean array."""
+    padded = np.concatenate(([False], has_content, [False])).astype(np.int8)
+    edges = np.flatnonzero(np.diff(padded))
+    return list(zip(edges[0::2].tolist(), edges[1::2].tolist()))
+
+def extract_characters(input_image_path, output_folder="chars", atlas_name=None):
+    """
+    Extracts individual characters from a character sheet image.
+    
+    By default every character is saved as its own PNG. With atlas_name, all characters
+    are packed into <atlas_name>.atlas.png plus a <atlas_name>.atlas.json index in output_folder instead.
+    """
     img = Image.open(input_image_path).convert('RGBA')
-    width, height = img.size
     
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     
-    pixels = img.load()
+    pixels = np.asarray(img)
+    rgb = pixels[..., :3]
     
-    # Find rows (vertical segmentation)
-    rows = []
-    in_row = False
-    start_y = 0
-    
-    for y in range(height):
-        row_has_content = False
-        for x in range(width):
-            r, g, b, a = pixels[x, y]
-            # Check for non-white/transparent content
-            if r < 250 or g < 250 or b < 250:
-                row_has_content = True
-                break
-        
-        if row_has_content and not in_row:
-            start_y = y
-            in_row = True
-        elif not row_has_content and in_row:
-            rows.append((start_y, y))
-            in_row = False
+    # Non-white content mask (alpha is ignored, same as the sheet's white background)
+    content_mask = (rgb < 250).any(axis=2)
     
-    if in_row:
-        rows.append((start_y, height))
+    # Make white transparent across the whole sheet with a single mask
+    white_mask = (rgb > 250).all(axis=2)
+    img.paste((255, 255, 255, 0), mask=Image.fromarray(white_mask))
+    
+    # Find rows (vertical segmentation)
+    rows = _find_content_runs(content_mask.any(axis=1))
     
     # Character mapping structure (must match the rows in the sheet)
     char_rows = [
@@ -83,55 +104,28 @@ def extract_characters(input_image_path, output_folder="chars"):
         ['!', '"', '#', '$', '%', '&', "'", '(', ')', '*', '+', ',', '-', '.', '/', ':', ';', '<', '=', '>', '?', '@', '[', '\\', ']', '^', '_', '`', '{', '|', '}', '~'] # Symbols
     ]
     
+    packed_glyphs = {}
+    
     for row_idx, (y1, y2) in enumerate(rows):
         if row_idx >= len(char_rows):
             break
         
-        row_img = img.crop((0, y1, width, y2))
-        row_pixels = row_img.load()
-        row_width = row_img.width
-        
         # Find characters in this row (horizontal segmentation)
-        chars = []
-        in_char = False
-        start_x = 0
-        
-        for x in range(row_width):
-            col_has_content = False
-            for y in range(row_img.height):
-                r, g, b, a = row_pixels[x, y]
-                if r < 250 or g < 250 or b < 250:
-                    col_has_content = True
-                    break
-            
-            if col_has_content and not in_char:
-                start_x = x
-                in_char = True
-            elif not col_has_content and in_char:
-                chars.append((start_x, x))
-                in_char = False
-        
-        if in_char:
-            chars.append((start_x, row_width))
+        chars = _find_content_runs(content_mask[y1:y2].any(axis=0))
         
         # Save individual character images
         for char_idx, (x1, x2) in enumerate(chars):
             if char_idx >= len(char_rows[row_idx]):
                 break
             
-            char_img = row_img.crop((x1, 0, x2, row_img.height))
-            
-            # Make white transparent
-            data = char_img.getdata()
-            new_data = []
-            for item in data:
-                if item[0] > 250 and item[1] > 250 and item[2] > 250:
-                    new_data.append((255, 255, 255, 0))
-                else:
-                    new_data.append(item)
-            char_img.putdata(new_data)
+            char_img = img.crop((x1, y1, x2, y2))
             
             char_name = char_rows[row_idx][char_idx]
+            if atlas_name:
+                # The character name is the glyph's lookup key
+                packed_glyphs[char_name] = char_img
+                continue
+            
             safe_name = char_name
             
             # 1. Digits ('0' to '9'): Use underscore prefix (e.g., '0' -> '_0')
@@ -150,135 +144,252 @@ def extract_characters(input_image_path, output_folder="chars"):
             filepath = os.path.join(output_folder, f"{safe_name}.png")
             char_img.save(filepath)
     
-def stitch_text(text, chars_folder="chars", output_path="stitched_output.png", space_width_ratio=0.5, scale_factor=1.0, canvas_width=512, canvas_height=512):
-    """Stitches characters together to form a text image with auto-scaling to fill the canvas. Supports multiple lines."""
-    char_images = {}
+    if atlas_name:
+        save_packed_atlas(packed_glyphs, os.path.join(output_folder, atlas_name))
     
-    # Load all extracted character images
-    for filename in os.listdir(chars_folder):
-        if filename.endswith('.png'):
-            char_name = filename[:-4]
-            char_key = None
-            
-            # 1. Check for prefixed digits (e.g., '_1.png' -> key '1')
-            if char_name.startswith('_') and char_name[1:].isdigit() and len(char_name) == 2:
-                char_key = char_name[1] # The key is the digit itself ('1', '2', etc.)
-            
-            # 2. Check for symbols (e.g., '33.png' -> key '!')
-            elif char_name.isdigit():
-                try:
-                    # Convert the numerical filename back to the character key (e.g., '33' -> '!')
-                    char_key = chr(int(char_name))
-                except ValueError:
-                    continue # Skip if it's a number that isn't a valid ASCII code
-
-            # 3. Check for lowercase letters (e.g., 'a.png' -> key 'a')
-            elif len(char_name) == 1 and char_name.islower():
-                char_key = char_name
-            
-            # 4. Check for uppercase/double letters (e.g., 'aa.png' -> key 'aa' for 'A')
-            elif len(char_name) == 2 and char_name.islower() and char_name[0] == char_name[1]:
-                char_key = char_name
-            
-            if char_key:
-                try:
-                    char_images[char_key] = Image.open(os.path.join(chars_folder, filename))
-                except Exception:
-                    # Skip corrupted or unreadable files
-                    continue
-    
-    # Split text into lines
-    lines = text.split('\n')
-    spacing = 5 # Fixed spacing between characters
-    line_spacing = 10 # Spacing between lines
-    
-    # Calculate dimensions for each line
-    line_data = []
-    max_line_width = 0
-    total_height = 0
-    
-    for line in lines:
-        line_width = 0
-        line_height = 0
-        
-        for char in line:
-            # Map uppercase letters to their lookup key
-            if char.isupper():
-                char_lookup_key = char.lower() * 2
-            else:
-                char_lookup_key = char
-            
-            if char == ' ':
-                # Calculate space width based on average char height (will refine later)
-                line_width += 50 # placeholder
-            elif char_lookup_key in char_images:
-                img = char_images[char_lookup_key]
-                line_width += img.width + spacing
-                line_height = max(line_height, img.height)
-        
-        # Calculate effective space width for this line
-        effective_space_width = int(line_height * space_width_ratio) if line_height > 0 else 25
-        
-        # Recalculate line width with proper space width
-        final_line_width = 0
-        for char in line:
-            if char.isupper():
-                char_lookup_key = char.lower() * 2
-            else:
-                char_lookup_key = char
-            
-            if char == ' ':
-                final_line_width += effective_space_width
-            elif char_lookup_key in char_images:
-                final_line_width += char_images[char_lookup_key].width + spacing
-        
-        line_data.append({
-            'text': line,
-            'width': final_line_width,
-            'height': line_height,
-            'space_width': effective_space_width
-        })
-        
-        max_line_width = max(max_line_width, final_line_width)
-        total_height += line_height
+# Process-level glyph cache: absolute chars folder or atlas .json path -> GlyphAtlas
+_glyph_atlas_cache = {}
+
+# Number of scales GlyphAtlas.scaled_glyph keeps resized glyphs for
+MAX_CACHED_GLYPH_SCALES = 8
+
+# Gap between glyphs in a packed atlas so sampling never bleeds into a neighbour
+ATLAS_PADDING = 1
+# Suffix of packed atlas files, so they never collide with (or get loaded as) per-character PNGs
+ATLAS_SUFFIX = ".atlas"
+
+class GlyphAtlas:
+    """Decoded glyphs of a chars folder or packed atlas, stored as RGBA arrays ready to blit."""
+    def __init__(self, signature, glyphs):
+        self.signature = signature  # Sorted (filename, mtime_ns, size) of every source file
+        self.glyphs = glyphs  # Lookup key ('1', '!', 'a', 'aa') -> uint8 array (h, w, 4)
+        self.metrics = build_glyph_metrics(glyphs)  # Input character -> (width, height, lookup key)
+        self._scaled_glyphs = {}  # Scale -> {lookup key: resized PIL image}, see scaled_glyph()
     
-    # Add spacing between lines
-    if len(lines) > 1:
-        total_height += line_spacing * (len(lines) - 1)
+    def scaled_glyph(self, lookup_key, scale):
+        """Returns the glyph resized by scale, resampling each glyph only once per scale."""
+        scaled = self._scaled_glyphs.get(scale)
+        if scaled is None:
+            # Keep only the most recent scales (the GUI slider produces many)
+            if len(self._scaled_glyphs) >= MAX_CACHED_GLYPH_SCALES:
+                self._scaled_glyphs.pop(next(iter(self._scaled_glyphs)))
+            scaled = self._scaled_glyphs[scale] = {}
+        
+        glyph_img = scaled.get(lookup_key)
+        if glyph_img is None:
+            glyph = self.glyphs[lookup_key]
+            glyph_h, glyph_w = glyph.shape[:2]
+            size = (max(1, round(glyph_w * scale)), max(1, round(glyph_h * scale)))
+            glyph_img = Image.fromarray(glyph).resize(size, Image.Resampling.LANCZOS)
+            scaled[lookup_key] = glyph_img
+        return glyph_img
+
+def _glyph_key_from_filename(char_name):
+    """Maps a glyph file name (without .png) back to its lookup key, or None if it isn't a glyph."""
+    # 1. Check for prefixed digits (e.g., '_1.png' -> key '1')
+    if char_name.startswith('_') and char_name[1:].isdigit() and len(char_name) == 2:
+        return char_name[1] # The key is the digit itself ('1', '2', etc.)
     
-    if max_line_width == 0 or total_height == 0:
-        return None
+    # 2. Check for symbols (e.g., '33.png' -> key '!')
+    if char_name.isdigit():
+        try:
+            # Convert the numerical filename back to the character key (e.g., '33' -> '!')
+            return chr(int(char_name))
+        except ValueError:
+            return None # Skip if it's a number that isn't a valid ASCII code
+
+    # 3. Check for lowercase letters (e.g., 'a.png' -> key 'a')
+    if len(char_name) == 1 and char_name.islower():
+        return char_name
     
-    # Create the stitched image at native size
-    stitched_img = Image.new('RGBA', (max_line_width, total_height), (0, 0, 0, 0))
+    # 4. Check for uppercase/double letters (e.g., 'aa.png' -> key 'aa' for 'A')
+    if len(char_name) == 2 and char_name.islower() and char_name[0] == char_name[1]:
+        return char_name
     
-    # Render each line
-    y_offset = 0
-    for line_info in line_data:
-        line = line_info['text']
-        line_height = line_info['height']
-        space_width = line_info['space_width']
+    return None
+
+def _chars_folder_signature(chars_folder):
+    """Returns the sorted (filename, mtime_ns, size) of every PNG in the folder."""
+    entries = []
+    with os.scandir(chars_folder) as it:
+        for entry in it:
+            if entry.name.endswith('.png') and entry.is_file():
+                stat = entry.stat()
+                entries.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(entries))
+
+def _read_chars_folder(folder, signature):
+    """Decodes every glyph PNG listed in the folder signature. Returns lookup key -> RGBA PIL image."""
+    char_images = {}
+    for filename, _, _ in signature:
+        char_key = _glyph_key_from_filename(filename[:-4])
+        if not char_key:
+            continue
         
-        x_offset = 0
-        for char in line:
-            if char.isupper():
-                char_lookup_key = char.lower() * 2
-            else:
-                char_lookup_key = char
-            
-            if char == ' ':
-                x_offset += space_width
-            elif char_lookup_key in char_images:
-                img = char_images[char_lookup_key]
-                stitched_img.paste(img, (x_offset, y_offset), img)
-                x_offset += img.width + spacing
-        
-        y_offset += line_height + line_spacing
+        try:
+            with Image.open(os.path.join(folder, filename)) as char_img:
+                char_images[char_key] = char_img.convert('RGBA')
+        except Exception:
+            # Skip corrupted or unreadable files
+            continue
+    return char_images
+
+def _premask_glyph(char_img):
+    """Pre-applies a glyph's own alpha mask so rendering is a plain array copy."""
+    # Same result as pasting it with itself as mask onto a transparent canvas
+    glyph = Image.new('RGBA', char_img.size, (0, 0, 0, 0))
+    glyph.paste(char_img, (0, 0), char_img)
+    return np.asarray(glyph)
+
+def load_glyph_atlas(chars_folder="chars"):
+    """
+    Returns the glyph atlas for chars_folder, decoding only when a source file was added, removed or changed.
+    
+    chars_folder is either a folder of per-character PNGs or the .json index of a packed atlas.
+    """
+    if chars_folder.lower().endswith('.json'):
+        return _load_packed_atlas(chars_folder)
+    
+    folder = os.path.abspath(chars_folder)
+    signature = _chars_folder_signature(folder)
+    
+    atlas = _glyph_atlas_cache.get(folder)
+    if atlas is not None and atlas.signature == signature:
+        return atlas
+    
+    glyphs = {key: _premask_glyph(char_img) for key, char_img in _read_chars_folder(folder, signature).items()}
+    
+    atlas = GlyphAtlas(signature, glyphs)
+    _glyph_atlas_cache[folder] = atlas
+    return atlas
+
+# --- Packed Glyph Atlas ---
+
+def save_packed_atlas(glyph_images, atlas_path):
+    """
+    Packs glyphs into one sprite sheet and writes <atlas_path>.atlas.png plus a <atlas_path>.atlas.json index.
+    
+    Args:
+        glyph_images: Lookup key ('1', '!', 'a', 'aa') -> RGBA PIL image
+        atlas_path: Output path without suffix or extension
+    
+    Returns:
+        Path of the written .json index
+    """
+    if not glyph_images:
+        raise ValueError("No glyphs to pack")
+    
+    # Shelf packing: tallest glyphs first, rows up to a power-of-two width
+    keys = sorted(glyph_images, key=lambda k: (-glyph_images[k].height, k))
+    area = sum((img.width + ATLAS_PADDING) * (img.height + ATLAS_PADDING) for img in glyph_images.values())
+    atlas_width = 1
+    while atlas_width * atlas_width < area:
+        atlas_width *= 2
+    atlas_width = max(atlas_width, max(img.width for img in glyph_images.values()))
+    
+    rects = {}
+    x = y = shelf_height = 0
+    for key in keys:
+        img = glyph_images[key]
+        if x + img.width > atlas_width:
+            x = 0
+            y += shelf_height + ATLAS_PADDING
+            shelf_height = 0
+        rects[key] = (x, y, img.width, img.height)
+        x += img.width + ATLAS_PADDING
+        shelf_height = max(shelf_height, img.height)
+    atlas_height = y + shelf_height
+    
+    sheet = Image.new('RGBA', (atlas_width, atlas_height), (0, 0, 0, 0))
+    index = {}
+    for key, (x, y, w, h) in rects.items():
+        sheet.paste(glyph_images[key], (x, y))
+        index[key] = {
+            'x': x, 'y': y, 'w': w, 'h': h,
+            'uv': [x / atlas_width, y / atlas_height, (x + w) / atlas_width, (y + h) / atlas_height]
+        }
+    
+    os.makedirs(os.path.dirname(os.path.abspath(atlas_path)), exist_ok=True)
+    image_path = atlas_path + ATLAS_SUFFIX + ".png"
+    json_path = atlas_path + ATLAS_SUFFIX + ".json"
+    sheet.save(image_path)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'image': os.path.basename(image_path),
+            'width': atlas_width,
+            'height': atlas_height,
+            'glyphs': index
+        }, f, indent=2, ensure_ascii=False)
+    return json_path
+
+def pack_chars_folder(chars_folder="chars", atlas_name="default"):
+    """Packs an existing folder of per-character PNGs into <chars_folder>/<atlas_name>.atlas.png/.json."""
+    # Pack the glyphs as stored on disk, the alpha mask is applied again when the atlas is loaded
+    glyph_images = _read_chars_folder(chars_folder, _chars_folder_signature(chars_folder))
+    return save_packed_atlas(glyph_images, os.path.join(chars_folder, atlas_name))
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (os.path.basename(path), stat.st_mtime_ns, stat.st_size)
+
+def _load_packed_atlas(json_path):
+    """Loads a packed atlas: one index read and one image decode for every glyph."""
+    json_path = os.path.abspath(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    image_path = os.path.join(os.path.dirname(json_path), index['image'])
+    signature = (_file_signature(json_path), _file_signature(image_path))
+    
+    atlas = _glyph_atlas_cache.get(json_path)
+    if atlas is not None and atlas.signature == signature:
+        return atlas
+    
+    with Image.open(image_path) as sheet:
+        sheet = sheet.convert('RGBA')
+    
+    glyphs = {}
+    for key, rect in index['glyphs'].items():
+        x, y, w, h = rect['x'], rect['y'], rect['w'], rect['h']
+        glyphs[key] = _premask_glyph(sheet.crop((x, y, x + w, y + h)))
+    
+    atlas = GlyphAtlas(signature, glyphs)
+    _glyph_atlas_cache[json_path] = atlas
+    return atlas
+
+def list_fonts(chars_folder="chars"):
+    """Returns the names of the packed atlases (fonts) in chars_folder."""
+    try:
+        suffix = ATLAS_SUFFIX + ".json"
+        return sorted(name[:-len(suffix)] for name in os.listdir(chars_folder) if name.lower().endswith(suffix))
+    except FileNotFoundError:
+        return []
+
+def glyph_source(chars_folder="chars", font=None):
+    """Returns what load_glyph_atlas should read: the named packed atlas, or the per-character PNG folder."""
+    if font:
+        return os.path.join(chars_folder, f"{font}{ATLAS_SUFFIX}.json")
+    return chars_folder
+
+def stitch_text(text, chars_folder="chars", output_path="stitched_output.png", space_width_ratio=0.5, scale_factor=1.0, canvas_width=512, canvas_height=512, render_at_target=False):
+    """
+    Stitches characters together to form a text image with auto-scaling to fill the canvas. Supports multiple lines.
+    
+    With render_at_target, each glyph is resized once (memoized per scale) and composited
+    straight onto the canvas instead of resizing a native-size image of the whole text.
+    """
+    atlas = load_glyph_atlas(chars_folder)
+    
+    # 1. Lay out all lines in one pass
+    layout = layout_text(text, atlas.metrics, space_width_ratio)
+    if layout is None:
+        return None
+    
+    max_line_width, total_height, placements = layout
             
     # 2. Auto-calculate scale factor to fill canvas
     # Calculate scale factors for both width and height
-    scale_w = canvas_width / stitched_img.width if stitched_img.width > 0 else 1.0
-    scale_h = canvas_height / stitched_img.height if stitched_img.height > 0 else 1.0
+    scale_w = canvas_width / max_line_width
+    scale_h = canvas_height / total_height
     
     # Use the smaller scale factor to ensure the text fits entirely within canvas
     auto_scale = min(scale_w, scale_h)
@@ -286,26 +397,186 @@ def stitch_text(text, chars_folder="chars", output_path="stitched_output.png", s
     # Apply both user scale and auto scale
     final_scale = scale_factor * auto_scale
     
-    scaled_w = int(stitched_img.width * final_scale)
-    scaled_h = int(stitched_img.height * final_scale)
-    
-    # Use LANCZOS for high-quality resizing
-    scaled_img = stitched_img.resize((scaled_w, scaled_h), Image.Resampling.LANCZOS)
+    scaled_w = int(max_line_width * final_scale)
+    scaled_h = int(total_height * final_scale)
 
     # 3. Create Final Canvas ("Resolution")
     final_canvas = Image.new('RGBA', (canvas_width, canvas_height), (0, 0, 0, 0))
     
     # Calculate position to center the scaled text on the canvas
-    paste_x = max(0, (canvas_width - scaled_img.width) // 2)
-    paste_y = max(0, (canvas_height - scaled_img.height) // 2)
-
-    # Paste the scaled text onto the center of the fixed-size canvas
-    final_canvas.paste(scaled_img, (paste_x, paste_y), scaled_img)
+    paste_x = max(0, (canvas_width - scaled_w) // 2)
+    paste_y = max(0, (canvas_height - scaled_h) // 2)
+    
+    if render_at_target:
+        # Composite pre-scaled glyphs directly at their scaled positions
+        for lookup_key, x, y in placements:
+            glyph_img = atlas.scaled_glyph(lookup_key, final_scale)
+            final_canvas.alpha_composite(glyph_img, (paste_x + round(x * final_scale), paste_y + round(y * final_scale)))
+    else:
+        # Create the stitched image at native size and blit each glyph at its position
+        stitched = np.zeros((total_height, max_line_width, 4), dtype=np.uint8)
+        for lookup_key, x, y in placements:
+            glyph = atlas.glyphs[lookup_key]
+            glyph_h, glyph_w = glyph.shape[:2]
+            # Glyphs never overlap, so blitting the pre-masked array equals an alpha paste
+            stitched[y:y + glyph_h, x:x + glyph_w] = glyph
+        
+        stitched_img = Image.fromarray(stitched)
+        
+        # Use LANCZOS for high-quality resizing
+        scaled_img = stitched_img.resize((scaled_w, scaled_h), Image.Resampling.LANCZOS)
+        
+        # Paste the scaled text onto the center of the fixed-size canvas
+        final_canvas.paste(scaled_img, (paste_x, paste_y), scaled_img)
     
     # Save the final canvas
     final_canvas.save(output_path)
     return output_path, final_canvas # Return both path and PIL image object
 
+def _peak_rss_mb():
+    """Returns the peak resident set size of this process in MB, or None if unavailable."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is in bytes on macOS and in KB on Linux
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except Exception:
+        return None
+
+def _benchmark_render(text, chars_folder, canvas_width, canvas_height, render_at_target, repeats):
+    """Worker: times stitch_text in a fresh process. Returns (seconds per render, peak RSS MB)."""
+    load_glyph_atlas(chars_folder)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "benchmark.png")
+        start = time.perf_counter()
+        for _ in range(repeats):
+            stitch_text(text, chars_folder=chars_folder, output_path=output_path,
+                        canvas_width=canvas_width, canvas_height=canvas_height,
+                        render_at_target=render_at_target)
+        elapsed = time.perf_counter() - start
+    return elapsed / repeats, _peak_rss_mb()
+
+def benchmark_render_modes(text, chars_folder=None, canvas_width=4096, canvas_height=256, repeats=3):
+    """Compares wall time and peak RSS of the native-size and render-at-target paths, each in its own process."""
+    if chars_folder is None:
+        chars_folder = resource_path("chars")
+    
+    print(f"Benchmarking {len(text)} characters on a {canvas_width}x{canvas_height} canvas ({repeats} run(s) each)")
+    print("-" * 50)
+    
+    results = {}
+    for label, render_at_target in (("native-size", False), ("render-at-target", True)):
+        # A fresh process per mode so peak RSS is not shared between them
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            seconds, peak_mb = executor.submit(_benchmark_render, text, chars_folder, canvas_width,
+                                               canvas_height, render_at_target, repeats).result()
+        results[label] = (seconds, peak_mb)
+        peak_text = f"{peak_mb:.1f} MB" if peak_mb is not None else "n/a"
+        print(f"  {label:<17} {seconds * 1000:9.1f} ms/render   peak RSS {peak_text}")
+    
+    print("-" * 50)
+    return results
+
+# --- Batch Generation ---
+
+def load_batch_manifest(manifest_path):
+    """
+    Loads a batch manifest (.json or .csv) and returns a list of normalized entries.
+    
+    JSON: a list of objects. CSV: a header row. Both use the fields
+    text (required), canvas_width, canvas_height, scale, output and font
+    (name of a packed atlas in the chars folder).
+    """
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise ValueError("JSON manifest must be a list of entries")
+    else:
+        with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+    
+    entries = []
+    for index, row in enumerate(rows, start=1):
+        text = row.get('text')
+        if not text:
+            raise ValueError(f"Manifest entry {index} has no text")
+        
+        canvas_width = int(row.get('canvas_width') or 1024)
+        canvas_height = int(row.get('canvas_height') or 1024)
+        if canvas_width not in VALID_RESOLUTIONS or canvas_height not in VALID_RESOLUTIONS:
+            raise ValueError(f"Manifest entry {index}: canvas size {canvas_width}x{canvas_height} is not a power of two between 8 and 8192")
+        
+        output = row.get('output') or f"worldtext_{index:04d}.png"
+        if not os.path.splitext(output)[1]:
+            output += ".png"
+        
+        entries.append({
+            'text': text,
+            'canvas_width': canvas_width,
+            'canvas_height': canvas_height,
+            'scale': float(row.get('scale') or 1.0),
+            'output': output,
+            'font': row.get('font') or None
+        })
+    
+    return entries
+
+def _render_batch_entry(entry, chars_folder, output_dir):
+    """Worker: renders one manifest entry. Returns (output, seconds, error or None)."""
+    start = time.perf_counter()
+    output_path = os.path.join(output_dir, entry['output'])
+    try:
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        result = stitch_text(
+            entry['text'],
+            chars_folder=glyph_source(chars_folder, entry['font']),
+            output_path=output_path,
+            scale_factor=entry['scale'],
+            canvas_width=entry['canvas_width'],
+            canvas_height=entry['canvas_height']
+        )
+        error = None if result else "no characters found"
+    except Exception as e:
+        error = str(e)
+    return entry['output'], time.perf_counter() - start, error
+
+def run_batch(manifest_path, output_dir=None, chars_folder=None, max_workers=None):
+    """Renders every manifest entry on a process pool. Returns the number of failed entries."""
+    entries = load_batch_manifest(manifest_path)
+    if output_dir is None:
+        output_dir = os.path.dirname(os.path.abspath(manifest_path))
+    if chars_folder is None:
+        chars_folder = resource_path("chars")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    print(f"Rendering {len(entries)} label(s) to: {output_dir}")
+    print("-" * 50)
+    
+    failed = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_render_batch_entry, entry, chars_folder, output_dir) for entry in entries]
+        for future in as_completed(futures):
+            output, seconds, error = future.result()
+            if error:
+                failed += 1
+                print(f"  [FAILED] {output} ({seconds * 1000:.1f} ms): {error}")
+            else:
+                print(f"  [OK] {output} ({seconds * 1000:.1f} ms)")
+    elapsed = time.perf_counter() - start
+    
+    print("-" * 50)
+    print(f"Batch complete: {len(entries) - failed} rendered, {failed} failed")
+    if elapsed > 0:
+        print(f"Total time: {elapsed:.2f} s ({len(entries) / elapsed:.1f} labels/s)")
+    return failed
+
 # --- GUI Application Class ---
 
 class TextStitcherApp:
@@ -366,6 +637,18 @@ class TextStitcherApp:
         self.tk_img = None
         self.last_image_path = "stitched_output.png"
         self.last_pil_image = None
+        self.preview_image = None  # Downsampled copy of last_pil_image used for the display
+        self._displayed_size = None
+        
+        # Background rendering: a single worker thread, only the newest request is shown.
+        # Results come back through a queue polled from the Tk main loop.
+        self._render_executor = ThreadPoolExecutor(max_workers=1)
+        self._render_results = queue.Queue()
+        self._render_generation = 0
+        self._render_future = None
+        self._render_polling = False
+        self._render_after_id = None
+        self._resize_after_id = None
         
         # Create temp directory in user's temp folder (works for all users)
         system_temp = tempfile.gettempdir()
@@ -376,7 +659,7 @@ class TextStitcherApp:
         row_idx = 0
         
         # Create a list of valid resolutions
-        self.valid_resolutions = [8 * (2**n) for n in range(11)]
+        self.valid_resolutions = VALID_RESOLUTIONS
 
         # 1. Text Entry Label
         tk.Label(content_frame, text="Enter Text to Stitch (Ctrl+Enter to generate):", 
@@ -398,6 +681,9 @@ class TextStitcherApp:
         # Bind Ctrl+Enter to generate image (allow normal Enter for new lines)
         self.text_input.bind("<Control-Return>", self.make_image)
         
+        # Live preview: re-render shortly after the user stops typing
+        self.text_input.bind("<<Modified>>", self._on_text_modified)
+        
         # 3. Settings Frame
         settings_frame = tk.Frame(content_frame, bg=DARK_BG)
         settings_frame.grid(row=row_idx, column=0, pady=10)
@@ -456,6 +742,24 @@ class TextStitcherApp:
         self.height_entry.delete(0, tk.END)
         self.height_entry.insert(0, "1024")
         
+        # --- Font Control (only shown when packed atlases exist in the chars folder) ---
+        self.font_var = tk.StringVar(value=DEFAULT_FONT_LABEL)
+        fonts = list_fonts(resource_path("chars"))
+        if fonts:
+            tk.Label(settings_frame, text="Font:", 
+                    font=("Segoe UI", 9),
+                    bg=DARK_BG, fg=DARK_TEXT).grid(row=2, column=0, padx=5, pady=(5, 0), sticky="w")
+            font_menu = tk.OptionMenu(settings_frame, self.font_var, DEFAULT_FONT_LABEL, *fonts)
+            font_menu.config(bg=DARK_BUTTON, fg=DARK_TEXT, 
+                            activebackground=ACCENT_ORANGE, activeforeground=DARK_TEXT,
+                            relief=tk.FLAT, highlightthickness=0)
+            font_menu["menu"].config(bg=DARK_BUTTON, fg=DARK_TEXT, activebackground=ACCENT_ORANGE)
+            font_menu.grid(row=2, column=1, columnspan=3, padx=5, pady=(5, 0), sticky="w")
+        
+        # Live preview also follows the scale, resolution and font settings
+        for var in (self.scale_var, self.width_var, self.height_var, self.font_var):
+            var.trace_add("write", lambda *args: self._schedule_render())
+        
         # 4. Make Button
         self.make_button = tk.Button(content_frame, text="Generate Image", command=lambda: self.make_image(None),
                                      bg=ACCENT_ORANGE, fg=DARK_TEXT,
@@ -609,6 +913,8 @@ class TextStitcherApp:
         self.master.after(100, restore_overrideredirect)
     
     def close_window(self):
+        self._render_generation += 1  # Discard anything still queued on the render thread
+        self._render_executor.shutdown(wait=False, cancel_futures=True)
         self.master.destroy()
     
     def apply_theme(self):
@@ -661,17 +967,17 @@ class TextStitcherApp:
             self.master.after(1000, self.check_theme_updates)
 
     def _update_display_image(self, width, height):
-        """Resizes the last generated image to fit the given dimensions for preview."""
-        if not self.last_pil_image:
+        """Scales the cached preview copy of the last generated image to fit the given dimensions."""
+        if not self.last_pil_image or not self.preview_image:
             self.img_label.config(text="Generated image will appear here.\nClick to open file.", 
                                 image="",
                                 bg=DARK_FRAME, fg=DARK_TEXT_SECONDARY)
             self.tk_img = None
+            self._displayed_size = None
             return
 
-        # The image to display is the LAST GENERATED one (the scaled/canvased output)
-        source_img = self.last_pil_image
-        w, h = source_img.size
+        # Fit the LAST GENERATED image (the scaled/canvased output), but resample from the small preview copy
+        w, h = self.last_pil_image.size
         
         if w > 0 and h > 0 and width > 0 and height > 0:
             # Calculate ratio to fit inside the frame while maintaining aspect ratio
@@ -686,23 +992,38 @@ class TextStitcherApp:
             new_w = max(1, int(w * ratio))
             new_h = max(1, int(h * ratio))
 
+            if (new_w, new_h) == self._displayed_size and self.tk_img:
+                return
+
             if new_w > 0 and new_h > 0:
                 # Use ANTIALIAS/LANCZOS for high-quality resizing
-                display_img = source_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
+                display_img = self.preview_image
+                if display_img.size != (new_w, new_h):
+                    display_img = display_img.resize((new_w, new_h), Image.Resampling.LANCZOS)
                 self.tk_img = ImageTk.PhotoImage(display_img)
                 self.img_label.config(image=self.tk_img, text="")
+                self._displayed_size = (new_w, new_h)
             else:
                 self.img_label.config(text="Generated image is too large/small to display.", image="")
                 self.tk_img = None
+                self._displayed_size = None
         else:
             self.img_label.config(text="Generated image will appear here.\nClick to open file.", image="")
             self.tk_img = None
+            self._displayed_size = None
 
     def _on_frame_resize(self, event):
-        """Called when the image display frame size changes."""
+        """Called when the image display frame size changes. Rescales the preview once resizing settles."""
         # Only proceed if the width or height of the event is valid (sometimes configure fires with 1x1)
         if event.width > 1 and event.height > 1:
-            self._update_display_image(event.width, event.height)
+            if self._resize_after_id:
+                self.master.after_cancel(self._resize_after_id)
+            self._resize_after_id = self.master.after(
+                RESIZE_DEBOUNCE_MS, self._on_frame_resize_settled, event.width, event.height)
+
+    def _on_frame_resize_settled(self, width, height):
+        self._resize_after_id = None
+        self._update_display_image(width, height)
 
     def open_image_file(self, event=None):
         """Opens the last generated PNG file in the default system application."""
@@ -781,95 +1102,185 @@ class TextStitcherApp:
             finally:
                 self.context_menu.grab_release()
 
-    def make_image(self, event):
-        """Generates the image from the input text."""
+    def _on_text_modified(self, event=None):
+        """Schedules a live preview render when the text changes."""
+        if self.text_input.edit_modified():
+            # Reset the flag so the next edit fires <<Modified>> again
+            self.text_input.edit_modified(False)
+            self._schedule_render()
+
+    def _schedule_render(self):
+        """Debounces live preview: renders once no edit happened for PREVIEW_DEBOUNCE_MS."""
+        self._cancel_scheduled_render()
+        self._render_after_id = self.master.after(PREVIEW_DEBOUNCE_MS, self._render_live_preview)
+
+    def _cancel_scheduled_render(self):
+        if self._render_after_id:
+            self.master.after_cancel(self._render_after_id)
+            self._render_after_id = None
+
+    def _render_live_preview(self):
+        self._render_after_id = None
+        params = self._get_render_params(show_errors=False)
+        if params:
+            self._submit_render(params, explicit=False)
+
+    def _get_render_params(self, show_errors):
+        """Reads and validates the input widgets. Returns the stitch parameters, or None if invalid."""
         # Get text, keeping newlines for multiple rows
         text_to_stitch = self.text_input.get("1.0", tk.END).rstrip('\n')  # Keep internal newlines, remove trailing
             
         if not text_to_stitch:
-            self.status_label.config(text="Please enter some text.", fg="red")
-            return "break" if event else None
+            if show_errors:
+                self.status_label.config(text="Please enter some text.", fg="red")
+            return None
 
-        scale_factor = self.scale_var.get()
-        
         try:
+            scale_factor = self.scale_var.get()
             canvas_width = self.width_var.get()
             canvas_height = self.height_var.get()
         except tk.TclError:
             # This handles cases where the user might manually type a non-integer or invalid value
-            messagebox.showerror("Resolution Error", "Canvas dimensions must be valid integers from the list of options.")
-            return "break" if event else None
+            if show_errors:
+                messagebox.showerror("Resolution Error", "Canvas dimensions must be valid integers from the list of options.")
+            return None
 
         # Input validation: Check if the entered value is in the predetermined list.
         # This is a stronger check than just checking for multiples of 8.
         if canvas_width not in self.valid_resolutions or canvas_height not in self.valid_resolutions:
-            messagebox.showerror("Resolution Error", "Canvas Width and Height must be selected from the predefined list (8, 16, 32, 64, etc.).")
-            # Attempt to reset to a valid value if possible
-            if canvas_width not in self.valid_resolutions:
-                 self.width_var.set(1024)
-            if canvas_height not in self.valid_resolutions:
-                 self.height_var.set(1024)
-            return "break" if event else None
+            if show_errors:
+                messagebox.showerror("Resolution Error", "Canvas Width and Height must be selected from the predefined list (8, 16, 32, 64, etc.).")
+                # Attempt to reset to a valid value if possible
+                if canvas_width not in self.valid_resolutions:
+                     self.width_var.set(1024)
+                if canvas_height not in self.valid_resolutions:
+                     self.height_var.set(1024)
+            return None
 
-        # Use temp directory for temporary output
-        self.last_image_path = self.temp_output_path
+        return {
+            'text': text_to_stitch,
+            'scale_factor': scale_factor,
+            'canvas_width': canvas_width,
+            'canvas_height': canvas_height,
+            'font': None if self.font_var.get() == DEFAULT_FONT_LABEL else self.font_var.get()
+        }
+
+    def _submit_render(self, params, explicit):
+        """Queues a render on the background thread. Older pending renders are skipped."""
+        self._render_generation += 1
+        self.status_label.config(text="Stitching text...", fg=ACCENT_BLUE)
+        self._render_future = self._render_executor.submit(
+            self._render_worker, self._render_generation, params, explicit)
         
-        try:
-            self.status_label.config(text="Stitching text...")
-            self.master.update()
+        if not self._render_polling:
+            self._render_polling = True
+            self.master.after(RENDER_POLL_MS, self._poll_render_results)
 
+    def _render_worker(self, generation, params, explicit):
+        """Runs on the render thread: stitches the text and builds the downsampled preview copy. No Tk calls here."""
+        if generation != self._render_generation:
+            return  # Superseded by a newer request before it started
+        
+        try:
             # Get chars folder path using resource_path for PyInstaller compatibility
-            chars_path = resource_path("chars")
-            
             result = stitch_text(
-                text_to_stitch,
-                chars_folder=chars_path,
-                output_path=self.last_image_path,
-                scale_factor=scale_factor,
-                canvas_width=canvas_width,
-                canvas_height=canvas_height
+                params['text'],
+                chars_folder=glyph_source(resource_path("chars"), params['font']),
+                output_path=self.temp_output_path,
+                scale_factor=params['scale_factor'],
+                canvas_width=params['canvas_width'],
+                canvas_height=params['canvas_height']
             )
-            
+            preview = None
             if result:
-                result_path, self.last_pil_image = result
+                preview = result[1].copy()
+                preview.thumbnail((PREVIEW_MAX_SIZE, PREVIEW_MAX_SIZE), Image.Resampling.LANCZOS)
+            self._render_results.put((generation, params, explicit, result, preview, None))
+        except Exception as e:
+            self._render_results.put((generation, params, explicit, None, None, e))
 
-                # Get current frame size and update the display image
-                frame_w = self.img_frame.winfo_width()
-                frame_h = self.img_frame.winfo_height()
-                
-                # Force update if the frame size is available
-                if frame_w > 1 and frame_h > 1:
-                    self._update_display_image(frame_w, frame_h)
-                
-                # Show the Save As button after successful generation
-                self.save_button.grid(row=self.save_button_row, column=0, pady=5)
-                
-                self.status_label.config(text=f"Image generated at {canvas_width}x{canvas_height}. Click 'Save As' to save.", fg="green")
+    def _poll_render_results(self):
+        """Hands finished renders from the worker thread to the GUI."""
+        # Check before draining: the worker queues its result before the future completes
+        finished = self._render_future is None or self._render_future.done()
+        
+        try:
+            while True:
+                self._apply_render_result(*self._render_results.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if finished:
+            self._render_polling = False
+        else:
+            self.master.after(RENDER_POLL_MS, self._poll_render_results)
+
+    def _apply_render_result(self, generation, params, explicit, result, preview, error):
+        if generation != self._render_generation:
+            return  # A newer render is on its way
+        
+        if error is not None:
+            if isinstance(error, FileNotFoundError):
+                if explicit:
+                    messagebox.showerror("Error", "The 'chars' folder or character files were not found. Ensure you have run character extraction previously.")
+                self.status_label.config(text="Error: Characters folder missing.", fg="red")
             else:
-                self.status_label.config(text="Could not stitch text (no characters found).", fg="red")
+                if explicit:
+                    messagebox.showerror("Error", f"An error occurred during stitching: {error}")
+                self.status_label.config(text="Stitching Failed.", fg="red")
+            return
+        
+        if not result:
+            self.status_label.config(text="Could not stitch text (no characters found).", fg="red")
+            return
+        
+        # Use temp directory for temporary output
+        self.last_image_path, self.last_pil_image = result
+        self.preview_image = preview
+        self._displayed_size = None
 
-        except FileNotFoundError:
-            messagebox.showerror("Error", "The 'chars' folder or character files were not found. Ensure you have run character extraction previously.")
-            self.status_label.config(text="Error: Characters folder missing.", fg="red")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred during stitching: {e}")
-            self.status_label.config(text="Stitching Failed.", fg="red")
+        # Get current frame size and update the display image
+        frame_w = self.img_frame.winfo_width()
+        frame_h = self.img_frame.winfo_height()
+        
+        # Force update if the frame size is available
+        if frame_w > 1 and frame_h > 1:
+            self._update_display_image(frame_w, frame_h)
+        
+        # Show the Save As button after successful generation
+        self.save_button.grid(row=self.save_button_row, column=0, pady=5)
+        
+        self.status_label.config(text=f"Image generated at {params['canvas_width']}x{params['canvas_height']}. Click 'Save As' to save.", fg="green")
+
+    def make_image(self, event):
+        """Generates the image from the input text on the background render thread."""
+        params = self._get_render_params(show_errors=True)
+        if params:
+            self._cancel_scheduled_render()
+            self._submit_render(params, explicit=True)
 
         return "break" if event else None # Prevents Tkinter's default Enter action
 
 # --- Main Execution Block ---
 
 if __name__ == "__main__":
+    # Required for the batch worker pool in PyInstaller builds
+    multiprocessing.freeze_support()
+    
     # If run from command line with 'extract' argument, run the extraction logic
     if len(sys.argv) > 1 and sys.argv[1] == "extract":
         if len(sys.argv) < 3:
-            print("Usage: python s.py extract <image_path>")
+            print("Usage: python s.py extract <image_path> [atlas_name]")
             sys.exit(1)
         
         try:
             print(f"Starting extraction for: {sys.argv[2]}")
-            extract_characters(sys.argv[2])
-            print("Extraction complete. Character files saved in the 'chars' folder.")
+            if len(sys.argv) > 3:
+                extract_characters(sys.argv[2], atlas_name=sys.argv[3])
+                print(f"Extraction complete. Packed atlas saved as '{sys.argv[3]}{ATLAS_SUFFIX}.png/.json' in the 'chars' folder.")
+            else:
+                extract_characters(sys.argv[2])
+                print("Extraction complete. Character files saved in the 'chars' folder.")
             sys.exit(0)
         except FileNotFoundError:
             print(f"Error: Input file not found at {sys.argv[2]}")
@@ -877,6 +1288,45 @@ if __name__ == "__main__":
         except Exception as e:
             print(f"An unexpected error occurred during extraction: {e}")
             sys.exit(1)
+    
+    # 'pack' turns an existing folder of character PNGs into a packed atlas
+    if len(sys.argv) > 1 and sys.argv[1] == "pack":
+        if len(sys.argv) < 3:
+            print("Usage: python pointworldtext.py pack <atlas_name> [chars_folder]")
+            sys.exit(1)
+        
+        try:
+            json_path = pack_chars_folder(sys.argv[3] if len(sys.argv) > 3 else "chars", sys.argv[2])
+            print(f"Packed atlas written: {json_path}")
+            sys.exit(0)
+        except Exception as e:
+            print(f"An unexpected error occurred while packing: {e}")
+            sys.exit(1)
+    
+    # 'batch' renders every entry of a CSV/JSON manifest without the GUI
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        if len(sys.argv) < 3:
+            print("Usage: python pointworldtext.py batch <manifest.json|manifest.csv> [output_dir] [workers]")
+            sys.exit(1)
+        
+        try:
+            output_dir = sys.argv[3] if len(sys.argv) > 3 else None
+            max_workers = int(sys.argv[4]) if len(sys.argv) > 4 else None
+            failed = run_batch(sys.argv[2], output_dir=output_dir, max_workers=max_workers)
+            sys.exit(1 if failed else 0)
+        except FileNotFoundError as e:
+            print(f"Error: File not found: {e.filename}")
+            sys.exit(1)
+        except Exception as e:
+            print(f"An unexpected error occurred during batch generation: {e}")
+            sys.exit(1)
+    
+    # 'benchmark' compares the native-size and render-at-target stitching paths
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        length = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+        sample = "Stage 1 Bonus KZ! "
+        benchmark_render_modes((sample * (length // len(sample) + 1))[:length])
+        sys.exit(0)
             
     # Default: Start the GUI application
     try:
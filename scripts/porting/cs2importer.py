@@ -637,9 +637,10 @@ class CS2ImporterApp:
     def fix_vmf_structure(self, vmf_path):
         """Add proper VMF header structure for CS2 importer compatibility and fix tool textures"""
         try:
-            # Read the VMF file
+            # Read only up to the first top-level block: Hammer always writes versioninfo first,
+            # so large decompiled VMFs are not loaded into memory just for this check
             with open(vmf_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+                first_block = next((line.strip().strip('"') for line in f if line.strip() and not line.lstrip().startswith('//')), '')
             
             # Fix tool textures that BSPSource incorrectly converts
             # BSPSource often converts nodraw faces to playerclip/skip/hint/etc based on brush properties
@@ -665,7 +666,7 @@ class CS2ImporterApp:
             # The issue is BSPSource guessing wrong, but VBSP with -usebsp uses original BSP geo
             
             # Check if it already has versioninfo (Hammer-formatted VMF)
-            if 'versioninfo' in content.lower():
+            if first_block.lower() == 'versioninfo':
                 self.log("VMF already has proper structure")
                 return
             
@@ -689,12 +690,12 @@ viewsettings
 \t"nGridSpacing" "64"
 }
 '''
-            # Prepend header to existing content
-            new_content = vmf_header + content
-            
-            # Write back
-            with open(vmf_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            # Prepend header by streaming the existing content into a new file, then swap it in
+            temp_path = vmf_path + '.tmp'
+            with open(vmf_path, 'r', encoding='utf-8', errors='ignore') as src, open(temp_path, 'w', encoding='utf-8') as dst:
+                dst.write(vmf_header)
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.replace(temp_path, vmf_path)
             
             self.log("✓ Fixed VMF structure for CS2 compatibility")
             
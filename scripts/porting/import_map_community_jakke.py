@@ -12,6 +12,11 @@ import time
 import ast
 import shutil
 import tempfile
+import subprocess
+import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Force unbuffered output for real-time progress updates
 sys.stdout.reconfigure(line_buffering=True) if hasattr(sys.stdout, 'reconfigure') else None
@@ -38,6 +43,27 @@ def GetSource1ImportPath():
 ##########################################################################################################################################
 # Case-insensitive file finder
 ##########################################################################################################################################
+_dir_listing_cache = {}  # normalized directory -> {lowercase name: actual name}, or None if it doesn't exist
+
+def ListDirectoryInsensitive(directory):
+	"""Case-folded listing of a directory, read once and memoized for the whole run.
+	Returns {lowercase name: actual name}, or None if the directory doesn't exist."""
+	cache_key = os.path.normcase(os.path.abspath(directory))
+	if cache_key not in _dir_listing_cache:
+		try:
+			listing = {}
+			for item in os.listdir(directory):
+				listing.setdefault(item.lower(), item)
+		except OSError:
+			listing = None
+		_dir_listing_cache[cache_key] = listing
+	return _dir_listing_cache[cache_key]
+
+def InvalidateDirectoryListing(*directories):
+	"""Forget memoized listings after files or folders in these directories were renamed or created."""
+	for directory in directories:
+		_dir_listing_cache.pop(os.path.normcase(os.path.abspath(directory)), None)
+
 def FindFileInsensitive(path):
 	"""Find a file with case-insensitive matching. Returns the actual path if found, or original path if not."""
 	if os.path.exists(path):
@@ -47,21 +73,21 @@ def FindFileInsensitive(path):
 	directory = os.path.dirname(path)
 	filename = os.path.basename(path)
 	
-	if not os.path.exists(directory):
+	listing = ListDirectoryInsensitive(directory)
+	if listing is None:
 		# Try to find directory case-insensitively
 		parent = os.path.dirname(directory)
-		dirname = os.path.basename(directory)
-		if os.path.exists(parent):
-			for item in os.listdir(parent):
-				if item.lower() == dirname.lower():
-					directory = os.path.join(parent, item)
-					break
+		parent_listing = ListDirectoryInsensitive(parent)
+		dirname = parent_listing.get(os.path.basename(directory).lower()) if parent_listing else None
+		if dirname:
+			directory = os.path.join(parent, dirname)
+			listing = ListDirectoryInsensitive(directory)
 	
-	if os.path.exists(directory):
+	if listing:
 		# Find file case-insensitively
-		for item in os.listdir(directory):
-			if item.lower() == filename.lower():
-				return os.path.join(directory, item)
+		item = listing.get(filename.lower())
+		if item:
+			return os.path.join(directory, item)
 	
 	return path  # Return original if not found
 
@@ -80,25 +106,242 @@ def GetCS2ToolPath(tool_name, s2gamecsgo):
 	# If not found, return the tool name (will fail but show clear error)
 	return tool_name
 
+##########################################################################################################################################
+# Single-pass VMF reference index
+##########################################################################################################################################
+VMF_CHUNK_SIZE = 8 * 1024 * 1024  # Characters read per step; chunks are extended to whole top-level blocks
+VMF_SOUND_EXTENSIONS = ('.wav', '.mp3')
+
+# Literal-prefixed patterns let the regex engine skip ahead quickly, so one pattern per key beats a single alternation
+_VMF_MATERIAL_PATTERN = re.compile(r'"material"\s+"([^"]+)"', re.IGNORECASE)
+_VMF_TEXTURE_PATTERN = re.compile(r'"texture"\s+"([^"]+)"', re.IGNORECASE)
+_VMF_MODEL_PATTERN = re.compile(r'"model"\s+"([^"]+\.mdl)"', re.IGNORECASE)
+_VMF_PAIR_PATTERN = re.compile(r'"([^"\n]*)"[ \t]+"([^"\n]*)"')
+
+_vmf_index_cache = {}  # (path, size, mtime_ns) -> index from BuildVMFIndex
+
+def IterVMFChunks(vmf_path, chunk_size=VMF_CHUNK_SIZE):
+	"""Stream a VMF in chunks that end after a top-level block (a '}' in column 0), so the whole file is never in memory
+	and no entity is split between chunks. Falls back to line boundaries inside a very large block such as 'world'."""
+	with open(vmf_path, 'r', encoding='utf-8', errors='ignore') as f:
+		carry = ""
+		while True:
+			data = f.read(chunk_size)
+			if not data:
+				if carry:
+					yield carry
+				return
+			text = carry + data
+			cut = text.rfind("\n}\n")
+			cut = cut + 3 if cut >= 0 else text.rfind("\n") + 1
+			if cut <= 0:
+				carry = text
+				continue
+			carry = text[cut:]
+			yield text[:cut]
+
+def BuildVMFIndex(vmf_path):
+	"""Walk a VMF once and collect everything the import stages need:
+	'materials' (material keys), 'textures' (texture keys), 'models' (.mdl model keys), 'sounds',
+	'instances' (func_instance files) and 'classnames' (entity id -> classname)."""
+	index = {'materials': set(), 'textures': set(), 'models': set(), 'sounds': set(), 'instances': set(), 'classnames': {}}
+	sounds = index['sounds']
+	classnames = index['classnames']
+	
+	for chunk in IterVMFChunks(vmf_path):
+		index['materials'].update(_VMF_MATERIAL_PATTERN.findall(chunk))
+		index['textures'].update(_VMF_TEXTURE_PATTERN.findall(chunk))
+		index['models'].update(_VMF_MODEL_PATTERN.findall(chunk))
+		
+		# Entity keys come before the entity's nested blocks (solid, connections, editor), so only that header is read
+		start = 0 if chunk.startswith("entity") else chunk.find("\nentity")
+		while start >= 0:
+			body = chunk.find("{", start)
+			if body < 0:
+				break
+			header_end = len(chunk)
+			for boundary in (chunk.find("{", body + 1), chunk.find("\n}\n", body)):
+				if 0 <= boundary < header_end:
+					header_end = boundary
+			
+			keys = {}
+			for key, value in _VMF_PAIR_PATTERN.findall(chunk, body, header_end):
+				keys.setdefault(key.lower(), value)
+				if value.lower().endswith(VMF_SOUND_EXTENSIONS):
+					sounds.add(value)
+			classname = keys.get("classname", "")
+			classnames[keys.get("id", str(len(classnames)))] = classname
+			if classname == "func_instance" and keys.get("file"):
+				index['instances'].add(keys["file"])
+			elif classname == "ambient_generic" and keys.get("message"):
+				sounds.add(keys["message"])
+			start = chunk.find("\nentity", body)
+	return index
+
+def GetVMFIndex(vmf_path):
+	"""BuildVMFIndex, computed once per VMF contents and shared by every import stage."""
+	stat = os.stat(vmf_path)
+	cache_key = (os.path.abspath(vmf_path), stat.st_size, stat.st_mtime_ns)
+	index = _vmf_index_cache.get(cache_key)
+	if index is None:
+		start = time.time()
+		index = BuildVMFIndex(vmf_path)
+		_vmf_index_cache[cache_key] = index
+		print(f"Indexed VMF in {time.time() - start:.1f}s: {len(index['classnames'])} entities, "
+			f"{len(index['materials'] | index['textures'])} materials, {len(index['models'])} models, "
+			f"{len(index['sounds'])} sounds, {len(index['instances'])} instances")
+	return index
+
+def VMFMaterialRefs(vmf_path):
+	"""Every material named by a "material" or "texture" key in the VMF."""
+	index = GetVMFIndex(vmf_path)
+	return index['materials'] | index['textures']
+
+##########################################################################################################################################
+# Import journal: records completed stages and assets with their input hashes, so a rerun only redoes what changed or failed
+##########################################################################################################################################
+IMPORT_JOURNAL_VERSION = 1
+IMPORT_JOURNAL_SAVE_INTERVAL = 2.0  # Seconds between journal writes while assets complete
+REIMPORT_STAGE = "vmf_reimport"  # Cleared whenever anything is imported, so the VMAP gets re-imported with it
+
+def HashFile(path):
+	"""SHA-1 of a file's contents, or "" if it doesn't exist."""
+	if not os.path.exists(path):
+		return ""
+	sha1 = hashlib.sha1()
+	with open(path, 'rb') as f:
+		for chunk in iter(lambda: f.read(1024 * 1024), b''):
+			sha1.update(chunk)
+	return sha1.hexdigest()
+
+def HashStrings(*parts):
+	"""SHA-1 of several strings, to combine the inputs of a stage into one journal hash."""
+	return hashlib.sha1("\n".join(parts).encode('utf-8', errors='replace')).hexdigest()
+
+def SourceAssetHash(s1gamecsgo, rel_paths):
+	"""Input hash of a Source 1 asset from the size and mtime of its loose files (e.g. 'materials/foo.vtf') in the csgo folder.
+	Assets that only exist in pak01 use the pak01_dir.vpk stamp instead, so a game update re-imports them."""
+	stamps = []
+	for rel_path in rel_paths:
+		path = FindFileInsensitive(os.path.join(s1gamecsgo, rel_path.replace('/', '\\')))
+		if os.path.exists(path):
+			stat = os.stat(path)
+			stamps.append(f"{rel_path.lower()}:{stat.st_size}:{stat.st_mtime_ns}")
+	if not stamps:
+		pak01 = os.path.join(s1gamecsgo, "pak01_dir.vpk")
+		if os.path.exists(pak01):
+			stat = os.stat(pak01)
+			stamps.append(f"pak01:{stat.st_size}:{stat.st_mtime_ns}")
+	return HashStrings(*stamps)
+
+# VMT parameters that name a texture (materials/<value>.vtf) the material import reads
+VMT_TEXTURE_KEYS = frozenset((
+	"$basetexture", "$basetexture2", "$bumpmap", "$bumpmap2", "$normalmap", "$normalmap2", "$detail", "$detail2",
+	"$envmap", "$envmapmask", "$envmapmask2", "$blendmodulatetexture", "$selfillummask", "$phongexponenttexture",
+	"$lightwarptexture", "$ambientoccltexture", "$tintmasktexture", "$texture2", "$iris", "$corneatexture",
+	"$masks1", "$masks2", "$fresnelrangestexture", "$emissiveblendtexture", "$emissiveblendbasetexture",
+	"$emissiveblendflowtexture", "$flowmap", "$flow_noise_texture", "$refracttexture", "$reflecttexture",
+))
+_VMT_PAIR_PATTERN = re.compile(r'^[ \t]*"?(\$?\w+)"?[ \t]+(?:"([^"\n]*)"|([^\s"{}]+))', re.MULTILINE)
+
+def MaterialAssetHash(s1gamecsgo, material):
+	"""Input hash of a material (VMF name, e.g. 'concrete/floor01'): its .vmt and same-named .vtf plus every texture
+	the loose .vmt names, following 'include' for patch materials, so editing any of those textures re-imports it."""
+	vmt_ref = f"materials/{material}.vmt"
+	rel_paths = [vmt_ref, f"materials/{material}.vtf"]
+	pending = [vmt_ref]
+	seen = set()
+	while pending:
+		vmt_rel = pending.pop()
+		if vmt_rel.lower() in seen:
+			continue
+		seen.add(vmt_rel.lower())
+		path = FindFileInsensitive(os.path.join(s1gamecsgo, vmt_rel.replace('/', '\\')))
+		try:
+			with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+				text = f.read()
+		except OSError:
+			continue  # Only in pak01, covered by the pak01 stamp
+		for key, quoted, bare in _VMT_PAIR_PATTERN.findall(text):
+			key = key.lower()
+			value = (quoted or bare).strip().replace('\\', '/')
+			if key == "include":
+				include_ref = value if value.lower().startswith("materials/") else f"materials/{value}"
+				rel_paths.append(include_ref)
+				pending.append(include_ref)
+			elif key in VMT_TEXTURE_KEYS and value and value.lower() != "env_cubemap":
+				if value.lower().endswith(".vtf"):
+					value = value[:-len(".vtf")]
+				rel_paths.append(f"materials/{value}.vtf")
+	return SourceAssetHash(s1gamecsgo, list(dict.fromkeys(rel_paths)))
+
+def LoadImportJournal(path, fresh=False):
+	"""Load the journal at path: {'stages': {stage: input hash}, 'assets': {kind: {asset: input hash}}}.
+	Starts empty if fresh is set or the file is missing, unreadable or from another journal version."""
+	journal = {'version': IMPORT_JOURNAL_VERSION, 'stages': {}, 'assets': {}}
+	if not fresh and os.path.exists(path):
+		try:
+			with open(path, 'r', encoding='utf-8') as f:
+				data = json.load(f)
+			if data.get('version') == IMPORT_JOURNAL_VERSION:
+				journal['stages'].update(data.get('stages', {}))
+				journal['assets'].update(data.get('assets', {}))
+		except (OSError, ValueError) as e:
+			print(f"Warning: Could not read import journal, starting fresh: {e}")
+	journal['path'] = path
+	journal['saved_at'] = 0.0
+	return journal
+
+def SaveImportJournal(journal, force=True):
+	"""Write the journal through a temp file, so an interrupted run never leaves it truncated.
+	Without force, writes at most every IMPORT_JOURNAL_SAVE_INTERVAL seconds."""
+	if journal is None or (not force and time.time() - journal['saved_at'] < IMPORT_JOURNAL_SAVE_INTERVAL):
+		return
+	try:
+		os.makedirs(os.path.dirname(journal['path']), exist_ok=True)
+		temp_path = journal['path'] + ".tmp"
+		with open(temp_path, 'w', encoding='utf-8') as f:
+			json.dump({key: journal[key] for key in ('version', 'stages', 'assets')}, f, indent=1, sort_keys=True)
+		os.replace(temp_path, journal['path'])
+		journal['saved_at'] = time.time()
+	except OSError as e:
+		print(f"Warning: Could not write import journal: {e}")
+
+def JournalStageDone(journal, stage, input_hash):
+	"""True if the stage already completed without errors from the same inputs."""
+	return journal is not None and journal['stages'].get(stage) == input_hash
+
+def JournalMarkStage(journal, stage, input_hash):
+	"""Record a stage as completed from input_hash."""
+	if journal is None:
+		return
+	journal['stages'][stage] = input_hash
+	if stage != REIMPORT_STAGE:
+		journal['stages'].pop(REIMPORT_STAGE, None)
+	SaveImportJournal(journal)
+
+def JournalAssetDone(journal, kind, asset, input_hash, output_path):
+	"""True if the asset was imported from the same inputs before and its output still exists."""
+	return (journal is not None and journal['assets'].get(kind, {}).get(asset) == input_hash
+		and os.path.exists(output_path))
+
+def JournalMarkAssets(journal, kind, input_hashes):
+	"""Record assets ({asset: input hash}) as imported."""
+	if journal is None or not input_hashes:
+		return
+	journal['assets'].setdefault(kind, {}).update(input_hashes)
+	journal['stages'].pop(REIMPORT_STAGE, None)
+	SaveImportJournal(journal, force=False)
+
 ##########################################################################################################################################
 # Fix material file case to match VMF expectations
 ##########################################################################################################################################
 def FixMaterialCase(vmf_path, game_dir):
 	"""Read VMF file and rename material files to match the case used in the VMF.
 	game_dir should point to the CS:GO installation root (contains 'csgo' folder)"""
-	import re
-	
 	try:
-		with open(vmf_path, 'r', encoding='utf-8', errors='ignore') as f:
-			vmf_content = f.read()
-		
-		# Find all material references in the VMF (they appear in "material" keys)
-		material_pattern = re.compile(r'"material"\s+"([^"]+)"', re.IGNORECASE)
-		materials = set(material_pattern.findall(vmf_content))
-		
-		# Also find materials in texture references
-		texture_pattern = re.compile(r'"texture"\s+"([^"]+)"', re.IGNORECASE)
-		materials.update(texture_pattern.findall(vmf_content))
+		# Material references appear in "material" keys (brush sides) and "texture" keys (decals, overlays)
+		materials = VMFMaterialRefs(vmf_path)
 		
 		print(f"Found {len(materials)} unique material references in VMF")
 		
@@ -128,6 +371,7 @@ def FixMaterialCase(vmf_path, game_dir):
 					# Ensure target directory exists
 					os.makedirs(os.path.dirname(vmt_full), exist_ok=True)
 					os.rename(actual_vmt, vmt_full)
+					InvalidateDirectoryListing(os.path.dirname(actual_vmt), os.path.dirname(vmt_full), os.path.dirname(os.path.dirname(vmt_full)))
 					print(f"Renamed: {os.path.basename(actual_vmt)} -> {os.path.basename(vmt_full)}")
 					renamed_count += 1
 				except Exception as e:
@@ -137,6 +381,7 @@ def FixMaterialCase(vmf_path, game_dir):
 				try:
 					os.makedirs(os.path.dirname(vtf_full), exist_ok=True)
 					os.rename(actual_vtf, vtf_full)
+					InvalidateDirectoryListing(os.path.dirname(actual_vtf), os.path.dirname(vtf_full), os.path.dirname(os.path.dirname(vtf_full)))
 					print(f"Renamed: {os.path.basename(actual_vtf)} -> {os.path.basename(vtf_full)}")
 					renamed_count += 1
 				except Exception as e:
@@ -257,6 +502,67 @@ def Force2UVsIfRequired( refsName, global2UVMaterials, global2UVMaterialsFile ):
 
 	return b2UV
 
+##########################################################################################################################################
+# Run cs_mdl_import for many models on a bounded worker pool
+##########################################################################################################################################
+MDL_IMPORT_WORKERS = max(1, os.cpu_count() or 1)  # Overridden by -mdlworkers
+MDL_IMPORT_OUTPUT = "<output>"  # Stands for the -o folder in job commands; replaced by each job's own staging folder
+
+def RunModelImportCommand(cmd):
+	"""Worker: run one import command with its output captured, so parallel imports never interleave.
+	Returns (returncode, output)."""
+	result = subprocess.run(cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors='replace')
+	return result.returncode, result.stdout
+
+def MergeModelImportOutput(staging_dir, output_dir):
+	"""Move everything a model import wrote to staging_dir to the same relative path under output_dir
+	(replacing files an earlier model wrote), then remove staging_dir."""
+	for dirpath, _, filenames in os.walk(staging_dir):
+		dest_dir = os.path.join(output_dir, os.path.relpath(dirpath, staging_dir))
+		os.makedirs(dest_dir, exist_ok=True)
+		for filename in filenames:
+			os.replace(os.path.join(dirpath, filename), os.path.join(dest_dir, filename))
+	shutil.rmtree(staging_dir, ignore_errors=True)
+
+def RunModelImports(jobs, output_dir, errorCallback, onImported, max_workers=None):
+	"""Run (model, cmd) jobs on up to max_workers threads (default MDL_IMPORT_WORKERS).
+	Each cmd writes to MDL_IMPORT_OUTPUT, which becomes a staging folder of its own, so models that share
+	materials or included models never write the same file at once. As each job finishes, on the calling thread:
+	its output is printed as one block, its files are merged into output_dir, errorCallback(cmd) is called if it
+	failed (non-aborting, like utl.RunCommand) and onImported(model) collects its results.
+	Returns the models whose command could not be run at all."""
+	not_run = []
+	if not jobs:
+		return not_run
+	
+	os.makedirs(output_dir, exist_ok=True)
+	max_workers = max(1, min(max_workers or MDL_IMPORT_WORKERS, len(jobs)))
+	with ThreadPoolExecutor(max_workers=max_workers) as executor:
+		futures = {}
+		for model, cmd in jobs:
+			# Staged next to the output so merging is a rename on the same drive
+			staging_dir = tempfile.mkdtemp(prefix=".mdl_import_", dir=output_dir)
+			job_cmd = cmd.replace(MDL_IMPORT_OUTPUT, staging_dir)
+			futures[executor.submit(RunModelImportCommand, job_cmd)] = (model, cmd, job_cmd, staging_dir)
+		for future in as_completed(futures):
+			model, cmd, job_cmd, staging_dir = futures[future]
+			try:
+				returncode, output = future.result()
+			except Exception as e:
+				print(f"Warning: Could not run model import for {model}: {e}")
+				shutil.rmtree(staging_dir, ignore_errors=True)
+				not_run.append(model)
+				continue
+			
+			print(f"Running Command: {job_cmd}")
+			if output:
+				print(output.rstrip())
+			MergeModelImportOutput(staging_dir, output_dir)
+			if returncode != 0:
+				errorCallback(cmd)
+			onImported(model)
+	return not_run
+
 ##########################################################################################################################################
 #
 ##########################################################################################################################################
@@ -279,6 +585,9 @@ def ImportAndCompileMapMDLs( filename, s2addon, errorCallback ):
 	force2UVList = []
 	mdlmtls = set()
 
+	# Build every import command first (options lines apply to the models after them), then run them in parallel
+	cs_mdl_import = GetCS2ToolPath("cs_mdl_import.exe", s2gamecsgo)
+	jobs = []
 	extraoptions = ""
 	for mdlfile in mdlfiles :
 		if ( mdlfile.startswith( "-" ) ):
@@ -290,24 +599,24 @@ def ImportAndCompileMapMDLs( filename, s2addon, errorCallback ):
 			mdlfile = mdlfile.replace( "/", "\\" )
 			infile = mdlfile
 
-			outName = s2contentcsgoimported + "\\" + mdlfile.replace( ".mdl", ".vmdl" )
-			refsName = s2contentcsgoimported + "\\" + mdlfile.replace( ".mdl", "_refs.txt" )
-
 			# Import
+			importCmd = "\"%s\" -nop4 %s -i \"%s\" -o \"%s\" \"%s\"" % ( cs_mdl_import, extraoptions, s1gamecsgo, MDL_IMPORT_OUTPUT, infile )
+			jobs.append( ( mdlfile, importCmd ) )
 
-			cs_mdl_import = GetCS2ToolPath("cs_mdl_import.exe", s2gamecsgo)
-			importCmd = "\"%s\" -nop4 %s -i \"%s\" -o \"%s\" \"%s\"" % ( cs_mdl_import, extraoptions, s1gamecsgo, s2contentcsgoimported, infile )
-			utl.RunCommand( importCmd, errorCallback )
+	def collectRefs( mdlfile ):
+		refsName = s2contentcsgoimported + "\\" + mdlfile.replace( ".mdl", "_refs.txt" )
 
-			# So we only import materials once, lets add their refs to a refsset, and import them after all models
-			if ( os.path.exists( refsName ) ):
-				refs = utl.ReadTextFile( refsName )
-				str = utl.ListStringFromRefs( refs )
-				mtllist = str.split( "\n" )
-				for mtlname in mtllist : mdlmtls.add( mtlname )
+		# So we only import materials once, lets add their refs to a refsset, and import them after all models
+		if ( os.path.exists( refsName ) ):
+			refs = utl.ReadTextFile( refsName )
+			str = utl.ListStringFromRefs( refs )
+			mtllist = str.split( "\n" )
+			for mtlname in mtllist : mdlmtls.add( mtlname )
+
+			# collect refsNames so we can add 2UVs as required
+			force2UVList.append( refsName )
 
-				# collect refsNames so we can add 2UVs as required
-				force2UVList.append( refsName )
+	RunModelImports( jobs, s2contentcsgoimported, errorCallback, collectRefs )
 
 	# import mtls used by mdl
 	mdlmtlrefs = utl.RefsStringFromList( list( mdlmtls ) )
@@ -440,21 +749,16 @@ def ImportAndCompileMapRefs( refsFile, s2addon, errorCallback ):
 ##########################################################################################################################################
 # Import all models referenced in VMF from pak01
 ##########################################################################################################################################
-def ImportVMFModels(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback):
-	"""Import all models referenced in the VMF file from pak01 before VMF import"""
-	import re
-	
+def ImportVMFModels(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback, journal=None):
+	"""Import all models referenced in the VMF file from pak01 before VMF import.
+	Models the journal lists as imported from unchanged inputs are skipped."""
 	# Define a non-aborting error callback for model imports
 	def non_aborting_callback(cmd):
 		print(f"Warning: Command failed but continuing: {cmd}")
 	
 	try:
-		with open(vmf_path, 'r', encoding='utf-8', errors='ignore') as f:
-			vmf_content = f.read()
-		
-		# Find all model references in the VMF (they appear in "model" keys for prop_static, etc.)
-		model_pattern = re.compile(r'"model"\s+"([^"]+\.mdl)"', re.IGNORECASE)
-		models = set(model_pattern.findall(vmf_content))
+		# Model references appear in "model" keys for prop_static, etc.
+		models = GetVMFIndex(vmf_path)['models']
 		
 		if not models:
 			print("No models found in VMF")
@@ -463,50 +767,85 @@ def ImportVMFModels(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorC
 		print(f"Found {len(models)} unique model references in VMF, importing from pak01...")
 		sys.stdout.flush()
 		
-		# Import models one by one to avoid batch failure
+		# Import models on a worker pool; each model is still its own cs_mdl_import run, so failures stay isolated
 		imported_models = []
-		failed_count = 0
 		model_materials = set()
 		
-		for model in models:
+		cs_mdl_import = GetCS2ToolPath("cs_mdl_import.exe", s2gamecsgo)
+		jobs = []
+		input_hashes = {}
+		skipped_models = []
+		for model in sorted(models):
 			model = model.strip().replace('\\', '/')
 			if not model:
 				continue
-			try:
-				# Use cs_mdl_import to import the model from pak01
-				cs_mdl_import = GetCS2ToolPath("cs_mdl_import.exe", s2gamecsgo)
-				import_cmd = f"\"{cs_mdl_import}\" -nop4 -i \"{s1gamecsgo}\" -o \"{s2contentcsgoimported}\" \"{model}\""
-				utl.RunCommand(import_cmd, non_aborting_callback)
-				imported_models.append(model)
-				# Print progress after each model
-				print(f"Imported {len(imported_models)} models")
-				sys.stdout.flush()
-				
-				# Check if a _refs.txt file was created for this model
-				refs_name = s2contentcsgoimported + "\\" + model.replace(".mdl", "_refs.txt").replace("/", "\\")
-				if os.path.exists(refs_name):
-					refs = utl.ReadTextFile(refs_name)
-					str_refs = utl.ListStringFromRefs(refs)
-					mtllist = str_refs.split("\n")
-					materials_found = 0
-					for mtlname in mtllist:
-						if mtlname.strip():
-							model_materials.add(mtlname.strip())
-							materials_found += 1
-					if materials_found > 0:
-						print(f"  Found {materials_found} materials in refs for {model}")
-				else:
-					print(f"  No refs file found for {model} at {refs_name}")
-			except Exception as e:
-				failed_count += 1
+			input_hashes[model] = SourceAssetHash(s1gamecsgo, [model] + [model[:-len(".mdl")] + ext for ext in (".vvd", ".dx90.vtx", ".phy")])
+			vmdl_path = s2contentcsgoimported + "\\" + model.replace(".mdl", ".vmdl").replace("/", "\\")
+			if JournalAssetDone(journal, "model", model, input_hashes[model], vmdl_path):
+				skipped_models.append(model)
+				continue
+			# Use cs_mdl_import to import the model from pak01
+			jobs.append((model, f"\"{cs_mdl_import}\" -nop4 -i \"{s1gamecsgo}\" -o \"{MDL_IMPORT_OUTPUT}\" \"{model}\""))
+		
+		def read_model_refs(model):
+			# Check if a _refs.txt file was created for this model
+			refs_name = s2contentcsgoimported + "\\" + model.replace(".mdl", "_refs.txt").replace("/", "\\")
+			if os.path.exists(refs_name):
+				refs = utl.ReadTextFile(refs_name)
+				str_refs = utl.ListStringFromRefs(refs)
+				mtllist = str_refs.split("\n")
+				materials_found = 0
+				for mtlname in mtllist:
+					if mtlname.strip():
+						model_materials.add(mtlname.strip())
+						materials_found += 1
+				if materials_found > 0:
+					print(f"  Found {materials_found} materials in refs for {model}")
+			else:
+				print(f"  No refs file found for {model} at {refs_name}")
+		
+		# Skipped models count as imported (so the "Imported N models" lines reach the "Found N" total)
+		# and still contribute the materials listed in their existing refs files
+		if skipped_models:
+			print(f"Skipping {len(skipped_models)} models unchanged since the last import")
+			imported_models.extend(skipped_models)
+			for model in skipped_models:
+				read_model_refs(model)
+		
+		commands = dict(jobs)
+		failed_commands = set()
+		
+		def model_error_callback(cmd):
+			failed_commands.add(cmd)
+			non_aborting_callback(cmd)
+		
+		def collect_model_refs(model):
+			imported_models.append(model)
+			# Print progress after each model
+			print(f"Imported {len(imported_models)} models")
+			sys.stdout.flush()
+			
+			if commands[model] not in failed_commands:
+				JournalMarkAssets(journal, "model", {model: input_hashes[model]})
+			read_model_refs(model)
+		
+		failed_count = len(RunModelImports(jobs, s2contentcsgoimported, model_error_callback, collect_model_refs))
+		SaveImportJournal(journal)
 		
 		print(f"Imported {len(imported_models)} models from pak01, {failed_count} skipped/failed")
 		sys.stdout.flush()
 		
 		print(f"Collected {len(model_materials)} unique materials from model refs files")
 		
-		# Import materials used by the models
-		if model_materials:
+		# Import materials used by the models, unless this exact set already imported cleanly
+		def model_material_hash(ref):
+			if ref.lower().startswith("materials/") and ref.lower().endswith(".vmt"):
+				return MaterialAssetHash(s1gamecsgo, ref[len("materials/"):-len(".vmt")])
+			return SourceAssetHash(s1gamecsgo, [ref])
+		model_materials_hash = HashStrings(*(f"{m}:{model_material_hash(m)}" for m in sorted(model_materials)))
+		if model_materials and JournalStageDone(journal, "model_materials", model_materials_hash):
+			print(f"Skipping {len(model_materials)} model materials unchanged since the last import")
+		elif model_materials:
 			print(f"Importing {len(model_materials)} materials used by models...")
 			
 			# Create a refs file for model materials
@@ -522,10 +861,19 @@ def ImportVMFModels(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorC
 			# Import model materials from pak01
 			source1import_exe = GetSource1ImportPath()
 			importRefsCmd = f"\"{source1import_exe}\" -retail -nop4 -nop4sync -src1gameinfodir \"{s1gamecsgo}\" -s2addon {s2addon} -game csgo -usefilelist \"{temp_refs}\""
+			model_material_errors = []
+			
+			def model_material_error_callback(cmd):
+				model_material_errors.append(cmd)
+				non_aborting_callback(cmd)
+			
 			try:
-				utl.RunCommand(importRefsCmd, non_aborting_callback)
+				utl.RunCommand(importRefsCmd, model_material_error_callback)
 			except Exception as e:
+				model_material_errors.append(str(e))
 				print(f"Warning: Some model materials may have failed to import: {e}")
+			if not model_material_errors:
+				JournalMarkStage(journal, "model_materials", model_materials_hash)
 			
 			# Skip compilation - CS2 Hammer will compile assets when the map is opened
 			# for mtlfile in model_materials:
@@ -565,25 +913,92 @@ def ImportVMFModels(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorC
 		print(f"Warning: VMF model import failed: {e}")
 		print("Continuing with VMF import...")
 
+##########################################################################################################################################
+# Import a list of Source 1 assets with source1import -usefilelist
+##########################################################################################################################################
+SOURCE1IMPORT_CHUNK_SIZE = 256  # Assets per source1import run
+
+def OutputWrittenSince(path, since):
+	"""True if the file at path exists and was written at or after the time.time() value since."""
+	try:
+		return os.path.getmtime(path) >= since
+	except OSError:
+		return False
+
+def ImportRefsInChunks(assets, refs_path, source1import_cmd, asset_type="asset", onImported=None, already_imported=0, outputPath=None):
+	"""Import assets (e.g. 'materials/foo.vmt') with one source1import run per chunk, written to refs_path
+	in importfilelist format. A chunk that fails is split in half and retried down to single assets, so a
+	broken asset only fails itself. Progress is printed as "Imported N <asset_type>s" for the GUI.
+	outputPath(asset), if given, is the file the import writes for an asset: source1import can exit cleanly
+	although single files of a -usefilelist run failed, so assets whose output wasn't written by the run are retried.
+	onImported(chunk), if given, is called with the assets of each chunk that imported cleanly. already_imported assets
+	(e.g. skipped by the journal) are included in the printed count, so it reaches the "Found N" total.
+	Returns (imported, failed) lists."""
+	imported = []
+	failed = []
+	
+	# Stack of chunks still to import, first chunk on top
+	pending = [assets[i:i + SOURCE1IMPORT_CHUNK_SIZE] for i in range(0, len(assets), SOURCE1IMPORT_CHUNK_SIZE)]
+	pending.reverse()
+	
+	while pending:
+		chunk = pending.pop()
+		errors = []
+		
+		utl.EnsureFileWritable(refs_path)
+		with open(refs_path, "w") as fw:
+			fw.write(utl.RefsStringFromList(chunk))
+		
+		started = time.time()
+		try:
+			utl.RunCommand(f"{source1import_cmd} -usefilelist \"{refs_path}\"", lambda cmd: errors.append(cmd))
+		except Exception as e:
+			errors.append(str(e))
+		
+		written = chunk
+		if not errors and outputPath:
+			written = [asset for asset in chunk if OutputWrittenSince(outputPath(asset), started)]
+			if not written:
+				errors.append(f"No {asset_type} output written")
+		
+		if not errors and len(written) < len(chunk):
+			# Keep what was written and retry the rest on their own (a smaller chunk, so this always ends)
+			imported.extend(written)
+			if onImported:
+				onImported(written)
+			written = set(written)
+			missing = [asset for asset in chunk if asset not in written]
+			print(f"Warning: {len(missing)} {asset_type}s of the batch were not written, retrying them...")
+			pending.append(missing)
+		elif not errors:
+			imported.extend(chunk)
+			if onImported:
+				onImported(chunk)
+		elif len(chunk) == 1:
+			print(f"Warning: Failed to import {asset_type} {chunk[0]}")
+			failed.extend(chunk)
+		else:
+			print(f"Warning: Batch of {len(chunk)} {asset_type}s failed, retrying as two smaller batches...")
+			half = len(chunk) // 2
+			pending.append(chunk[half:])
+			pending.append(chunk[:half])
+		
+		# Print progress after each run
+		print(f"Imported {already_imported + len(imported)} {asset_type}s")
+		sys.stdout.flush()
+	
+	return imported, failed
+
 ##########################################################################################################################################
 # Import all materials referenced in VMF from pak01
 ##########################################################################################################################################
-def ImportVMFMaterials(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback):
+def ImportVMFMaterials(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback, journal=None):
 	"""Import all materials referenced in the VMF file from pak01 before VMF import.
+	Materials the journal lists as imported from unchanged inputs are skipped.
 	Returns a set of successfully imported material paths for deduplication."""
-	import re
-	
 	try:
-		with open(vmf_path, 'r', encoding='utf-8', errors='ignore') as f:
-			vmf_content = f.read()
-		
-		# Find all material references in the VMF (they appear in "material" keys)
-		material_pattern = re.compile(r'"material"\s+"([^"]+)"', re.IGNORECASE)
-		materials = set(material_pattern.findall(vmf_content))
-		
-		# Also find materials in texture references
-		texture_pattern = re.compile(r'"texture"\s+"([^"]+)"', re.IGNORECASE)
-		materials.update(texture_pattern.findall(vmf_content))
+		# Material references appear in "material" keys (brush sides) and "texture" keys (decals, overlays)
+		materials = VMFMaterialRefs(vmf_path)
 		
 		if not materials:
 			print("No materials found in VMF")
@@ -592,29 +1007,36 @@ def ImportVMFMaterials(vmf_path, s1gamecsgo, s2addon, s2contentcsgoimported, err
 		print(f"Found {len(materials)} unique material references in VMF, importing from pak01...")
 		sys.stdout.flush()  # Ensure progress is shown immediately
 		
-		# Import materials one by one to avoid batch failure
-		imported_materials = []
-		failed_count = 0
+		# Import all materials through one importfilelist per chunk instead of one process per material
+		material_names = sorted(set(m.strip().replace('\\', '/') for m in materials if m.strip()))
+		material_refs = vmf_path.replace(".vmf", "_vmf_mtl_refs.txt")
 		
-		def material_error_callback(cmd):
-			# Don't abort on individual material import failures
-			print(f"Warning: Material import command failed: {cmd}")
+		# Skip materials a previous run already imported from the same inputs
+		input_hashes = {}
+		pending_refs = []
+		skipped_materials = []
+		for m in material_names:
+			ref = f"materials/{m}.vmt"
+			input_hashes[ref] = MaterialAssetHash(s1gamecsgo, m)
+			vmat_path = s2contentcsgoimported + "\\materials\\" + m.replace(" ", "_").replace("/", "\\") + ".vmat"
+			if JournalAssetDone(journal, "material", ref, input_hashes[ref], vmat_path):
+				skipped_materials.append(m)
+			else:
+				pending_refs.append(ref)
+		if skipped_materials:
+			print(f"Skipping {len(skipped_materials)} materials unchanged since the last import")
 		
-		for material in materials:
-			material = material.strip().replace('\\', '/')
-			if not material:
-				continue
-			try:
-				source1import_exe = GetSource1ImportPath()
-				import_cmd = f"\"{source1import_exe}\" -retail -nop4 -nop4sync -src1gameinfodir \"{s1gamecsgo}\" -src1contentdir \"{s1gamecsgo}\" -s2addon {s2addon} -game csgo \"materials/{material}.vmt\""
-				utl.RunCommand(import_cmd, material_error_callback)
-				imported_materials.append(material)
-				# Print progress after each material
-				print(f"Imported {len(imported_materials)} materials")
-				sys.stdout.flush()  # Force immediate output
-			except Exception as e:
-				print(f"Warning: Failed to import material {material}: {e}")
-				failed_count += 1
+		source1import_exe = GetSource1ImportPath()
+		import_cmd = f"\"{source1import_exe}\" -retail -nop4 -nop4sync -src1gameinfodir \"{s1gamecsgo}\" -src1contentdir \"{s1gamecsgo}\" -s2addon {s2addon} -game csgo"
+		imported_refs, failed_refs = ImportRefsInChunks(pending_refs, material_refs, import_cmd, "material",
+			lambda chunk: JournalMarkAssets(journal, "material", {ref: input_hashes[ref] for ref in chunk}),
+			already_imported=len(skipped_materials),
+			outputPath=lambda ref: s2contentcsgoimported + "\\" + ref.replace(" ", "_").replace("/", "\\")[:-len(".vmt")] + ".vmat")
+		SaveImportJournal(journal)
+		
+		# Back from 'materials/foo.vmt' to the VMF material name; skipped materials count as imported
+		imported_materials = skipped_materials + [ref[len("materials/"):-len(".vmt")] for ref in imported_refs]
+		failed_count = len(failed_refs)
 		
 		print(f"Imported {len(imported_materials)} materials, {failed_count} failed")
 		sys.stdout.flush()
@@ -708,12 +1130,15 @@ parser.add_argument( 'mapname', help='Name of map to import, relative to maps\\
 parser.add_argument( '-usebsp', action='store_true', default=False, help='Generate and use bsp on import' )
 parser.add_argument( '-usebsp_nomergeinstances', action='store_true', default=False, help='if using bsp, do not merge instances' )
 parser.add_argument( '-skipdeps', action='store_true', default=False, help='do not import and compile dependencies (imports .vmf to .vmap only)' )
+parser.add_argument( '-mdlworkers', type=int, default=MDL_IMPORT_WORKERS, help='number of models imported in parallel (default: CPU count)' )
+parser.add_argument( '-fresh', action='store_true', default=False, help='ignore the import journal and redo every stage and asset' )
 args = parser.parse_args()
 
 mapname = args.mapname
 usebsp = args.usebsp
 nomergeinstances = args.usebsp_nomergeinstances
 skipdeps = args.skipdeps
+MDL_IMPORT_WORKERS = max( 1, args.mdlworkers )
 
 # setup paths
 s1gamecsgo = args.s1gameinfodir
@@ -743,6 +1168,18 @@ def errorCallback(cmd=None):
 	else:
 		print(f"Warning: Import encountered an error but continuing...")
 
+def TrackedErrorCallback(errors):
+	"""errorCallback that also records failures in errors, so the journal only marks stages that ran cleanly."""
+	def callback(cmd=None):
+		errors.append(cmd)
+		errorCallback(cmd)
+	return callback
+
+# Journal of completed stages and assets, so rerunning an interrupted or iterated import only redoes what changed or failed
+journal = LoadImportJournal(s2contentcsgo + "\\" + mapname.replace("\\", "_").replace("/", "_") + "_import_journal.json", args.fresh)
+if journal['stages'] or journal['assets']:
+	print(f"Resuming from import journal {journal['path']} (use -fresh to redo everything)")
+
 # Disable VPK signature checking before starting import
 vpk_sig_path, vpk_sig_old = DisableVPKSignatures(s2gamecsgo)
 
@@ -788,6 +1225,11 @@ try:
 			print("[WARNING] No BSP file found - will compile VMF to BSP first (this adds extra time)")
 			print("  Note: Decompiled VMFs may have more faces than original")
 	
+	# The initial import only needs to run again if the VMF, BSP or options changed, or its VMAP is gone
+	vmf_stage_hash = HashStrings(HashFile(vmf_file_path), HashFile(bsp_file_path), f"usebsp={usebsp}", f"nomergeinstances={nomergeinstances}")
+	main_vmap_path = s2contentcsgo + "\\maps\\" + mapname.replace( "instances", "prefabs" ) + ".vmap"
+	skip_vmf_import = JournalStageDone(journal, "vmf_import", vmf_stage_hash) and os.path.exists(main_vmap_path)
+	
 	# CRITICAL FIX: source1import's VBSP has issues with paths containing spaces
 	# Copy VMF and BSP to temp directory to avoid "Counter-Strike Global Offensive" path issues
 	# Place it in .cs2kz-mapping-tools subfolder for organization
@@ -844,8 +1286,14 @@ try:
 	print(f"Import command: {mapImportCmd}")
 	
 	try:
-		utl.RunCommand( mapImportCmd, errorCallback )
-		print("Successfully imported VMF to VMAP with face culling")
+		if skip_vmf_import:
+			print("VMF unchanged since the last import, skipping initial VMF import")
+		else:
+			vmf_import_errors = []
+			utl.RunCommand( mapImportCmd, TrackedErrorCallback(vmf_import_errors) )
+			print("Successfully imported VMF to VMAP with face culling")
+			if not vmf_import_errors:
+				JournalMarkStage(journal, "vmf_import", vmf_stage_hash)
 	except Exception as e:
 		print(f"Warning: VMF import failed: {e}")
 		print("Continuing with dependency import...")
@@ -882,14 +1330,14 @@ try:
 	# Import all materials referenced in VMF from pak01
 	vmf_imported_materials = set()
 	try:
-		vmf_imported_materials = ImportVMFMaterials(vmf_file_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback)
+		vmf_imported_materials = ImportVMFMaterials(vmf_file_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback, journal)
 	except Exception as e:
 		print(f"Warning: VMF material import failed: {e}")
 		print("Continuing with model import...")
 
 	# Import all models referenced in VMF from pak01
 	try:
-		ImportVMFModels(vmf_file_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback)
+		ImportVMFModels(vmf_file_path, s1gamecsgo, s2addon, s2contentcsgoimported, errorCallback, journal)
 	except Exception as e:
 		print(f"Warning: VMF model import failed: {e}")
 		import traceback
@@ -902,12 +1350,18 @@ try:
 	if ( not skipdeps ):
 		# Check for embedded materials extracted from BSP
 		embedded_refs_file = s1contentcsgo + "\\" + mapname + "_embedded_refs.txt"
-		if os.path.exists(embedded_refs_file):
+		embedded_stage_hash = HashFile(embedded_refs_file)
+		if os.path.exists(embedded_refs_file) and JournalStageDone(journal, "embedded_materials", embedded_stage_hash):
+			print("Embedded materials unchanged since the last import, skipping")
+		elif os.path.exists(embedded_refs_file):
 			print(f"Found embedded materials from BSP extraction, importing...")
 			# Import embedded materials - need to specify content dir as csgo root since materials are there
 			source1import_exe = GetSource1ImportPath()
 			importcmd = "\"" + source1import_exe + "\" -retail -nop4 -nop4sync -src1gameinfodir \"" + s1gamecsgo + "\" -src1contentdir \"" + s1gamecsgo + "\" -s2addon " + s2addon + " -game csgo -usefilelist \"" + embedded_refs_file + "\""
-			utl.RunCommand( importcmd, errorCallback )
+			embedded_errors = []
+			utl.RunCommand( importcmd, TrackedErrorCallback(embedded_errors) )
+			if not embedded_errors:
+				JournalMarkStage(journal, "embedded_materials", embedded_stage_hash)
 			
 			# Now compile the imported materials
 			refs = utl.ReadTextFile( embedded_refs_file )
@@ -935,12 +1389,18 @@ try:
 		# utl.RunCommand( compilercmd, errorCallback )
 		print("Skipping embedded material compilation (will be compiled automatically when opening in Hammer)")
 		
-		print("Re-importing VMF to update with compiled embedded materials...")
-		try:
-			utl.RunCommand( mapImportCmd, errorCallback )
-		except Exception as e:
-			print(f"Warning: VMF re-import failed: {e}")
-			print("Continuing with prefab processing...")
+		if JournalStageDone(journal, REIMPORT_STAGE, vmf_stage_hash):
+			print("Nothing was imported since the last VMF re-import, skipping it")
+		else:
+			print("Re-importing VMF to update with compiled embedded materials...")
+			try:
+				reimport_errors = []
+				utl.RunCommand( mapImportCmd, TrackedErrorCallback(reimport_errors) )
+				if not reimport_errors:
+					JournalMarkStage(journal, REIMPORT_STAGE, vmf_stage_hash)
+			except Exception as e:
+				print(f"Warning: VMF re-import failed: {e}")
+				print("Continuing with prefab processing...")
 	
 	# Check if refs file exists to process prefab dependencies
 	# Refs files are now in maps\ folder after the initial import
@@ -957,20 +1417,37 @@ try:
 		# Strip out models as they go through the new importer last
 		StripMDLsFromRefs( prefab_refs_file )
 
-		# Import and compile prefab models and their materials
-		ImportAndCompileMapMDLs( s2contentcsgoimported + "\\maps\\" + mapname + "_prefab_mdl_lst.txt", s2addon, errorCallback )
+		prefab_stage_hash = HashFile(refs_file)
+		if JournalStageDone(journal, "prefab_dependencies", prefab_stage_hash):
+			print("Prefab dependencies unchanged since the last import, skipping")
+		else:
+			# The final VMF import must follow these imports even if some of them fail
+			if journal is not None:
+				journal['stages'].pop(REIMPORT_STAGE, None)
+
+			# Import and compile prefab models and their materials
+			prefab_errors = []
+			ImportAndCompileMapMDLs( s2contentcsgoimported + "\\maps\\" + mapname + "_prefab_mdl_lst.txt", s2addon, TrackedErrorCallback(prefab_errors) )
 
-		# Import and compile prefab refs (excluding mdls) - uses -filelist for speed
-		ImportAndCompileMapRefs( s2contentcsgoimported + "\\maps\\" + mapname + "_prefab_new_refs.txt", s2addon, errorCallback )
+			# Import and compile prefab refs (excluding mdls) - uses -filelist for speed
+			ImportAndCompileMapRefs( s2contentcsgoimported + "\\maps\\" + mapname + "_prefab_new_refs.txt", s2addon, TrackedErrorCallback(prefab_errors) )
+			if not prefab_errors:
+				JournalMarkStage(journal, "prefab_dependencies", prefab_stage_hash)
 
-		print("Re-importing VMF to update with compiled assets...")
-		# Quick import vmf again (taking dependencies into account now that materials in particular have been imported/compiled) 
-		try:
-			utl.RunCommand( mapImportCmd, errorCallback )
-			print("Successfully completed final VMF import")
-		except Exception as e:
-			print(f"Warning: Final VMF import failed: {e}")
-			print("Import process completed with some errors")
+		if JournalStageDone(journal, REIMPORT_STAGE, vmf_stage_hash):
+			print("Nothing was imported since the last VMF re-import, skipping final VMF import")
+		else:
+			print("Re-importing VMF to update with compiled assets...")
+			# Quick import vmf again (taking dependencies into account now that materials in particular have been imported/compiled) 
+			try:
+				reimport_errors = []
+				utl.RunCommand( mapImportCmd, TrackedErrorCallback(reimport_errors) )
+				if not reimport_errors:
+					JournalMarkStage(journal, REIMPORT_STAGE, vmf_stage_hash)
+				print("Successfully completed final VMF import")
+			except Exception as e:
+				print(f"Warning: Final VMF import failed: {e}")
+				print("Import process completed with some errors")
 	else:
 		print(f"No refs file found, skipping prefab dependency processing")
 	
@@ -1023,14 +1500,12 @@ try:
 		# Move the entire prefabs folder to maps\prefabs\
 		dest_prefabs = os.path.join(maps_prefabs_dir, mapname)
 		
-		# If destination exists, remove it first
-		if os.path.exists(dest_prefabs):
-			import shutil
-			shutil.rmtree(dest_prefabs)
-		
-		# Move prefabs\MAPNAME to maps\prefabs\MAPNAME
+		# Move prefabs\MAPNAME to maps\prefabs\MAPNAME, replacing the previous copy only when there is a new one
+		# (a resumed run that skips the VMF imports writes no new prefabs)
 		src_prefabs = os.path.join(prefabs_root, mapname)
 		if os.path.exists(src_prefabs):
+			if os.path.exists(dest_prefabs):
+				shutil.rmtree(dest_prefabs)
 			shutil.move(src_prefabs, dest_prefabs)
 			print(f"Moved prefabs folder to maps\\prefabs\\{mapname}")
 		
@@ -1085,6 +1560,9 @@ finally:
 	
 	# Restore VPK signature checking
 	RestoreVPKSignatures(vpk_sig_path, vpk_sig_old)
+	
+	# Keep whatever completed, so an interrupted run resumes from here
+	SaveImportJournal(journal)
 
 # restore VALVE_NO_AUTO_P4 environment var
 utl.RestoreEnv()
@@ -0,0 +1,202 @@
+"""
+Sky Reprojection
+Vectorized conversion between equirectangular panoramas and Source-orientation cubemap faces
+Bilinear sampling uses lookup tables that are computed once per resolution and cached
+"""
+
+import os
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Source (Quake) face orientation, Z up. A face pixel looks along forward + s * s_axis + t * t_axis,
+# where s runs from -1 (left column) to 1 (right column) and t from 1 (top row) to -1 (bottom row).
+FACE_AXES = {
+    'right': ((1, 0, 0), (0, -1, 0), (0, 0, 1)),
+    'left':  ((-1, 0, 0), (0, 1, 0), (0, 0, 1)),
+    'back':  ((0, 1, 0), (1, 0, 0), (0, 0, 1)),
+    'front': ((0, -1, 0), (-1, 0, 0), (0, 0, 1)),
+    'up':    ((0, 0, 1), (0, -1, 0), (-1, 0, 0)),
+    'down':  ((0, 0, -1), (0, -1, 0), (1, 0, 0)),
+}
+FACES = tuple(FACE_AXES)
+
+# Panorama longitude offset of each side face relative to 'right' (the panorama center), in quarter turns
+SIDE_FACE_QUARTERS = {'right': 0, 'back': 1, 'left': 2, 'front': -1}
+
+# Output rows sampled per step, so temporary arrays stay small for 8K panoramas
+SAMPLE_CHUNK_ROWS = 256
+# Chunks are sampled on threads (NumPy releases the GIL); each holds its own temporaries
+SAMPLE_THREADS = min(8, os.cpu_count() or 1)
+
+
+def face_directions(face, size):
+    """(size, size, 3) float32 view directions (not normalized) through the pixel centers of a face."""
+    forward, s_axis, t_axis = (np.array(axis, dtype=np.float32) for axis in FACE_AXES[face])
+    coords = (np.arange(size, dtype=np.float32) + 0.5) * (2.0 / size) - 1.0
+    s = coords[np.newaxis, :, np.newaxis]
+    t = -coords[:, np.newaxis, np.newaxis]
+    return forward + s * s_axis + t * t_axis
+
+
+def directions_to_equirect(directions, width, height):
+    """Panorama pixel coordinates (x, y) of view directions. The panorama center looks along +X."""
+    x, y, z = directions[..., 0], directions[..., 1], directions[..., 2]
+    longitude = np.arctan2(y, x)
+    latitude = np.arctan2(z, np.hypot(x, y))
+    px = (0.5 - longitude / (2 * np.pi)) * width - 0.5
+    py = (0.5 - latitude / np.pi) * height - 0.5
+    return px.astype(np.float32), py.astype(np.float32)
+
+
+@lru_cache(maxsize=4)
+def _equirect_base_luts(size, width, height):
+    """Panorama sample coordinates of the 'right' and 'up' faces; every other face is derived from these."""
+    return (directions_to_equirect(face_directions('right', size), width, height),
+            directions_to_equirect(face_directions('up', size), width, height))
+
+
+def equirect_face_lut(face, size, width, height):
+    """(px, py) panorama sample coordinates for every pixel of a size x size face."""
+    (side_x, side_y), (up_x, up_y) = _equirect_base_luts(size, width, height)
+    if face in SIDE_FACE_QUARTERS:
+        # Side faces are the 'right' face turned about Z: the same rows, shifted in longitude
+        return side_x - SIDE_FACE_QUARTERS[face] * (width / 4), side_y
+    if face == 'up':
+        return up_x, up_y
+    # 'down' mirrors 'up' through the horizon
+    return up_x[::-1], (height - 1) - up_y[::-1]
+
+
+@lru_cache(maxsize=2)
+def cubemap_lut(width, height, size):
+    """
+    (px, py) sample coordinates of every panorama pixel in a face atlas: the six faces stacked
+    vertically in FACES order. Coordinates are clamped inside their face, so the bilinear
+    filter never blends across a face boundary.
+    """
+    longitude = (0.5 - (np.arange(width, dtype=np.float32) + 0.5) / width) * (2 * np.pi)
+    latitude = (0.5 - (np.arange(height, dtype=np.float32) + 0.5) / height) * np.pi
+    axis_faces = np.array([[FACES.index('right'), FACES.index('left')],
+                           [FACES.index('back'), FACES.index('front')],
+                           [FACES.index('up'), FACES.index('down')]], dtype=np.uint8)
+    face_axes = [tuple(np.array(v, dtype=np.float32) for v in FACE_AXES[face]) for face in FACES]
+
+    col = np.empty((height, width), dtype=np.float32)
+    row = np.empty((height, width), dtype=np.float32)
+    for y0 in range(0, height, SAMPLE_CHUNK_ROWS):
+        rows = slice(y0, y0 + SAMPLE_CHUNK_ROWS)
+        cos_lat = np.cos(latitude[rows])[:, np.newaxis]
+        directions = np.stack(np.broadcast_arrays(cos_lat * np.cos(longitude), cos_lat * np.sin(longitude),
+                                                  np.sin(latitude[rows])[:, np.newaxis]), axis=-1)
+
+        # The dominant axis picks the face
+        axis = np.argmax(np.abs(directions), axis=-1)
+        negative = np.take_along_axis(directions, axis[..., np.newaxis], axis=-1)[..., 0] < 0
+        chunk_faces = axis_faces[axis, negative.astype(np.intp)]
+
+        chunk_col = col[rows]
+        chunk_row = row[rows]
+        for index, (forward, s_axis, t_axis) in enumerate(face_axes):
+            mask = chunk_faces == index
+            d = directions[mask]
+            depth = d @ forward
+            chunk_col[mask] = np.clip(((d @ s_axis) / depth + 1.0) * (size / 2.0) - 0.5, 0, size - 1)
+            chunk_row[mask] = np.clip((1.0 - (d @ t_axis) / depth) * (size / 2.0) - 0.5, 0, size - 1) + index * size
+    return col, row
+
+
+def clear_lut_cache():
+    """Drop every cached lookup table."""
+    _equirect_base_luts.cache_clear()
+    cubemap_lut.cache_clear()
+
+
+def _bilinear(image, px, py, wrap_x):
+    """Bilinear samples of an (h, w, c) image at float coordinates. x wraps around or clamps; y clamps."""
+    height, width, channels = image.shape
+    flat = image.reshape(height * width, channels)
+    x0 = np.floor(px)
+    y0 = np.floor(py)
+    fx = (px - x0)[..., np.newaxis]
+    fy = (py - y0)[..., np.newaxis]
+    x0 = x0.astype(np.intp)
+    y0 = y0.astype(np.intp)
+    if wrap_x:
+        x1 = (x0 + 1) % width
+        x0 %= width
+    else:
+        x1 = np.clip(x0 + 1, 0, width - 1)
+        x0 = np.clip(x0, 0, width - 1)
+    # Row offsets into the flattened image: one 1-D gather per corner is much cheaper than 2-D indexing
+    row1 = np.clip(y0 + 1, 0, height - 1) * width
+    row0 = np.clip(y0, 0, height - 1) * width
+
+    left = np.take(flat, row0 + x0, axis=0).astype(np.float32)
+    top = left + (np.take(flat, row0 + x1, axis=0) - left) * fx
+    left = np.take(flat, row1 + x0, axis=0).astype(np.float32)
+    bottom = left + (np.take(flat, row1 + x1, axis=0) - left) * fx
+    return top + (bottom - top) * fy
+
+
+def _sample_rows(output, sample):
+    """Fills output chunk by chunk with sample(rows) on a thread pool."""
+    chunks = [slice(y0, y0 + SAMPLE_CHUNK_ROWS) for y0 in range(0, output.shape[0], SAMPLE_CHUNK_ROWS)]
+
+    def fill(rows):
+        output[rows] = sample(rows)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(SAMPLE_THREADS, len(chunks)))) as executor:
+        list(executor.map(fill, chunks))
+    return output
+
+
+def _to_dtype(samples, dtype):
+    """Blended float samples back to the source dtype (rounded for 8-bit images)."""
+    if dtype == np.uint8:
+        return (samples + 0.5).astype(np.uint8)
+    return samples.astype(dtype, copy=False)
+
+
+def equirect_to_faces(panorama, face_size=None):
+    """
+    Reprojects an (h, w, c) equirectangular panorama into the six cubemap faces.
+
+    Args:
+        panorama: uint8 or float32 array; the center of the image looks along +X ('right')
+        face_size: Edge length of the faces. If None, a quarter of the panorama width
+
+    Returns:
+        Dict face name ('right', 'left', 'back', 'front', 'up', 'down') -> (size, size, c) array
+        in Source face orientation, with the panorama's dtype
+    """
+    height, width = panorama.shape[:2]
+    size = face_size or max(1, width // 4)
+    faces = {}
+    for face in FACES:
+        px, py = equirect_face_lut(face, size, width, height)
+        faces[face] = _sample_rows(np.empty((size, size, panorama.shape[2]), dtype=panorama.dtype),
+                                   lambda rows: _to_dtype(_bilinear(panorama, px[rows], py[rows], wrap_x=True),
+                                                          panorama.dtype))
+    return faces
+
+
+def faces_to_equirect(faces, width=None):
+    """
+    Reprojects six Source-orientation faces (see equirect_to_faces) into an equirectangular panorama.
+
+    Args:
+        faces: Dict face name -> (size, size, c) array; all faces share size and dtype
+        width: Panorama width (height is half of it). If None, four times the face size
+
+    Returns:
+        (width / 2, width, c) array with the faces' dtype
+    """
+    first = faces[FACES[0]]
+    size = first.shape[0]
+    width = width or size * 4
+    height = max(1, width // 2)
+    px, py = cubemap_lut(width, height, size)
+    atlas = np.concatenate([faces[face] for face in FACES], axis=0)
+    return _sample_rows(np.empty((height, width, first.shape[2]), dtype=first.dtype),
+                        lambda rows: _to_dtype(_bilinear(atlas, px[rows], py[rows], wrap_x=False), first.dtype))
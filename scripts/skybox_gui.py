@@ -12,9 +12,12 @@ import os
 import subprocess
 import threading
 import tempfile
+import queue
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import filedialog
 import tkinter as tk
 from PIL import Image
+import numpy as np
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -24,11 +27,24 @@ from scripts.SkyboxConverter import (
     find_vtfcmd,
     stitch_cubemap_rotated,
     create_vmat_files_conditionally,
-    clean_up_original_source_files
+    clean_up_original_source_files,
+    EQUIRECT_KEY,
+    find_skybox_sets_recursive,
+    convert_skybox_batch,
+    last_log_line,
+    read_vtf_info,
+    is_supported_format,
+    to_rgba8,
+    decode_vtf_cached,
+    load_exr_image
 )
+from scripts.vtf_reader import mip_level_for_size
 
 # Constants
 CUSTOM_TITLE_BAR_HEIGHT = 30
+PREVIEW_TEXTURE_SIZE = 128  # Longest side of decoded preview textures
+PREVIEW_DISPLAY_SIZE = 64  # On-screen size of the face thumbnails
+PREVIEW_UPLOAD_BYTES_PER_FRAME = 256 * 1024  # GL upload budget per frame for previews
 
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller"""
@@ -38,6 +54,118 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
+def decode_preview(image_path, max_size=PREVIEW_TEXTURE_SIZE):
+    """
+    Decodes a skybox face to an RGBA array no larger than max_size (no GL calls, safe on worker threads).
+    VTFs only decode the smallest mip that is still large enough.
+    """
+    path_lower = image_path.lower()
+    if path_lower.endswith('.vtf'):
+        header = read_vtf_info(image_path)
+        if not is_supported_format(header['image_format']):
+            raise ValueError(f"{header['format_name']} VTFs have no preview")
+        pixels = decode_vtf_cached(image_path, mip_level_for_size(header, max_size))
+        image = Image.fromarray(to_rgba8(pixels), 'RGBA')
+    elif path_lower.endswith('.exr'):
+        image = load_exr_image(image_path)
+    else:
+        with Image.open(image_path) as img:
+            img.draft('RGB', (max_size, max_size))  # JPEGs decode directly at a reduced scale
+            image = img.convert('RGBA')
+    
+    image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    return np.ascontiguousarray(np.asarray(image))
+
+class PreviewTextureCache:
+    """
+    Preview textures for the selected faces. Images are decoded and downscaled on worker
+    threads, then uploaded to GL a few rows per frame so the render thread never stalls.
+    Textures are cached by (path, mtime), so reselecting a file is free until it changes.
+    """
+    def __init__(self, max_workers=2):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.textures = {}  # (path, mtime_ns) -> (texture_id, width, height), or None if it has no preview
+        self.pending = set()  # Keys being decoded or uploaded
+        self.decoded = queue.Queue()  # (key, pixels or None) handed over by the workers
+        self.uploading = None  # [key, texture_id, pixels, next_row] of the texture being uploaded
+    
+    def get(self, image_path):
+        """(texture_id, width, height) once the preview is uploaded, else None. Starts decoding on first request."""
+        try:
+            key = (os.path.abspath(image_path), os.stat(image_path).st_mtime_ns)
+        except OSError:
+            return None
+        if key in self.textures:
+            return self.textures[key]
+        if key not in self.pending:
+            self.pending.add(key)
+            self.executor.submit(self._decode, key)
+        return None
+    
+    def _decode(self, key):
+        """Worker thread: decode one preview and queue it for upload"""
+        try:
+            pixels = decode_preview(key[0])
+        except Exception as e:
+            print(f"No preview for {os.path.basename(key[0])}: {e}")
+            pixels = None
+        self.decoded.put((key, pixels))
+    
+    def upload(self, byte_budget=PREVIEW_UPLOAD_BYTES_PER_FRAME):
+        """Uploads decoded previews within a per-frame byte budget. Call once per frame on the GL thread."""
+        while byte_budget > 0:
+            if self.uploading is None:
+                try:
+                    key, pixels = self.decoded.get_nowait()
+                except queue.Empty:
+                    return
+                if pixels is None:
+                    self._finish(key, None)
+                    continue
+                
+                # Allocate the texture now, fill it over the next frames
+                height, width = pixels.shape[:2]
+                texture_id = gl.glGenTextures(1)
+                gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
+                gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
+                gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
+                gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, width, height, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+                self.uploading = [key, texture_id, pixels, 0]
+            
+            key, texture_id, pixels, row = self.uploading
+            height, width = pixels.shape[:2]
+            rows = max(1, min(height - row, byte_budget // (width * 4)))
+            gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
+            gl.glPixelStorei(gl.GL_UNPACK_ALIGNMENT, 1)
+            gl.glTexSubImage2D(gl.GL_TEXTURE_2D, 0, 0, row, width, rows, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE,
+                               pixels[row:row + rows].tobytes())
+            byte_budget -= rows * width * 4
+            
+            if row + rows >= height:
+                self.uploading = None
+                self._finish(key, (texture_id, width, height))
+            else:
+                self.uploading[3] = row + rows
+    
+    def _finish(self, key, texture):
+        """Store a finished preview, replacing any older version of the same file"""
+        for old_key in [k for k in self.textures if k[0] == key[0]]:
+            old_texture = self.textures.pop(old_key)
+            if old_texture:
+                gl.glDeleteTextures([old_texture[0]])
+        self.textures[key] = texture
+        self.pending.discard(key)
+    
+    def shutdown(self):
+        """Stop the workers and free every texture (GL context must still be current)"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        texture_ids = [texture[0] for texture in self.textures.values() if texture]
+        if self.uploading is not None:
+            texture_ids.append(self.uploading[1])
+        if texture_ids:
+            gl.glDeleteTextures(texture_ids)
+        self.textures.clear()
+
 class SkyboxConverterApp:
     def __init__(self):
         self.window = None
@@ -49,6 +177,7 @@ class SkyboxConverterApp:
     # Application state
         self.skybox_files = []  # List of 6 selected files
         self.skybox_files_status = "Not selected"
+        self.batch_sets = []  # (name, file_map) for every skybox in a selected folder
         self.output_mode = "custom"  # "custom" or "addon"
         self.output_dir = None
         self.skybox_prefix = "skybox_custom"
@@ -80,7 +209,7 @@ class SkyboxConverterApp:
         self.show_done_popup = False
         
         # Window dimensions
-        self.base_window_height = 570
+        self.base_window_height = 570 + PREVIEW_DISPLAY_SIZE
           # Optimized for compact checkbox layout
         self.window_padding = 20
         
@@ -101,6 +230,9 @@ class SkyboxConverterApp:
         # Button icons
         self.button_icons = {}
         
+        # Face previews (decoded in the background, uploaded incrementally)
+        self.previews = PreviewTextureCache()
+        
         # Auto-detect CS2 path
         self.auto_detect_cs2()
         
@@ -161,17 +293,17 @@ class SkyboxConverterApp:
             if vtf_path:
                 self.log(f"VTF tools ready: {os.path.basename(vtf_path)}")
             else:
-                self.log("Warning: VTF tools not available - conversion will fail")
+                self.log("VTFCmd.exe not available - VTFs are decoded by the built-in reader (common formats only)")
         except Exception as e:
             self.log(f"Error checking VTF tools: {e}")
     
     def select_all_skybox_files(self):
-        """Open file dialog to select all 6 skybox face images at once"""
+        """Open file dialog to select all 6 skybox face images at once (or one equirectangular panorama)"""
         root = tk.Tk()
         root.withdraw()
         
         file_paths = filedialog.askopenfilenames(
-            title="Select all 6 skybox face images (up, down, left, right, front, back)",
+            title="Select all 6 skybox face images (up, down, left, right, front, back) or one panorama",
             filetypes=[
                 ("Image files", "*.vtf *.png *.jpg *.jpeg *.tga *.exr"),
                 ("All files", "*.*")
@@ -179,13 +311,14 @@ class SkyboxConverterApp:
         )
         
         if file_paths:
-            if len(file_paths) != 6:
-                self.status_message = f"Error: Please select exactly 6 files. You selected {len(file_paths)}"
+            if len(file_paths) not in (1, 6):
+                self.status_message = f"Error: Please select 6 faces or 1 panorama. You selected {len(file_paths)}"
                 self.status_color = (1.0, 0.0, 0.0, 1.0)
                 return
             
             self.skybox_files = list(file_paths)
-            self.skybox_files_status = f"Selected {len(file_paths)} files"
+            self.batch_sets = []
+            self.skybox_files_status = f"Selected {len(file_paths)} files" if len(file_paths) == 6 else "Selected equirectangular panorama"
             
             # Auto-generate skybox prefix from first file
             first_file = os.path.splitext(os.path.basename(file_paths[0]))[0]
@@ -203,6 +336,27 @@ class SkyboxConverterApp:
             for file_path in file_paths:
                 self.log(f"  - {os.path.basename(file_path)}")
     
+    def select_skybox_folder(self):
+        """Open dialog to select a folder; every complete skybox inside it (recursively) is converted"""
+        root = tk.Tk()
+        root.withdraw()
+        
+        dir_path = filedialog.askdirectory(title="Select a folder containing skyboxes (subfolders included)")
+        
+        if dir_path:
+            self.batch_sets = find_skybox_sets_recursive(dir_path)
+            if not self.batch_sets:
+                self.status_message = "Error: No complete skybox (6 faces) found in that folder"
+                self.status_color = (1.0, 0.0, 0.0, 1.0)
+                self.skybox_files_status = "Not selected"
+                return
+            
+            self.skybox_files = []
+            self.skybox_files_status = f"Batch: {len(self.batch_sets)} skyboxes in {os.path.basename(dir_path)}"
+            self.log(f"Found {len(self.batch_sets)} skyboxes in {dir_path}")
+            for name, file_map in self.batch_sets:
+                self.log(f"  - {name}")
+    
     def select_output_directory(self):
         """Open dialog to select output directory"""
         root = tk.Tk()
@@ -217,8 +371,8 @@ class SkyboxConverterApp:
     def start_conversion(self):
         """Start skybox conversion in background thread"""
         # Validate inputs
-        if len(self.skybox_files) != 6:
-            self.status_message = "Error: Please select all 6 skybox faces"
+        if len(self.skybox_files) not in (1, 6) and not self.batch_sets:
+            self.status_message = "Error: Please select all 6 skybox faces or a panorama"
             self.status_color = (1.0, 0.0, 0.0, 1.0)
             return
         
@@ -234,7 +388,7 @@ class SkyboxConverterApp:
                 self.status_color = (1.0, 0.0, 0.0, 1.0)
                 return
         
-        if not self.skybox_prefix.strip():
+        if not self.skybox_prefix.strip() and not self.batch_sets:
             # Generate prefix from first file if empty
             if self.skybox_files:
                 first_file = os.path.splitext(os.path.basename(self.skybox_files[0]))[0]
@@ -289,13 +443,21 @@ class SkyboxConverterApp:
                 output_dir = self.output_dir
                 self.log(f"Output to directory: {output_dir}")
             
+            if self.batch_sets:
+                self.run_batch_conversion(output_dir)
+                return
+            
             # Create a mapping of face names to file paths
             # The skybox files are expected in order: right, left, back, front, up, down
             # Map them to the keys expected by stitch_cubemap_rotated
             face_names = ['right', 'left', 'back', 'front', 'up', 'down']
             file_map = {}
             
-            if len(self.skybox_files) == 6:
+            if len(self.skybox_files) == 1:
+                # A single file is an equirectangular panorama, reprojected to the six faces
+                file_map[EQUIRECT_KEY] = self.skybox_files[0]
+                self.log(f"Panorama: {os.path.basename(self.skybox_files[0])}")
+            elif len(self.skybox_files) == 6:
                 for i, face in enumerate(face_names):
                     file_map[face] = self.skybox_files[i]
                     self.log(f"Mapped {face}: {os.path.basename(self.skybox_files[i])}")
@@ -357,24 +519,42 @@ class SkyboxConverterApp:
         finally:
             self.conversion_in_progress = False
     
+    def run_batch_conversion(self, output_dir):
+        """Convert every skybox of the selected folder on a process pool (called from the conversion thread)"""
+        def report(done, total, name, success, log):
+            self.log(f"[{done}/{total}] {'[OK]' if success else '[FAILED]'} {name}: {last_log_line(log)}")
+            self.status_message = f"Converting... {done}/{total} skyboxes"
+        
+        self.log(f"Converting {len(self.batch_sets)} skyboxes...")
+        stats = convert_skybox_batch(self.batch_sets, output_dir, progress_callback=report,
+                                     create_skybox_vmat=self.create_skybox_vmat,
+                                     create_moondome_vmat=self.create_moondome_vmat)
+        
+        # Full logs of failed skyboxes
+        for name, success, log in stats['results']:
+            if not success:
+                self.log(f"===== {name} =====\n{log}")
+        
+        # Optional cleanup of the converted skyboxes' source files
+        if self.cleanup_source_files:
+            converted = {name for name, success, _ in stats['results'] if success}
+            clean_up_original_source_files([path for name, file_map in self.batch_sets if name in converted
+                                            for path in file_map.values()])
+        
+        summary = f"{stats['converted']} converted, {stats['failed']} failed ({stats['seconds']:.1f}s)"
+        self.log(f"Batch complete: {summary}")
+        if stats['failed']:
+            self.status_message = f"Batch finished with errors: {summary}"
+            self.status_color = (1.0, 0.5, 0.0, 1.0)
+        else:
+            self.status_message = f"Batch completed successfully: {summary}"
+            self.status_color = (0.0, 1.0, 0.0, 1.0)
+        self.conversion_completed = True
+        self.show_done_popup = True
+    
     def load_texture(self, image_path):
-        """Load image texture for ImGui"""
-        try:
-            image = Image.open(image_path)
-            image = image.convert("RGBA")
-            width, height = image.size
-            image_data = image.tobytes()
-            
-            texture_id = gl.glGenTextures(1)
-            gl.glBindTexture(gl.GL_TEXTURE_2D, texture_id)
-            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_LINEAR)
-            gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_LINEAR)
-            gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA, width, height, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, image_data)
-            
-            return texture_id, width, height
-        except Exception as e:
-            print(f"Failed to load texture {image_path}: {e}")
-            return None, 0, 0
+        """Preview texture for an image: (texture_id, width, height), or (None, 0, 0) while it is still loading"""
+        return self.previews.get(image_path) or (None, 0, 0)
     
     def init_imgui(self):
         """Initialize ImGui and GLFW"""
@@ -602,6 +782,21 @@ class SkyboxConverterApp:
         # Add separator line
         imgui.separator()
     
+    def render_face_previews(self):
+        """Row of thumbnails for the selected faces; empty slots are shown while they load"""
+        for i in range(6):
+            if i:
+                imgui.same_line()
+            texture = self.previews.get(self.skybox_files[i]) if i < len(self.skybox_files) else None
+            if texture:
+                texture_id, width, height = texture
+                scale = PREVIEW_DISPLAY_SIZE / max(width, height)
+                imgui.image(texture_id, width * scale, height * scale)
+                if imgui.is_item_hovered():
+                    imgui.set_tooltip(os.path.basename(self.skybox_files[i]))
+            else:
+                imgui.dummy(PREVIEW_DISPLAY_SIZE, PREVIEW_DISPLAY_SIZE)
+    
     def render_main_content(self):
         """Render the main application content"""
         
@@ -610,13 +805,20 @@ class SkyboxConverterApp:
         imgui.separator()
         
         # Display selection status
-        status_color = (0.0, 1.0, 0.0, 1.0) if len(self.skybox_files) == 6 else (1.0, 0.0, 0.0, 1.0)
+        status_color = (0.0, 1.0, 0.0, 1.0) if len(self.skybox_files) in (1, 6) or self.batch_sets else (1.0, 0.0, 0.0, 1.0)
         imgui.text_colored(self.skybox_files_status, *status_color)
         
         if imgui.button("Select All 6 Skybox Files", width=0, height=30):
             self.select_all_skybox_files()
         
-        imgui.text_colored("(Select up, down, left, right, front, back - in any order)", 0.7, 0.7, 0.7, 1.0)
+        imgui.same_line()
+        
+        if imgui.button("Select Folder (Batch)", width=0, height=30):
+            self.select_skybox_folder()
+        
+        imgui.text_colored("(Select up, down, left, right, front, back - in any order - or one panorama)", 0.7, 0.7, 0.7, 1.0)
+        
+        self.render_face_previews()
         
         imgui.separator()
         imgui.spacing()
@@ -729,6 +931,9 @@ class SkyboxConverterApp:
             glfw.poll_events()
             self.impl.process_inputs()
             
+            # Upload a slice of any decoded previews
+            self.previews.upload()
+            
             # Check for theme updates from main app
             if self.theme_manager.check_for_updates():
                 self._apply_theme()
@@ -772,10 +977,14 @@ class SkyboxConverterApp:
             
             glfw.swap_buffers(self.window)
         
+        self.previews.shutdown()
         self.impl.shutdown()
         glfw.terminate()
 
 
 if __name__ == "__main__":
+    # Batch conversion runs on worker processes (required for frozen executables)
+    import multiprocessing
+    multiprocessing.freeze_support()
     app = SkyboxConverterApp()
     app.run()
@@ -0,0 +1,130 @@
+"""
+Texture Cache
+Content-addressed on-disk cache of decoded textures, shared by the skybox converter and VTF2PNG
+Entries live in %TEMP%/.CS2KZ-mapping-tools/texture_cache and are evicted least-recently-used first
+"""
+
+import os
+import hashlib
+import tempfile
+import numpy as np
+
+from vtf_reader import decode_vtf
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), '.CS2KZ-mapping-tools', 'texture_cache')
+CACHE_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+CACHE_FORMAT_VERSION = 1  # Bump when decoder output changes so old entries are ignored
+
+# Set CS2KZ_TEXTURE_CACHE=0 to bypass the cache entirely
+CACHE_ENABLED = os.environ.get('CS2KZ_TEXTURE_CACHE', '1') != '0'
+
+_hash_memo = {}  # (path, size, mtime_ns) -> sha1, so a file is only hashed once per process
+_bytes_since_trim = None  # None until the first trim of this process
+
+
+def file_content_hash(path):
+    """SHA-1 of a file's contents, memoized per (path, size, mtime) for this process."""
+    stat = os.stat(path)
+    memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    digest = _hash_memo.get(memo_key)
+    if digest is None:
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha1.update(chunk)
+        digest = sha1.hexdigest()
+        _hash_memo[memo_key] = digest
+    return digest
+
+
+def cache_key(source_path, params):
+    """Cache key for a source file's contents plus the conversion parameters (a string)."""
+    key_source = f"{file_content_hash(source_path)}|{params}|v{CACHE_FORMAT_VERSION}"
+    return hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(CACHE_DIR, key[:2], key + '.npy')
+
+
+def trim_cache(max_bytes=CACHE_MAX_BYTES):
+    """Delete least-recently-used entries until the cache fits in max_bytes. Returns bytes freed."""
+    global _bytes_since_trim
+    _bytes_since_trim = 0
+    entries = []
+    total = 0
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    for bucket in os.scandir(CACHE_DIR):
+        if not bucket.is_dir():
+            continue
+        for entry in os.scandir(bucket.path):
+            if entry.name.endswith('.npy'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+    freed = 0
+    # Entry mtime is refreshed on every hit, so oldest mtime = least recently used
+    for _, size, path in sorted(entries):
+        if total - freed <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            freed += size
+        except OSError:
+            pass  # In use or already removed by another process
+    return freed
+
+
+def cached_array(source_path, params, produce):
+    """
+    Return the cached array for (source contents, params), or call produce() and cache its result.
+    Cache I/O problems never fail the caller; they just fall back to produce().
+    """
+    global _bytes_since_trim
+    if not CACHE_ENABLED:
+        return produce()
+
+    try:
+        path = _entry_path(cache_key(source_path, params))
+    except OSError:
+        return produce()
+
+    if os.path.exists(path):
+        try:
+            array = np.load(path, allow_pickle=False)
+            os.utime(path)  # Mark as recently used
+            return array
+        except (OSError, ValueError):
+            pass  # Corrupt or evicted mid-read: rebuild below
+
+    array = produce()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a unique name and rename, so concurrent workers never see partial files
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(array), allow_pickle=False)
+        os.replace(temp_path, path)
+
+        if _bytes_since_trim is None:
+            trim_cache()
+        else:
+            _bytes_since_trim += array.nbytes
+            if _bytes_since_trim > CACHE_MAX_BYTES // 10:
+                trim_cache()
+    except OSError as e:
+        print(f"Warning: Could not write texture cache entry: {e}")
+    return array
+
+
+def decode_vtf_cached(vtf_path, mip_level=0, frame=0, face=0):
+    """vtf_reader.decode_vtf through the shared cache (same arguments and return value)."""
+    return cached_array(vtf_path, f"vtf-rgba:{mip_level}:{frame}:{face}",
+                        lambda: decode_vtf(vtf_path, mip_level, frame, face))
+
+
+def clear_cache():
+    """Remove every cache entry."""
+    trim_cache(0)
@@ -1,6 +1,11 @@
 """
 VTF to PNG Converter
-Converts all VTF files in the current directory to PNG format using VTFCmd.exe
+Converts all VTF files in the current directory to PNG format
+VTFs are decoded in-process (vtf_reader); VTFCmd.exe is only used for formats it does not support
+
+Usage:
+    vtf2png.py                            Convert *.vtf in the current directory
+    vtf2png.py <source_dir> [output_dir]  Mirror a whole tree, reconverting only changed files
 """
 
 import os
@@ -11,8 +16,20 @@ import shutil
 import urllib.request
 import zipfile
 import io
+import time
+import json
+import hashlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
 
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, script_dir)
+
+from PIL import Image
+from vtf_reader import read_vtf_info, is_supported_format, to_rgba8, decode_vtf
+from texture_cache import decode_vtf_cached
+
 # --- VTF Tools Path Detection ---
 def find_vtfcmd():
     """Find VTFCmd.exe in various locations, download if not found"""
@@ -103,17 +120,68 @@ def find_vtfcmd():
         print(f"[ERROR] Failed to download VTF tools: {e}")
         return None
 
-# Initialize VTFCmd path
-VTFCMD_PATH = find_vtfcmd()
-if not VTFCMD_PATH:
-    print("Error: VTFCmd.exe not found and could not be downloaded.")
-    print("Cannot proceed without VTF conversion tools.")
-    sys.exit(1)
+# VTFCmd.exe is only needed as a fallback, so it is located (or downloaded) on first use
+VTFCMD_PATH = None
+
+
+def get_vtfcmd_path():
+    """Return the VTFCmd.exe path, locating it on first use. Raises if unavailable."""
+    global VTFCMD_PATH
+    if VTFCMD_PATH is None:
+        VTFCMD_PATH = find_vtfcmd()
+        if not VTFCMD_PATH:
+            raise Exception("VTFCmd.exe not found and could not be downloaded")
+    return VTFCMD_PATH
+
+
+def needs_vtfcmd(vtf_path):
+    """True if the VTF's image format is not handled by the built-in decoder."""
+    return not is_supported_format(read_vtf_info(vtf_path)['image_format'])
+
+
+def describe_vtf(vtf_path):
+    """Short 'WxH FORMAT' summary read from the VTF header only (no pixel data is decoded)."""
+    try:
+        header = read_vtf_info(vtf_path)
+    except Exception as e:
+        return f"unreadable ({e})"
+    description = f"{header['width']}x{header['height']} {header['format_name']}"
+    if header['mipmap_count'] > 1:
+        description += f", {header['mipmap_count']} mips"
+    if header['faces'] > 1:
+        description += ", cubemap"
+    return description
+
+
+def convert_vtf_file(vtf_path, png_path, use_cache=True):
+    """
+    Convert a single VTF file to the given PNG path.
+    Raises on failure.
+    
+    use_cache reads and fills the shared texture cache; batch conversions turn it off, since they
+    decode every file once and cache entries are much larger than the VTFs.
+    """
+    if not needs_vtfcmd(vtf_path):
+        # Decoded pixels come from the shared texture cache when this VTF was seen before
+        pixels = decode_vtf_cached(vtf_path) if use_cache else decode_vtf(vtf_path)
+        Image.fromarray(to_rgba8(pixels), 'RGBA').save(png_path, format='PNG')
+        return png_path
+    
+    # Fallback: VTFCmd.exe writes <name>.png into the output directory
+    output_dir = os.path.dirname(png_path) or '.'
+    if not convert_with_vtfcmd(vtf_path, output_dir):
+        raise Exception("VTFCmd.exe conversion failed")
+    exported_png = os.path.join(output_dir, os.path.splitext(os.path.basename(vtf_path))[0] + '.png')
+    if not os.path.exists(exported_png):
+        raise Exception("Output file was not created")
+    if os.path.abspath(exported_png) != os.path.abspath(png_path):
+        os.replace(exported_png, png_path)
+    return png_path
 
 
 def convert_vtf_to_png(vtf_path, output_dir=None):
     """
-    Convert a single VTF file to PNG using VTFCmd.exe.
+    Convert a single VTF file to PNG.
     
     Args:
         vtf_path: Path to the VTF file
@@ -123,18 +191,35 @@ def convert_vtf_to_png(vtf_path, output_dir=None):
         True if successful, False otherwise
     """
     try:
-        base_name = os.path.basename(vtf_path)
-        
         # Determine output directory
         if output_dir is None:
             output_dir = os.path.dirname(vtf_path) or '.'
         
+        png_path = os.path.join(output_dir, os.path.splitext(os.path.basename(vtf_path))[0] + '.png')
+        convert_vtf_file(vtf_path, png_path)
+        return True
+        
+    except Exception as e:
+        print(f"  Error: {e}")
+        return False
+
+
+def convert_with_vtfcmd(vtf_path, output_dir):
+    """
+    Convert a single VTF file to PNG using VTFCmd.exe.
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        vtfcmd_path = get_vtfcmd_path()
+        
         # Use absolute paths
         abs_vtf_path = os.path.abspath(vtf_path)
         abs_output_dir = os.path.abspath(output_dir)
         
         # Get VTFCmd.exe directory to ensure VTFLib.dll is accessible
-        vtfcmd_dir = os.path.dirname(VTFCMD_PATH)
+        vtfcmd_dir = os.path.dirname(vtfcmd_path)
         vtflib_path = os.path.join(vtfcmd_dir, 'VTFLib.dll')
         
         if not os.path.exists(vtflib_path):
@@ -142,7 +227,7 @@ def convert_vtf_to_png(vtf_path, output_dir=None):
         
         # VTFCmd.exe command for VTF to PNG conversion
         cmd = [
-            VTFCMD_PATH,
+            vtfcmd_path,
             '-file', abs_vtf_path,
             '-output', abs_output_dir,
             '-exportformat', 'png'
@@ -170,6 +255,262 @@ def convert_vtf_to_png(vtf_path, output_dir=None):
         return False
 
 
+def _convert_job(vtf_path, png_path):
+    """Worker entry point: returns (success, message, input_bytes). Never raises."""
+    try:
+        input_bytes = os.path.getsize(vtf_path)
+        # One-shot conversions bypass the texture cache (nothing is decoded twice)
+        return True, convert_vtf_file(vtf_path, png_path, use_cache=False), input_bytes
+    except Exception as e:
+        return False, str(e), 0
+
+
+def convert_batch(jobs, max_workers=None, progress_callback=None, cancel_event=None):
+    """
+    Convert many VTF files in parallel on a bounded process pool.
+    
+    Args:
+        jobs: List of (vtf_path, png_path) tuples
+        max_workers: Worker processes. If None, uses the CPU count
+        progress_callback: Called on the calling thread after every file as
+            progress_callback(done, total, vtf_path, success, message)
+        cancel_event: Optional threading.Event; once set, no further files are started
+    
+    Returns:
+        dict: converted, failed, cancelled (files never started), results
+        [(vtf_path, success, message)], seconds, files_per_second, mb_per_second
+    """
+    total = len(jobs)
+    max_workers = max(1, min(max_workers or os.cpu_count() or 1, total))
+    stats = {'converted': 0, 'failed': 0, 'cancelled': 0, 'results': []}
+    input_bytes = 0
+    start_time = time.perf_counter()
+    
+    def record(vtf_path, result):
+        nonlocal input_bytes
+        success, message, size = result
+        input_bytes += size
+        stats['converted' if success else 'failed'] += 1
+        stats['results'].append((vtf_path, success, message))
+        if progress_callback:
+            progress_callback(len(stats['results']), total, vtf_path, success, message)
+    
+    if max_workers == 1:
+        # Not worth starting worker processes
+        for vtf_path, png_path in jobs:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            record(vtf_path, _convert_job(vtf_path, png_path))
+    else:
+        pending = iter(jobs)
+        in_flight = {}
+        
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            def submit_next():
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                job = next(pending, None)
+                if job is not None:
+                    in_flight[executor.submit(_convert_job, *job)] = job[0]
+            
+            # Keep a small queue per worker so cancellation takes effect quickly
+            for _ in range(max_workers * 2):
+                submit_next()
+            
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    vtf_path = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = (False, f"Worker error: {e}", 0)
+                    record(vtf_path, result)
+                    submit_next()
+    
+    seconds = time.perf_counter() - start_time
+    stats['cancelled'] = total - len(stats['results'])
+    stats['seconds'] = seconds
+    stats['files_per_second'] = len(stats['results']) / seconds if seconds > 0 else 0.0
+    stats['mb_per_second'] = input_bytes / (1024 * 1024) / seconds if seconds > 0 else 0.0
+    return stats
+
+
+def format_throughput(stats):
+    """One-line throughput summary for a convert_batch result."""
+    return (f"{len(stats['results'])} file(s) in {stats['seconds']:.1f}s "
+            f"({stats['files_per_second']:.1f} files/s, {stats['mb_per_second']:.1f} MB/s)")
+
+
+MANIFEST_NAME = ".vtf2png_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def _file_hash(path):
+    """SHA-1 of a file's contents, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Load a tree-conversion manifest ({relative vtf path: entry}); empty if missing or unreadable."""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == MANIFEST_VERSION:
+            return data.get('files', {})
+    except (OSError, ValueError):
+        pass
+    return {}
+
+
+def save_manifest(manifest_path, files):
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    temp_path = manifest_path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'files': files}, f, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+
+def _remove_empty_dirs(directory, root):
+    """Remove directory and its parents while they are empty, stopping at root."""
+    root = os.path.abspath(root)
+    directory = os.path.abspath(directory)
+    while directory != root and directory.startswith(root + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def convert_tree(source_dir, output_dir=None, max_workers=None, progress_callback=None, cancel_event=None):
+    """
+    Recursively convert a VTF tree into a mirrored PNG tree.
+    
+    A manifest in output_dir records each source's size, mtime and SHA-1. Unchanged sources
+    (same size and mtime, or same hash after a touch/copy) are skipped when their PNG still
+    exists, and PNGs whose source VTF was deleted are removed. Files that failed or were cancelled
+    stay in the manifest marked as failed, so they are retried next run and their outputs from an
+    earlier run are still cleaned up.
+    
+    Args:
+        source_dir: Root folder to scan for .vtf files
+        output_dir: Root of the mirrored PNG tree. If None, PNGs are written next to the VTFs
+        max_workers, progress_callback, cancel_event: Passed to convert_batch
+    
+    Returns:
+        dict: converted, failed, skipped, removed, cancelled and the convert_batch stats
+    """
+    source_dir = os.path.abspath(source_dir)
+    output_dir = os.path.abspath(output_dir or source_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    old_manifest = load_manifest(manifest_path)
+    manifest = {}
+    
+    # Scan the source tree (stat only)
+    sources = {}
+    for dirpath, dirnames, filenames in os.walk(source_dir):
+        # Don't descend into the output tree when it lives inside the source tree
+        dirnames[:] = [d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != output_dir]
+        for filename in filenames:
+            if filename.lower().endswith('.vtf'):
+                vtf_path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(vtf_path, source_dir).replace(os.sep, '/')
+                sources[rel_path] = vtf_path
+    
+    jobs = []
+    pending_entries = {}
+    skipped = 0
+    for rel_path, vtf_path in sorted(sources.items()):
+        stat = os.stat(vtf_path)
+        png_rel = os.path.splitext(rel_path)[0] + '.png'
+        png_path = os.path.join(output_dir, *png_rel.split('/'))
+        entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'output': png_rel}
+        previous = old_manifest.get(rel_path)
+        
+        if previous and not previous.get('failed') and previous.get('output') == png_rel and os.path.exists(png_path):
+            if previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+                manifest[rel_path] = previous
+                skipped += 1
+                continue
+            if previous.get('size') == stat.st_size:
+                # Timestamp changed (touched, copied, checked out again): compare contents
+                entry['sha1'] = _file_hash(vtf_path)
+                if entry['sha1'] == previous.get('sha1'):
+                    manifest[rel_path] = entry
+                    skipped += 1
+                    continue
+        
+        entry.setdefault('sha1', None)
+        pending_entries[vtf_path] = (rel_path, entry)
+        os.makedirs(os.path.dirname(png_path), exist_ok=True)
+        jobs.append((vtf_path, png_path))
+    
+    # Outputs whose source VTF no longer exists
+    removed = 0
+    for rel_path, previous in old_manifest.items():
+        if rel_path in sources:
+            continue
+        png_path = os.path.join(output_dir, *previous.get('output', '').split('/'))
+        if previous.get('output') and os.path.isfile(png_path):
+            os.remove(png_path)
+            removed += 1
+            if output_dir != source_dir:
+                _remove_empty_dirs(os.path.dirname(png_path), output_dir)
+    
+    stats = convert_batch(jobs, max_workers, progress_callback, cancel_event)
+    
+    # Failed or cancelled files are recorded as failed, so they are retried next run but still
+    # have their output removed once the source is deleted
+    succeeded = {vtf_path for vtf_path, success, message in stats['results'] if success}
+    for vtf_path, (rel_path, entry) in pending_entries.items():
+        if vtf_path in succeeded:
+            if entry['sha1'] is None:
+                entry['sha1'] = _file_hash(vtf_path)
+        else:
+            entry['failed'] = True
+        manifest[rel_path] = entry
+    save_manifest(manifest_path, manifest)
+    
+    return {
+        'converted': stats['converted'],
+        'failed': stats['failed'],
+        'skipped': skipped,
+        'removed': removed,
+        'cancelled': stats['cancelled'],
+        'stats': stats,
+    }
+
+
+def main_tree(source_dir, output_dir=None):
+    """Command line front end for convert_tree."""
+    print(f"Source: {os.path.abspath(source_dir)}")
+    print(f"Output: {os.path.abspath(output_dir or source_dir)}")
+    print("-" * 50)
+    
+    def report(done, total, vtf_path, success, message):
+        rel_path = os.path.relpath(vtf_path, source_dir)
+        if success:
+            print(f"[{done}/{total}] {rel_path}")
+        else:
+            print(f"[{done}/{total}] FAILED {rel_path}: {message}")
+    
+    summary = convert_tree(source_dir, output_dir, progress_callback=report)
+    
+    print("-" * 50)
+    print(f"Conversion complete!")
+    print(f"  Converted: {summary['converted']}")
+    print(f"  Skipped (up to date): {summary['skipped']}")
+    print(f"  Removed (source deleted): {summary['removed']}")
+    print(f"  Failed: {summary['failed']}")
+    print(f"  Throughput: {format_throughput(summary['stats'])}")
+
+
 def main():
     """Main function - convert all VTF files in current directory"""
     # Get current directory
@@ -183,28 +524,31 @@ def main():
         return
     
     print(f"Found {len(vtf_files)} VTF file(s)")
+    for vtf_file in vtf_files:
+        print(f"  {vtf_file.name}: {describe_vtf(vtf_file)}")
     print("-" * 50)
     
-    converted = 0
-    failed = 0
-    
-    for vtf_file in vtf_files:
-        print(f"Converting: {vtf_file.name}")
-        
-        if convert_vtf_to_png(vtf_file):
-            output_name = vtf_file.with_suffix('.png').name
-            print(f"  -> Saved: {output_name}")
-            converted += 1
+    def report(done, total, vtf_path, success, message):
+        if success:
+            print(f"[{done}/{total}] {os.path.basename(vtf_path)} -> {os.path.basename(message)}")
         else:
-            failed += 1
+            print(f"[{done}/{total}] FAILED {os.path.basename(vtf_path)}: {message}")
+    
+    jobs = [(str(vtf_file), str(vtf_file.with_suffix('.png'))) for vtf_file in vtf_files]
+    stats = convert_batch(jobs, progress_callback=report)
     
     print("-" * 50)
     print(f"Conversion complete!")
-    print(f"  Converted: {converted}")
-    print(f"  Failed: {failed}")
+    print(f"  Converted: {stats['converted']}")
+    print(f"  Failed: {stats['failed']}")
+    print(f"  Throughput: {format_throughput(stats)}")
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     print("VTF to PNG Converter")
     print("=" * 50)
-    main()
+    if len(sys.argv) > 1:
+        main_tree(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    else:
+        main()
@@ -1,12 +1,15 @@
 """
 VTF to PNG Converter - GUI Version
-Allows user to select multiple VTF files and converts them to PNG using VTFCmd.exe
+Allows user to select multiple VTF files and converts them to PNG
 """
 
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
 import os
 import sys
+import queue
+import threading
+import multiprocessing
 import subprocess
 import tempfile
 import urllib.request
@@ -18,12 +21,11 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, script_dir)
 
 try:
-    from vtf2png import find_vtfcmd, VTFCMD_PATH
-    VTF_SUPPORT = VTFCMD_PATH is not None
+    from vtf2png import convert_vtf_file, describe_vtf, convert_batch, format_throughput
+    VTF_SUPPORT = True
 except Exception as e:
     VTF_SUPPORT = False
-    VTFCMD_PATH = None
-    print(f"Warning: VTF tools not found: {e}")
+    print(f"Warning: VTF converter could not be loaded: {e}")
 
 # Helper function for PyInstaller resource paths
 def resource_path(relative_path):
@@ -37,7 +39,7 @@ def resource_path(relative_path):
 
 def convert_vtf_to_png(vtf_path, output_path=None):
     """
-    Convert a single VTF file to PNG using VTFCmd.exe.
+    Convert a single VTF file to PNG (built-in decoder, VTFCmd.exe only for unsupported formats).
     
     Args:
         vtf_path: Path to the VTF file
@@ -46,57 +48,14 @@ def convert_vtf_to_png(vtf_path, output_path=None):
     Returns:
         tuple: (success: bool, message: str)
     """
-    if not VTF_SUPPORT or not VTFCMD_PATH:
-        return False, "VTFCmd.exe is not available"
+    if not VTF_SUPPORT:
+        return False, "VTF conversion is not available"
     
     try:
-        base_name = os.path.basename(vtf_path)
-        
-        # Determine output directory
         if output_path is None:
-            output_dir = os.path.dirname(vtf_path) or '.'
             output_path = os.path.splitext(vtf_path)[0] + '.png'
-        else:
-            output_dir = os.path.dirname(output_path) or '.'
-        
-        # Use absolute paths
-        abs_vtf_path = os.path.abspath(vtf_path)
-        abs_output_dir = os.path.abspath(output_dir)
-        
-        # Get VTFCmd.exe directory to ensure VTFLib.dll is accessible
-        vtfcmd_dir = os.path.dirname(VTFCMD_PATH)
-        vtflib_path = os.path.join(vtfcmd_dir, 'VTFLib.dll')
-        
-        if not os.path.exists(vtflib_path):
-            return False, f"VTFLib.dll not found at: {vtflib_path}"
         
-        # VTFCmd.exe command for VTF to PNG conversion
-        cmd = [
-            VTFCMD_PATH,
-            '-file', abs_vtf_path,
-            '-output', abs_output_dir,
-            '-exportformat', 'png'
-        ]
-        
-        # Run VTFCmd.exe from its own directory to ensure DLL loading works
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            cwd=vtfcmd_dir,
-            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
-        )
-        
-        if result.returncode != 0:
-            error_msg = result.stderr if result.stderr else f"VTFCmd.exe failed with return code {result.returncode}"
-            return False, f"Conversion error: {error_msg}"
-        
-        # Check if output file was created
-        expected_png = os.path.join(abs_output_dir, os.path.splitext(base_name)[0] + '.png')
-        if os.path.exists(expected_png):
-            return True, expected_png
-        else:
-            return False, "Output file was not created"
+        return True, convert_vtf_file(vtf_path, os.path.abspath(output_path))
         
     except Exception as e:
         return False, f"Conversion error: {str(e)}"
@@ -149,20 +108,21 @@ def select_output_directory():
     return dir_path if dir_path else None
 
 
-def convert_files(vtf_files, output_dir=None):
+def convert_files(vtf_files, output_dir=None, progress_callback=None, cancel_event=None, max_workers=None):
     """
-    Convert multiple VTF files to PNG.
+    Convert multiple VTF files to PNG in parallel.
     
     Args:
         vtf_files: List of VTF file paths
         output_dir: Optional output directory. If None, saves next to original files
+        progress_callback: Optional progress_callback(done, total, vtf_path, success, message)
+        cancel_event: Optional threading.Event that stops starting new files
+        max_workers: Worker processes. If None, uses the CPU count
     
     Returns:
-        tuple: (converted_count, failed_count, results_list, actual_output_dir)
+        tuple: (converted_count, failed_count, results_list, actual_output_dir, stats)
     """
-    converted = 0
-    failed = 0
-    results = []
+    jobs = []
     actual_output_dir = output_dir
     
     for vtf_file in vtf_files:
@@ -173,22 +133,106 @@ def convert_files(vtf_files, output_dir=None):
             output_filename = os.path.splitext(filename)[0] + '.png'
             output_path = os.path.join(output_dir, output_filename)
         else:
-            output_path = None  # Will use same directory as VTF
+            output_path = os.path.splitext(vtf_file)[0] + '.png'  # Same directory as VTF
             # Track the actual output directory from first file
             if actual_output_dir is None:
                 actual_output_dir = os.path.dirname(vtf_file)
         
-        # Convert
-        success, message = convert_vtf_to_png(vtf_file, output_path)
-        
+        jobs.append((vtf_file, os.path.abspath(output_path)))
+    
+    if not VTF_SUPPORT:
+        stats = {'converted': 0, 'failed': len(jobs), 'cancelled': 0,
+                 'results': [(vtf_file, False, "VTF conversion is not available") for vtf_file, _ in jobs],
+                 'seconds': 0.0, 'files_per_second': 0.0, 'mb_per_second': 0.0}
+    else:
+        stats = convert_batch(jobs, max_workers, progress_callback, cancel_event)
+    
+    results = []
+    for vtf_file, success, message in stats['results']:
+        filename = os.path.basename(vtf_file)
         if success:
-            converted += 1
             results.append(f"[OK] {filename} -> {os.path.basename(message)}")
         else:
-            failed += 1
             results.append(f"[FAIL] {filename}: {message}")
     
-    return converted, failed, results, actual_output_dir
+    return stats['converted'], stats['failed'], results, actual_output_dir, stats
+
+
+def convert_files_with_progress(vtf_files, output_dir=None):
+    """
+    Runs convert_files on a background thread while a small window shows per-file
+    progress and a Cancel button. Returns the convert_files result.
+    """
+    root = tk.Tk()
+    root.title("VTF to PNG - Converting")
+    root.resizable(False, False)
+    root.attributes('-topmost', True)
+    
+    # Set window icon
+    try:
+        icon_path = resource_path(os.path.join("icons", "vtf2png.ico"))
+        if os.path.exists(icon_path):
+            root.iconbitmap(icon_path)
+    except Exception as e:
+        print(f"Could not set window icon: {e}")
+    
+    status_label = tk.Label(root, text=f"Converting {len(vtf_files)} file(s)...", anchor='w', width=60)
+    status_label.pack(padx=10, pady=(10, 5), fill='x')
+    progress_bar = ttk.Progressbar(root, length=400, maximum=max(1, len(vtf_files)))
+    progress_bar.pack(padx=10, pady=5, fill='x')
+    
+    cancel_event = threading.Event()
+    updates = queue.Queue()
+    outcome = {}
+    
+    def cancel():
+        cancel_event.set()
+        cancel_button.config(state='disabled')
+        status_label.config(text="Cancelling - waiting for running conversions to finish...")
+    
+    cancel_button = tk.Button(root, text="Cancel", command=cancel, width=12)
+    cancel_button.pack(pady=(5, 10))
+    root.protocol("WM_DELETE_WINDOW", cancel)
+    
+    def progress(done, total, vtf_path, success, message):
+        # Called on the worker thread; Tk is only touched from the main loop
+        updates.put((done, total, vtf_path, success))
+    
+    def work():
+        try:
+            outcome['result'] = convert_files(vtf_files, output_dir, progress, cancel_event)
+        except Exception as e:
+            outcome['error'] = e
+        updates.put(None)
+    
+    def poll():
+        finished = False
+        while True:
+            try:
+                update = updates.get_nowait()
+            except queue.Empty:
+                break
+            if update is None:
+                finished = True
+                break
+            done, total, vtf_path, success = update
+            progress_bar['value'] = done
+            if not cancel_event.is_set():
+                state = "" if success else " (failed)"
+                status_label.config(text=f"[{done}/{total}] {os.path.basename(vtf_path)}{state}")
+        
+        if finished:
+            root.destroy()
+        else:
+            root.after(50, poll)
+    
+    threading.Thread(target=work, daemon=True).start()
+    root.after(50, poll)
+    root.mainloop()
+    
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
 
 
 def main():
@@ -208,9 +252,8 @@ def main():
         
         messagebox.showerror(
             "VTF Tools Not Found",
-            "VTFCmd.exe could not be found or downloaded.\n\n"
-            "VTF conversion tools are required for this program to work.\n"
-            "Please check your internet connection and try again."
+            "The VTF converter could not be loaded.\n\n"
+            "VTF conversion tools are required for this program to work."
         )
         sys.exit(1)
     
@@ -231,9 +274,14 @@ def main():
     except Exception as e:
         print(f"Could not set window icon: {e}")
     
+    # Header-only scan, so this stays instant even for hundreds of files
+    file_list = "\n".join([f"• {os.path.basename(f)} ({describe_vtf(f)})" for f in vtf_files[:10]])
+    if len(vtf_files) > 10:
+        file_list += f"\n... and {len(vtf_files) - 10} more"
+    
     use_custom_dir = messagebox.askyesno(
         "Output Location",
-        f"Selected {len(vtf_files)} VTF file(s).\n\n"
+        f"Selected {len(vtf_files)} VTF file(s):\n{file_list}\n\n"
         "Save PNG files to a different directory?\n\n"
         "Yes = Choose output directory\n"
         "No = Save next to VTF files"
@@ -247,7 +295,7 @@ def main():
             messagebox.showinfo("Cancelled", "Output directory selection cancelled.\nUsing same directory as VTF files.")
     
     # Convert files
-    converted, failed, results, actual_output_dir = convert_files(vtf_files, output_dir)
+    converted, failed, results, actual_output_dir, stats = convert_files_with_progress(vtf_files, output_dir)
     
     # Show results
     root = tk.Tk()
@@ -261,8 +309,14 @@ def main():
     except Exception as e:
         print(f"Could not set window icon: {e}")
     
-    result_text = "\n".join(results)
-    summary = f"Conversion Complete!\n\nConverted: {converted}\nFailed: {failed}\n\n{result_text}"
+    # Keep the dialog readable for large batches
+    result_text = "\n".join(results[:30])
+    if len(results) > 30:
+        result_text += f"\n... and {len(results) - 30} more"
+    summary = f"Conversion Complete!\n\nConverted: {converted}\nFailed: {failed}\n"
+    if stats['cancelled']:
+        summary += f"Cancelled: {stats['cancelled']}\n"
+    summary += f"{format_throughput(stats)}\n\n{result_text}"
     
     if failed > 0:
         messagebox.showwarning("Conversion Complete (with errors)", summary)
@@ -283,4 +337,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,408 @@
+"""
+VTF Reader
+In-process decoder for Valve Texture Format files (VTF 7.0 - 7.5)
+Decodes straight to NumPy arrays, so no VTFCmd.exe subprocess or temporary PNG is needed
+"""
+
+import os
+import mmap
+import struct
+import numpy as np
+from PIL import Image
+
+# --- Image formats (IMAGE_FORMAT enum from the Source SDK) ---
+IMAGE_FORMAT_NONE = -1
+IMAGE_FORMAT_RGBA8888 = 0
+IMAGE_FORMAT_ABGR8888 = 1
+IMAGE_FORMAT_RGB888 = 2
+IMAGE_FORMAT_BGR888 = 3
+IMAGE_FORMAT_RGB565 = 4
+IMAGE_FORMAT_I8 = 5
+IMAGE_FORMAT_IA88 = 6
+IMAGE_FORMAT_A8 = 8
+IMAGE_FORMAT_ARGB8888 = 11
+IMAGE_FORMAT_BGRA8888 = 12
+IMAGE_FORMAT_DXT1 = 13
+IMAGE_FORMAT_DXT3 = 14
+IMAGE_FORMAT_DXT5 = 15
+IMAGE_FORMAT_BGRX8888 = 16
+IMAGE_FORMAT_BGR565 = 17
+IMAGE_FORMAT_DXT1_ONEBITALPHA = 20
+IMAGE_FORMAT_RGBA16161616F = 24
+
+FORMAT_NAMES = {
+    IMAGE_FORMAT_NONE: "NONE",
+    IMAGE_FORMAT_RGBA8888: "RGBA8888",
+    IMAGE_FORMAT_ABGR8888: "ABGR8888",
+    IMAGE_FORMAT_RGB888: "RGB888",
+    IMAGE_FORMAT_BGR888: "BGR888",
+    IMAGE_FORMAT_RGB565: "RGB565",
+    IMAGE_FORMAT_I8: "I8",
+    IMAGE_FORMAT_IA88: "IA88",
+    7: "P8",
+    IMAGE_FORMAT_A8: "A8",
+    9: "RGB888_BLUESCREEN",
+    10: "BGR888_BLUESCREEN",
+    IMAGE_FORMAT_ARGB8888: "ARGB8888",
+    IMAGE_FORMAT_BGRA8888: "BGRA8888",
+    IMAGE_FORMAT_DXT1: "DXT1",
+    IMAGE_FORMAT_DXT3: "DXT3",
+    IMAGE_FORMAT_DXT5: "DXT5",
+    IMAGE_FORMAT_BGRX8888: "BGRX8888",
+    IMAGE_FORMAT_BGR565: "BGR565",
+    18: "BGRX5551",
+    19: "BGRA4444",
+    IMAGE_FORMAT_DXT1_ONEBITALPHA: "DXT1_ONEBITALPHA",
+    21: "BGRA5551",
+    22: "UV88",
+    23: "UVWQ8888",
+    IMAGE_FORMAT_RGBA16161616F: "RGBA16161616F",
+    25: "RGBA16161616",
+    26: "UVLX8888",
+}
+
+# Byte-per-channel formats: bytes per pixel and, for each output RGBA channel, the source
+# byte index (None = constant: 255 for alpha, 0 for color)
+SWIZZLED_FORMATS = {
+    IMAGE_FORMAT_RGBA8888: (4, (0, 1, 2, 3)),
+    IMAGE_FORMAT_ABGR8888: (4, (3, 2, 1, 0)),
+    IMAGE_FORMAT_RGB888: (3, (0, 1, 2, None)),
+    IMAGE_FORMAT_BGR888: (3, (2, 1, 0, None)),
+    IMAGE_FORMAT_I8: (1, (0, 0, 0, None)),
+    IMAGE_FORMAT_IA88: (2, (0, 0, 0, 1)),
+    IMAGE_FORMAT_A8: (1, (None, None, None, 0)),
+    IMAGE_FORMAT_ARGB8888: (4, (1, 2, 3, 0)),
+    IMAGE_FORMAT_BGRA8888: (4, (2, 1, 0, 3)),
+    IMAGE_FORMAT_BGRX8888: (4, (2, 1, 0, None)),
+}
+
+# Bytes per 4x4 block for the block-compressed formats
+DXT_BLOCK_SIZES = {
+    IMAGE_FORMAT_DXT1: 8,
+    IMAGE_FORMAT_DXT1_ONEBITALPHA: 8,
+    IMAGE_FORMAT_DXT3: 16,
+    IMAGE_FORMAT_DXT5: 16,
+}
+
+TEXTUREFLAGS_ENVMAP = 0x4000
+RESOURCE_HIGH_RES_IMAGE = b'\x30\x00\x00'
+
+
+def format_name(image_format):
+    """Readable name of a VTF image format value."""
+    return FORMAT_NAMES.get(image_format, f"UNKNOWN({image_format})")
+
+
+def is_supported_format(image_format):
+    """True if decode_vtf can decode the given image format."""
+    return (image_format in SWIZZLED_FORMATS or image_format in DXT_BLOCK_SIZES
+            or image_format in (IMAGE_FORMAT_RGB565, IMAGE_FORMAT_BGR565, IMAGE_FORMAT_RGBA16161616F))
+
+
+def image_data_size(image_format, width, height, depth=1):
+    """Size in bytes of one image (one mip of one frame/face) in the given format."""
+    if image_format == IMAGE_FORMAT_NONE:
+        return 0
+    if image_format in DXT_BLOCK_SIZES:
+        return max(1, (width + 3) // 4) * max(1, (height + 3) // 4) * DXT_BLOCK_SIZES[image_format] * depth
+    if image_format in SWIZZLED_FORMATS:
+        bytes_per_pixel = SWIZZLED_FORMATS[image_format][0]
+    elif image_format in (IMAGE_FORMAT_RGB565, IMAGE_FORMAT_BGR565):
+        bytes_per_pixel = 2
+    elif image_format == IMAGE_FORMAT_RGBA16161616F:
+        bytes_per_pixel = 8
+    else:
+        raise ValueError(f"Unsupported VTF image format: {format_name(image_format)}")
+    return width * height * bytes_per_pixel * depth
+
+
+def mip_dimensions(header, mip_level):
+    """(width, height, depth) of a mip level; level 0 is the full-size image."""
+    return (max(1, header['width'] >> mip_level),
+            max(1, header['height'] >> mip_level),
+            max(1, header['depth'] >> mip_level))
+
+
+def parse_vtf_header(buffer):
+    """
+    Parses a VTF header from a bytes-like object (file contents or a memory map).
+
+    Returns:
+        Dict with version, width, height, depth, flags, frames, faces, mipmap_count,
+        image_format, low_res_format and high_res_offset (byte offset of the high-res image data).
+    """
+    if len(buffer) < 64 or bytes(buffer[:4]) != b'VTF\x00':
+        raise ValueError("Not a VTF file")
+
+    major, minor, header_size = struct.unpack_from('<3I', buffer, 4)
+    width, height, flags, frames, first_frame = struct.unpack_from('<HHIHH', buffer, 16)
+    image_format, mipmap_count, low_res_format, low_res_width, low_res_height = struct.unpack_from('<iBiBB', buffer, 52)
+    if major != 7 or minor > 5:
+        raise ValueError(f"Unsupported VTF version {major}.{minor}")
+
+    depth = struct.unpack_from('<H', buffer, 63)[0] if minor >= 2 else 1
+
+    # Cubemaps carry 6 faces; pre-7.5 files also store a spheremap face unless first_frame is 0xFFFF
+    faces = 1
+    if flags & TEXTUREFLAGS_ENVMAP:
+        faces = 7 if (minor < 5 and first_frame != 0xFFFF) else 6
+
+    if minor >= 3:
+        # 7.3+ lists its data blocks in a resource directory after the fixed header
+        resource_count = struct.unpack_from('<I', buffer, 68)[0]
+        high_res_offset = None
+        for i in range(resource_count):
+            tag, _, offset = struct.unpack_from('<3sBI', buffer, 80 + i * 8)
+            if tag == RESOURCE_HIGH_RES_IMAGE:
+                high_res_offset = offset
+                break
+        if high_res_offset is None:
+            raise ValueError("VTF file has no high-res image resource")
+    else:
+        # Older files store the low-res thumbnail right after the header, followed by the high-res data
+        high_res_offset = header_size + image_data_size(low_res_format, low_res_width, low_res_height)
+
+    return {
+        'version': (major, minor),
+        'width': width,
+        'height': height,
+        'depth': max(1, depth),
+        'flags': flags,
+        'frames': max(1, frames),
+        'faces': faces,
+        'mipmap_count': max(1, mipmap_count),
+        'image_format': image_format,
+        'format_name': format_name(image_format),
+        'low_res_format': low_res_format,
+        'high_res_offset': high_res_offset,
+    }
+
+
+def image_offset(header, mip_level=0, frame=0, face=0):
+    """Byte offset of one image inside the high-res data (mips are stored smallest first)."""
+    image_format = header['image_format']
+    images_per_mip = header['frames'] * header['faces']
+    offset = header['high_res_offset']
+    for level in range(header['mipmap_count'] - 1, mip_level, -1):
+        width, height, depth = mip_dimensions(header, level)
+        offset += images_per_mip * image_data_size(image_format, width, height, depth)
+
+    width, height, depth = mip_dimensions(header, mip_level)
+    return offset + (frame * header['faces'] + face) * image_data_size(image_format, width, height, depth)
+
+
+# --- Block decompression (vectorized over all 4x4 blocks) ---
+
+def _expand_565(colors):
+    """uint16 RGB565 values -> (..., 3) uint16 RGB888 values."""
+    r = (colors >> 11) & 0x1F
+    g = (colors >> 5) & 0x3F
+    b = colors & 0x1F
+    return np.stack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2)), axis=-1)
+
+
+def _decode_color_blocks(blocks, allow_transparent):
+    """
+    Decodes the 8-byte BC1 color part of every block.
+
+    Args:
+        blocks: (n, 8) uint8 array
+        allow_transparent: DXT1 semantics (c0 <= c1 selects 3 colors + transparent black)
+
+    Returns:
+        (n, 16, 4) uint8 RGBA pixels in row-major block order
+    """
+    c0 = blocks[:, 0].astype(np.uint16) | (blocks[:, 1].astype(np.uint16) << 8)
+    c1 = blocks[:, 2].astype(np.uint16) | (blocks[:, 3].astype(np.uint16) << 8)
+    rgb0 = _expand_565(c0)
+    rgb1 = _expand_565(c1)
+
+    palette = np.empty((blocks.shape[0], 4, 4), dtype=np.uint16)
+    palette[:, 0, :3] = rgb0
+    palette[:, 1, :3] = rgb1
+    palette[:, 2, :3] = (2 * rgb0 + rgb1 + 1) // 3
+    palette[:, 3, :3] = (rgb0 + 2 * rgb1 + 1) // 3
+    palette[:, :, 3] = 255
+
+    if allow_transparent:
+        three_color = c0 <= c1
+        palette[three_color, 2, :3] = (rgb0[three_color] + rgb1[three_color]) // 2
+        palette[three_color, 3] = 0
+
+    # 2-bit indices, first pixel in the lowest bits
+    bits = blocks[:, 4:8].copy().view('<u4')
+    indices = (bits >> (np.arange(16, dtype=np.uint32) * 2)) & 3
+    return np.take_along_axis(palette, indices[:, :, None].astype(np.intp), axis=1).astype(np.uint8)
+
+
+def _decode_dxt5_alpha(blocks):
+    """Decodes the 8-byte interpolated alpha part of DXT5 blocks -> (n, 16) uint8."""
+    a0 = blocks[:, 0].astype(np.uint16)
+    a1 = blocks[:, 1].astype(np.uint16)
+
+    palette = np.empty((blocks.shape[0], 8), dtype=np.uint16)
+    palette[:, 0] = a0
+    palette[:, 1] = a1
+    eight_alpha = a0 > a1
+    for i in range(1, 7):
+        palette[:, i + 1] = ((7 - i) * a0 + i * a1 + 3) // 7
+    for i in range(1, 5):
+        six = ((5 - i) * a0 + i * a1 + 2) // 5
+        palette[~eight_alpha, i + 1] = six[~eight_alpha]
+    palette[~eight_alpha, 6] = 0
+    palette[~eight_alpha, 7] = 255
+
+    # 48 bits of 3-bit indices, little-endian
+    raw = np.zeros((blocks.shape[0], 8), dtype=np.uint8)
+    raw[:, :6] = blocks[:, 2:8]
+    bits = raw.view('<u8')
+    indices = (bits >> (np.arange(16, dtype=np.uint64) * 3)) & 7
+    return np.take_along_axis(palette, indices.astype(np.intp), axis=1).astype(np.uint8)
+
+
+def _decode_dxt(data, image_format, width, height):
+    """Decodes DXT1/3/5 data to an (height, width, 4) uint8 array."""
+    blocks_x = max(1, (width + 3) // 4)
+    blocks_y = max(1, (height + 3) // 4)
+    block_size = DXT_BLOCK_SIZES[image_format]
+    blocks = np.frombuffer(data, dtype=np.uint8, count=blocks_x * blocks_y * block_size).reshape(-1, block_size)
+
+    if block_size == 8:
+        pixels = _decode_color_blocks(blocks, allow_transparent=True)
+    else:
+        pixels = _decode_color_blocks(blocks[:, 8:], allow_transparent=False)
+        if image_format == IMAGE_FORMAT_DXT3:
+            # Explicit 4-bit alpha, first pixel in the low nibble
+            alpha_bytes = blocks[:, :8]
+            nibbles = np.stack((alpha_bytes & 0x0F, alpha_bytes >> 4), axis=-1).reshape(-1, 16)
+            pixels[:, :, 3] = nibbles * 17
+        else:
+            pixels[:, :, 3] = _decode_dxt5_alpha(blocks[:, :8])
+
+    # (by, bx, row, col, 4) -> (by, row, bx, col, 4) -> image
+    image = pixels.reshape(blocks_y, blocks_x, 4, 4, 4).transpose(0, 2, 1, 3, 4).reshape(blocks_y * 4, blocks_x * 4, 4)
+    return image[:height, :width]
+
+
+def decode_image_data(data, image_format, width, height):
+    """
+    Decodes one image of raw VTF pixel data.
+
+    Returns:
+        (height, width, 4) RGBA array: uint8 for 8-bit formats, float32 for RGBA16161616F
+    """
+    if image_format in DXT_BLOCK_SIZES:
+        return _decode_dxt(data, image_format, width, height)
+
+    if image_format in SWIZZLED_FORMATS:
+        bytes_per_pixel, channel_map = SWIZZLED_FORMATS[image_format]
+        pixels = np.frombuffer(data, dtype=np.uint8, count=width * height * bytes_per_pixel).reshape(height, width, bytes_per_pixel)
+        image = np.empty((height, width, 4), dtype=np.uint8)
+        for channel, source in enumerate(channel_map):
+            if source is None:
+                image[:, :, channel] = 255 if channel == 3 else 0
+            else:
+                image[:, :, channel] = pixels[:, :, source]
+        return image
+
+    if image_format in (IMAGE_FORMAT_RGB565, IMAGE_FORMAT_BGR565):
+        colors = np.frombuffer(data, dtype='<u2', count=width * height).reshape(height, width)
+        rgb = _expand_565(colors).astype(np.uint8)
+        if image_format == IMAGE_FORMAT_BGR565:
+            # BGR565 stores blue in the high bits
+            rgb = rgb[:, :, ::-1]
+        alpha = np.full((height, width, 1), 255, dtype=np.uint8)
+        return np.concatenate((rgb, alpha), axis=2)
+
+    if image_format == IMAGE_FORMAT_RGBA16161616F:
+        pixels = np.frombuffer(data, dtype='<f2', count=width * height * 4).reshape(height, width, 4)
+        return pixels.astype(np.float32)
+
+    raise ValueError(f"Unsupported VTF image format: {format_name(image_format)}")
+
+
+def decode_vtf_buffer(buffer, mip_level=0, frame=0, face=0):
+    """Decodes one image of an in-memory VTF (see decode_vtf)."""
+    header = parse_vtf_header(buffer)
+    image_format = header['image_format']
+    if not is_supported_format(image_format):
+        raise ValueError(f"Unsupported VTF image format: {format_name(image_format)}")
+    if not 0 <= mip_level < header['mipmap_count']:
+        raise ValueError(f"Mip level {mip_level} out of range (file has {header['mipmap_count']})")
+    if not 0 <= frame < header['frames'] or not 0 <= face < header['faces']:
+        raise ValueError(f"Frame {frame} / face {face} out of range")
+
+    width, height, _ = mip_dimensions(header, mip_level)
+    offset = image_offset(header, mip_level, frame, face)
+    size = image_data_size(image_format, width, height)
+    if offset + size > len(buffer):
+        raise ValueError("VTF file is truncated")
+
+    # Slicing copies just this image, so a memory-mapped file only pages in the chosen mip
+    return decode_image_data(buffer[offset:offset + size], image_format, width, height)
+
+
+def read_vtf_info(vtf_path):
+    """
+    Reads the header of a VTF file without touching its pixel data (the file is memory-mapped,
+    so only the header pages are read). See parse_vtf_header for the returned fields.
+    """
+    with open(vtf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return parse_vtf_header(buffer)
+
+
+def mip_level_for_size(header, max_dimension):
+    """Smallest mip level whose larger side is still at least max_dimension (0 if the image is smaller)."""
+    level = 0
+    while level + 1 < header['mipmap_count'] and max(mip_dimensions(header, level + 1)[:2]) >= max_dimension:
+        level += 1
+    return level
+
+
+def decode_vtf(vtf_path, mip_level=0, frame=0, face=0):
+    """
+    Decodes one image of a VTF file. The file is memory-mapped and only the requested
+    image is read, so decoding a small mip of a large texture is cheap.
+
+    Args:
+        vtf_path: Path to the VTF file
+        mip_level: 0 for the full-size image, higher for smaller mips
+        frame: Animation frame
+        face: Cubemap face (0 for regular textures)
+
+    Returns:
+        (height, width, 4) RGBA array: uint8, or float32 for HDR (RGBA16161616F) textures
+    """
+    with open(vtf_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return decode_vtf_buffer(buffer, mip_level, frame, face)
+
+
+def to_rgba8(pixels):
+    """Converts a decoded image to uint8 RGBA (float HDR data is clipped to 0-1)."""
+    if pixels.dtype == np.uint8:
+        return pixels
+    return (np.clip(pixels, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+
+
+def load_vtf_image(vtf_path, mip_level=0, frame=0, face=0):
+    """Decodes a VTF file into an RGBA PIL image."""
+    return Image.fromarray(to_rgba8(decode_vtf(vtf_path, mip_level, frame, face)), 'RGBA')
+
+
+def vtf_to_png(vtf_path, png_path=None):
+    """
+    Converts a VTF file to PNG.
+
+    Args:
+        vtf_path: Path to the VTF file
+        png_path: Output path. If None, the .vtf extension is replaced with .png
+
+    Returns:
+        The path of the written PNG
+    """
+    if png_path is None:
+        png_path = os.path.splitext(vtf_path)[0] + '.png'
+    load_vtf_image(vtf_path).save(png_path, format='PNG')
+    return png_path
@@ -0,0 +1,88 @@
+"""
+point_worldtext Layout
+Glyph metrics and single-pass text layout for the PointWorldText generator
+"""
+
+SPACING = 5  # Fixed spacing between characters
+LINE_SPACING = 10  # Spacing between lines
+DEFAULT_SPACE_WIDTH = 25  # Space width for lines without any glyphs
+
+
+def build_glyph_metrics(glyphs):
+    """
+    Precompute the metrics table for a set of glyphs.
+
+    Args:
+        glyphs: Lookup key ('1', '!', 'a', 'aa') -> RGBA array (h, w, 4)
+
+    Returns:
+        Dict mapping each input character to (width, height, lookup_key).
+        Uppercase letters map to their double-letter glyph ('A' -> 'aa').
+    """
+    metrics = {}
+    for lookup_key, glyph in glyphs.items():
+        if len(lookup_key) == 2:
+            char = lookup_key[0].upper()
+            if not char.isupper() or char.lower() * 2 != lookup_key:
+                continue
+        elif lookup_key.isupper():
+            # Uppercase input always resolves to the double-letter glyph
+            continue
+        else:
+            char = lookup_key
+
+        height, width = glyph.shape[:2]
+        metrics[char] = (width, height, lookup_key)
+    return metrics
+
+
+def layout_text(text, metrics, space_width_ratio=0.5):
+    """
+    Lay out (possibly multi-line) text in a single pass over its characters.
+
+    Spaces are as wide as space_width_ratio times the height of their line, so
+    glyph positions are recorded as (advance, spaces before) and resolved once
+    the line is complete. Characters without a glyph are skipped.
+
+    Returns:
+        (width, height, placements) where placements is a list of
+        (lookup_key, x, y) top-left glyph positions, or None if nothing is drawn.
+    """
+    lines = text.split('\n')
+    placements = []
+    max_line_width = 0
+    y_offset = 0
+
+    for line in lines:
+        line_glyphs = []
+        advance = 0
+        spaces = 0
+        line_height = 0
+
+        for char in line:
+            if char == ' ':
+                spaces += 1
+                continue
+
+            metric = metrics.get(char)
+            if metric is None:
+                continue
+
+            width, height, lookup_key = metric
+            line_glyphs.append((lookup_key, advance, spaces))
+            advance += width + SPACING
+            if height > line_height:
+                line_height = height
+
+        space_width = int(line_height * space_width_ratio) if line_height > 0 else DEFAULT_SPACE_WIDTH
+        for lookup_key, glyph_advance, spaces_before in line_glyphs:
+            placements.append((lookup_key, glyph_advance + spaces_before * space_width, y_offset))
+
+        max_line_width = max(max_line_width, advance + spaces * space_width)
+        y_offset += line_height + LINE_SPACING
+
+    total_height = y_offset - LINE_SPACING
+    if max_line_width == 0 or total_height == 0:
+        return None
+
+    return max_line_width, total_height, placements
@@ -0,0 +1,239 @@
+# Regression test for pointworldtext.extract_characters glyph sheet segmentation
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir / 'scripts'))
+from pointworldtext import extract_characters
+
+# Sheet layout, same rows as extract_characters expects, as chars/ file names
+SHEET_ROWS = [
+    [f"_{d}" for d in range(10)],
+    list('abcdefghijklmnopqrstuvwxyz'),
+    [c * 2 for c in 'abcdefghijklmnopqrstuvwxyz'],
+    [('_' if c == '_' else str(ord(c))) for c in '!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~'],
+]
+# chars/ glyphs that extract_characters writes under another name ('_' is saved as its ASCII code)
+EXTRACTED_NAMES = {'_': '95'}
+GLYPH_GAP = 7
+ROW_GAP = 15
+MARGIN = 10
+
+
+def legacy_extract_characters(input_image_path, output_folder="chars"):
+    """extract_characters before NumPy segmentation, kept verbatim as the reference output."""
+    img = Image.open(input_image_path).convert('RGBA')
+    width, height = img.size
+
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+
+    pixels = img.load()
+
+    # Find rows (vertical segmentation)
+    rows = []
+    in_row = False
+    start_y = 0
+
+    for y in range(height):
+        row_has_content = False
+        for x in range(width):
+            r, g, b, a = pixels[x, y]
+            # Check for non-white/transparent content
+            if r < 250 or g < 250 or b < 250:
+                row_has_content = True
+                break
+
+        if row_has_content and not in_row:
+            start_y = y
+            in_row = True
+        elif not row_has_content and in_row:
+            rows.append((start_y, y))
+            in_row = False
+
+    if in_row:
+        rows.append((start_y, height))
+
+    # Character mapping structure (must match the rows in the sheet)
+    char_rows = [
+        ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9'], # Digits
+        ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o', 'p', 'q', 'r', 's', 't', 'u', 'v', 'w', 'x', 'y', 'z'], # Lowercase
+        ['aa', 'bb', 'cc', 'dd', 'ee', 'ff', 'gg', 'hh', 'ii', 'jj', 'kk', 'll', 'mm', 'nn', 'oo', 'pp', 'qq', 'rr', 'ss', 'tt', 'uu', 'vv', 'ww', 'xx', 'yy', 'zz'], # Uppercase mapped (double letters)
+        ['!', '"', '#', '$', '%', '&', "'", '(', ')', '*', '+', ',', '-', '.', '/', ':', ';', '<', '=', '>', '?', '@', '[', '\\', ']', '^', '_', '`', '{', '|', '}', '~'] # Symbols
+    ]
+
+    for row_idx, (y1, y2) in enumerate(rows):
+        if row_idx >= len(char_rows):
+            break
+
+        row_img = img.crop((0, y1, width, y2))
+        row_pixels = row_img.load()
+        row_width = row_img.width
+
+        # Find characters in this row (horizontal segmentation)
+        chars = []
+        in_char = False
+        start_x = 0
+
+        for x in range(row_width):
+            col_has_content = False
+            for y in range(row_img.height):
+                r, g, b, a = row_pixels[x, y]
+                if r < 250 or g < 250 or b < 250:
+                    col_has_content = True
+                    break
+
+            if col_has_content and not in_char:
+                start_x = x
+                in_char = True
+            elif not col_has_content and in_char:
+                chars.append((start_x, x))
+                in_char = False
+
+        if in_char:
+            chars.append((start_x, row_width))
+
+        # Save individual character images
+        for char_idx, (x1, x2) in enumerate(chars):
+            if char_idx >= len(char_rows[row_idx]):
+                break
+
+            char_img = row_img.crop((x1, 0, x2, row_img.height))
+
+            # Make white transparent
+            data = char_img.getdata()
+            new_data = []
+            for item in data:
+                if item[0] > 250 and item[1] > 250 and item[2] > 250:
+                    new_data.append((255, 255, 255, 0))
+                else:
+                    new_data.append(item)
+            char_img.putdata(new_data)
+
+            char_name = char_rows[row_idx][char_idx]
+            safe_name = char_name
+
+            # 1. Digits ('0' to '9'): Use underscore prefix (e.g., '0' -> '_0')
+            if len(char_name) == 1 and char_name.isdigit():
+                safe_name = "_" + char_name
+
+            # 2. Symbols: Use ASCII number (e.g., '!' -> '33')
+            # Check if it's a single character AND not a letter or digit (i.e., a symbol)
+            elif len(char_name) == 1 and not char_name.isalnum():
+                safe_name = str(ord(char_name))
+
+            # 3. Uppercase mappings (e.g., 'A' -> 'aa', stored as 'aa.png')
+            elif len(char_name) == 2 and char_name.islower() and char_name[0] == char_name[1]:
+                safe_name = char_name
+
+            filepath = os.path.join(output_folder, f"{safe_name}.png")
+            char_img.save(filepath)
+
+
+def build_sheet_from_chars(chars_dir, sheet_path):
+    """Lays the chars/ glyphs out as a white-background glyph sheet, with near-white noise
+    sprinkled over the background so the 250 thresholds are exercised."""
+    rows = [[Image.open(chars_dir / f"{name}.png").convert('RGBA') for name in row] for row in SHEET_ROWS]
+    width = max(sum(glyph.width + GLYPH_GAP for glyph in row) for row in rows) + 2 * MARGIN
+    height = sum(max(glyph.height for glyph in row) + ROW_GAP for row in rows) + 2 * MARGIN
+    # Background first, so the noise never touches the glyphs themselves
+    pixels = np.full((height, width, 4), 255, dtype=np.uint8)
+    rng = np.random.default_rng(0)
+    noisy = rng.random((height, width)) < 0.3
+    pixels[noisy, :3] = rng.integers(250, 256, size=(int(noisy.sum()), 3), dtype=np.uint8)
+    sheet = Image.fromarray(pixels)
+
+    y = MARGIN
+    for row in rows:
+        x = MARGIN
+        for glyph in row:
+            # Pasted as-is (no compositing): segmentation only looks at RGB, so glyph edges stay intact
+            sheet.paste(glyph, (x, y))
+            x += glyph.width + GLYPH_GAP
+        y += max(glyph.height for glyph in row) + ROW_GAP
+
+    sheet.save(sheet_path)
+
+
+def check_extract_characters():
+    """Check that extract_characters finds every chars/ glyph again and writes the same PNGs,
+    byte for byte, as the original implementation"""
+
+    chars_dir = script_dir / 'chars'
+    print("Testing extract_characters...")
+    print(f"Rebuilding a glyph sheet from: {chars_dir}")
+    print()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        sheet_path = temp_dir / 'sheet.png'
+        build_sheet_from_chars(chars_dir, sheet_path)
+
+        legacy_dir = temp_dir / 'legacy'
+        current_dir = temp_dir / 'current'
+        legacy_extract_characters(str(sheet_path), str(legacy_dir))
+        extract_characters(str(sheet_path), str(current_dir))
+
+        # Every chars/ glyph must be found again, with the same width
+        stored_names = {f"{EXTRACTED_NAMES.get(name, name)}.png": f"{name}.png" for row in SHEET_ROWS for name in row}
+        expected = sorted(stored_names)
+        produced = sorted(os.listdir(current_dir))
+        if produced != expected:
+            print("✗ FAIL: extracted glyph files don't match chars/")
+            print(f"  Missing: {sorted(set(expected) - set(produced))}")
+            print(f"  Extra: {sorted(set(produced) - set(expected))}")
+            return False
+
+        print(f"✓ {len(produced)} glyphs extracted")
+
+        mismatched = []
+        for name in produced:
+            stored_width = Image.open(chars_dir / stored_names[name]).width
+            extracted_width = Image.open(current_dir / name).width
+            if extracted_width != stored_width:
+                mismatched.append(f"{name} ({extracted_width} != {stored_width})")
+        if mismatched:
+            print(f"✗ FAIL: glyph widths differ from chars/: {', '.join(mismatched)}")
+            return False
+
+        print("✓ glyph widths match chars/")
+
+        # Pixels must be the stored glyph with near-white keyed out (rows below a shorter glyph are sheet background)
+        mismatched = []
+        for name in produced:
+            stored = np.asarray(Image.open(chars_dir / stored_names[name]).convert('RGBA')).copy()
+            stored[(stored[..., :3] > 250).all(axis=2)] = (255, 255, 255, 0)
+            extracted = np.asarray(Image.open(current_dir / name))
+            if not np.array_equal(extracted[:stored.shape[0]], stored):
+                mismatched.append(name)
+        if mismatched:
+            print(f"✗ FAIL: glyph pixels differ from chars/: {', '.join(mismatched)}")
+            return False
+
+        print("✓ glyph pixels match chars/")
+
+        different = [name for name in produced
+                     if (current_dir / name).read_bytes() != (legacy_dir / name).read_bytes()]
+        if different:
+            print(f"✗ FAIL: PNGs differ from the original implementation: {', '.join(different)}")
+            return False
+
+        print("✓ every PNG is byte-identical to the original implementation's output")
+
+    print()
+    print("✓ SUCCESS: extract_characters output is unchanged")
+    print()
+
+    return True
+
+def test_extract_characters():
+    assert check_extract_characters()
+
+if __name__ == '__main__':
+    success = check_extract_characters()
+    sys.exit(0 if success else 1)
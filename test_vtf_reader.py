@@ -0,0 +1,77 @@
+# Regression test for vtf_reader cubemap face counts and image offsets
+import struct
+import sys
+from pathlib import Path
+
+import numpy as np
+
+script_dir = Path(__file__).parent
+sys.path.insert(0, str(script_dir / 'scripts'))
+from vtf_reader import (IMAGE_FORMAT_NONE, IMAGE_FORMAT_RGBA8888, TEXTUREFLAGS_ENVMAP,
+                        decode_vtf_buffer, parse_vtf_header)
+
+SIZE = 8
+MIPS = 4
+HEADER_SIZE = 80
+
+
+def face_color(mip, face):
+    """Distinct RGBA color for every mip/face, so a wrong offset decodes to the wrong color."""
+    return (40 * face + 10, 60 * mip + 5, 200 - 20 * face, 255)
+
+
+def build_cubemap_72(first_frame, faces):
+    """Builds a 7.2 RGBA8888 cubemap with a full mip chain and no low-res thumbnail."""
+    header = bytearray(HEADER_SIZE)
+    header[0:4] = b'VTF\x00'
+    struct.pack_into('<3I', header, 4, 7, 2, HEADER_SIZE)
+    struct.pack_into('<HHIHH', header, 16, SIZE, SIZE, TEXTUREFLAGS_ENVMAP, 1, first_frame)
+    struct.pack_into('<iBiBB', header, 52, IMAGE_FORMAT_RGBA8888, MIPS, IMAGE_FORMAT_NONE, 0, 0)
+    struct.pack_into('<H', header, 63, 1)
+
+    data = bytearray()
+    # Mips are stored smallest first, each holding every face
+    for mip in range(MIPS - 1, -1, -1):
+        size = max(1, SIZE >> mip)
+        for face in range(faces):
+            data += bytes(face_color(mip, face)) * (size * size)
+    return bytes(header + data)
+
+
+def check_cubemap_faces():
+    """Check that pre-7.5 cubemaps get the right face count and decode every face from its own offset"""
+
+    print("Testing vtf_reader cubemap decoding...")
+    print()
+
+    # first_frame 0xFFFF marks a cubemap without the spheremap face, anything else stores 7 faces
+    for first_frame, faces in ((0xFFFF, 6), (0, 7)):
+        buffer = build_cubemap_72(first_frame, faces)
+        header = parse_vtf_header(buffer)
+        if header['faces'] != faces:
+            print(f"✗ FAIL: first_frame {first_frame:#x}: {header['faces']} faces, expected {faces}")
+            return False
+
+        print(f"✓ first_frame {first_frame:#x}: {faces} faces")
+
+        for mip in range(MIPS):
+            for face in range(faces):
+                pixels = decode_vtf_buffer(buffer, mip_level=mip, face=face)
+                if not (pixels == np.array(face_color(mip, face), dtype=np.uint8)).all():
+                    print(f"✗ FAIL: first_frame {first_frame:#x}: mip {mip} face {face} decoded {pixels[0, 0]}")
+                    return False
+
+        print(f"✓ first_frame {first_frame:#x}: every mip and face decodes to its own pixels")
+
+    print()
+    print("✓ SUCCESS: cubemap faces decode correctly")
+    print()
+
+    return True
+
+def test_cubemap_faces():
+    assert check_cubemap_faces()
+
+if __name__ == '__main__':
+    success = check_cubemap_faces()
+    sys.exit(0 if success else 1)